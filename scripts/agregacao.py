@@ -0,0 +1,316 @@
+"""
+Agregação de bobinas intercambiáveis.
+
+Em construir_modelo só as bobinas de A_in e de A_out aparecem
+individualmente nas restrições; as demais (bloqueadoras e irrelevantes em
+gerar_instancia_armazenagem) têm o mesmo custo E_load. Essas bobinas são trocadas por uma
+única classe agregada, com multiplicidade igual ao tamanho da classe: W e x
+passam a ter uma "bobina" só para toda a classe, e a identidade de cada
+bobina é recuperada depois, refazendo as movimentações a partir da ocupação
+inicial. gerar_modelo(..., agregar=True) faz as duas etapas em torno da
+construção e da resolução.
+
+Uso:
+    python scripts/agregacao.py
+"""
+
+import numpy as np
+
+
+def agregar_bobinas(A, A_in, A_out, E_load, janelas, ocupacao_inicial=None):
+    """
+    Reduz A às bobinas individuais mais uma classe agregada.
+
+    Retorna um dicionário com os dados reduzidos (A, A_in, A_out, E_load,
+    janelas, ocupacao_inicial, multiplicidade) e o mapeamento necessário
+    para desagregar_solucao. As bobinas individuais vêm primeiro no A
+    reduzido, na ordem original, e a classe agregada por último.
+    """
+    individuais = sorted(set(A_in) | set(A_out))
+    agregadas = [a for a in range(len(A)) if a not in set(individuais)]
+
+    E_load = np.asarray(E_load)
+    if len(agregadas) <= 1:
+        # Nada a agregar
+        return {
+            "A": list(A),
+            "A_in": list(A_in),
+            "A_out": list(A_out),
+            "E_load": E_load,
+            "janelas": janelas,
+            "ocupacao_inicial": ocupacao_inicial,
+            "multiplicidade": np.ones(len(A), dtype=int),
+            "individuais": list(range(len(A))),
+            "agregadas": [],
+            "ocupacao_original": ocupacao_inicial,
+        }
+
+    if not np.allclose(E_load[:, :, agregadas], E_load[:, :, agregadas[:1]]):
+        raise ValueError("Bobinas agregadas precisam ter o mesmo custo E_load.")
+
+    colunas = individuais + [agregadas[0]]
+    novo_indice = {a: i for i, a in enumerate(individuais)}
+
+    ocupacao_reduzida = None
+    if ocupacao_inicial is not None:
+        ocupacao_inicial = np.asarray(ocupacao_inicial)
+        ocupacao_reduzida = np.concatenate(
+            [
+                ocupacao_inicial[:, individuais],
+                ocupacao_inicial[:, agregadas].sum(axis=1, keepdims=True),
+            ],
+            axis=1,
+        )
+
+    multiplicidade = np.ones(len(colunas), dtype=int)
+    multiplicidade[-1] = len(agregadas)
+
+    return {
+        "A": list(range(len(colunas))),
+        "A_in": [novo_indice[a] for a in A_in],
+        "A_out": [novo_indice[a] for a in A_out],
+        "E_load": E_load[:, :, colunas],
+        "janelas": {
+            chave: np.asarray(valores)[colunas] for chave, valores in janelas.items()
+        },
+        "ocupacao_inicial": ocupacao_reduzida,
+        "multiplicidade": multiplicidade,
+        "individuais": individuais,
+        "agregadas": agregadas,
+        "ocupacao_original": ocupacao_inicial,
+    }
+
+
+def desagregar_solucao(agregacao, valores_W, valores_x, num_secoes):
+    """
+    Recupera as movimentações e posições de cada bobina original.
+
+    `valores_W` e `valores_x` são os valores de W[s, k, q, a] e x[s, k, a] do
+    modelo agregado (por exemplo backend.valores(model._W)). As bobinas da
+    classe agregada partem das posições da ocupação inicial original (ou, sem
+    ela, das posições de x na seção 0 em ordem) e cada movimentação da classe
+    é atribuída à bobina que está na origem.
+    """
+    individuais = agregacao["individuais"]
+    agregadas = agregacao["agregadas"]
+    indice_agregado = len(individuais)
+
+    posicao = {}
+    for (s, k, a), valor in valores_x.items():
+        if s == 0 and a < indice_agregado and valor > 0.5:
+            posicao[individuais[a]] = k
+    if agregadas:
+        ocupacao = agregacao["ocupacao_original"]
+        if ocupacao is not None:
+            for k, a in zip(*np.nonzero(ocupacao[:, agregadas])):
+                posicao[agregadas[a]] = int(k)
+        else:
+            iniciais = sorted(
+                k
+                for (s, k, a), valor in valores_x.items()
+                if s == 0 and a == indice_agregado and valor > 0.5
+            )
+            posicao.update(zip(agregadas, iniciais))
+
+    movimentos_por_secao = {}
+    for (s, k, q, a), valor in valores_W.items():
+        if valor > 0.5:
+            movimentos_por_secao.setdefault(s, []).append((k, q, a))
+
+    movimentos = []
+    posicoes = [dict(posicao)]
+    for s in range(num_secoes):
+        for k, q, a in movimentos_por_secao.get(s, []):
+            if a < indice_agregado:
+                bobina = individuais[a]
+            else:
+                bobina = next(b for b in agregadas if posicao[b] == k)
+            posicao[bobina] = q
+            movimentos.append((s, k, q, bobina))
+        posicoes.append(dict(posicao))
+
+    return {"movimentos": movimentos, "posicoes": posicoes}
+
+
+def desagregar_modelo(agregacao, backend, modelo, num_secoes):
+    """
+    desagregar_solucao a partir do modelo resolvido; `modelo` guarda os
+    handles (_W, _x), variáveis do backend ou MVar da construção matricial.
+    """
+    W, x = modelo._W, modelo._x
+    if hasattr(W, "shape"):
+        valores_W = {tuple(int(i) for i in indice): 1.0 for indice in np.argwhere(W.X > 0.5)}
+        valores_x = {tuple(int(i) for i in indice): 1.0 for indice in np.argwhere(x.X > 0.5)}
+    else:
+        valores_W = backend.valores(W)
+        valores_x = backend.valores(x)
+    return desagregar_solucao(agregacao, valores_W, valores_x, num_secoes)
+
+
+def comparar_objetivos():
+    """
+    Resolve com gerar_modelo a mesma instância (uma bobina de saída sob duas
+    bloqueadoras) com e sem agregar=True, nas duas formulações de R16, e
+    retorna {(ocupacao, agregar): (variáveis, objetivo)}.
+    """
+    import contextlib
+    import io
+    import itertools
+
+    from teste import (
+        gerar_custos_de_movimentacao,
+        gerar_janelas_de_tempo,
+        gerar_modelo,
+        gerar_posicoes,
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        posicoes = gerar_posicoes(1, 4, 1)
+    Phi = posicoes["Phi"]
+    indice = {p: i for i, p in enumerate(Phi)}
+    A = list(range(5))
+    ocupacao_inicial = np.zeros((len(Phi), len(A)), dtype=int)
+    for a, posicao in enumerate([(1, 1, 2), (1, 1, 1), (1, 1, 3), (1, 2, 1), (1, 2, 2)]):
+        ocupacao_inicial[indice[posicao], a] = 1
+    with contextlib.redirect_stdout(io.StringIO()):
+        custos = gerar_custos_de_movimentacao(
+            Phi,
+            len(A),
+            "chebyshev",
+            velocidade_portico=60,
+            velocidade_carro=60,
+            velocidade_elevacao=30,
+        )
+
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    objetivos = {}
+    for ocupacao, agregar in itertools.product(("acumulada", "fluxo"), (False, True)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = gerar_modelo(
+                posicoes["Psi"],
+                posicoes["Psi1"],
+                posicoes["Psi2"],
+                Phi,
+                posicoes["I"],
+                posicoes["O"],
+                custos["t_load"],
+                custos["t_empty"],
+                custos["E_load"],
+                custos["E_empty"],
+                A,
+                [],
+                [0],
+                4,
+                arcos_esparsos=True,
+                ocupacao=ocupacao,
+                ocupacao_inicial=ocupacao_inicial,
+                agregar=agregar,
+                janelas=janelas,
+            )
+        objetivos[ocupacao, agregar] = (
+            model.NumVars,
+            model.ObjVal if model.SolCount else None,
+        )
+        model.dispose()
+    return objetivos
+
+
+if __name__ == "__main__":
+    from backends import criar_backend
+    from teste import (
+        construir_modelo,
+        gerar_custos_de_movimentacao,
+        gerar_janelas_de_tempo,
+        gerar_posicoes,
+    )
+
+    posicoes = gerar_posicoes(1, 3, 1)
+    Phi = posicoes["Phi"]
+    A = list(range(4))
+    A_in, A_out = [], []
+    S = 3
+    custos = gerar_custos_de_movimentacao(Phi, len(A))
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    ocupacao_inicial = np.zeros((len(Phi), len(A)), dtype=int)
+    for a in A:
+        ocupacao_inicial[1 + a, a] = 1
+
+    tamanhos = {}
+    solucao = None
+    for nome, agregacao in (
+        ("por bobina", None),
+        (
+            "agregado",
+            agregar_bobinas(
+                A, A_in, A_out, custos["E_load"], janelas, ocupacao_inicial
+            ),
+        ),
+    ):
+        dados = agregacao or {
+            "A": A,
+            "A_in": A_in,
+            "A_out": A_out,
+            "E_load": custos["E_load"],
+            "janelas": janelas,
+            "ocupacao_inicial": ocupacao_inicial,
+            "multiplicidade": None,
+        }
+        backend = criar_backend("gurobi")
+        construir_modelo(
+            backend,
+            posicoes["Psi"],
+            posicoes["Psi1"],
+            posicoes["Psi2"],
+            Phi,
+            posicoes["I"],
+            posicoes["O"],
+            custos["t_load"],
+            custos["t_empty"],
+            dados["E_load"],
+            custos["E_empty"],
+            dados["A"],
+            dados["A_in"],
+            dados["A_out"],
+            S,
+            dados["janelas"],
+            ocupacao_inicial=dados["ocupacao_inicial"],
+            multiplicidade=dados["multiplicidade"],
+        )
+        backend.resolver(silencioso=True)
+        tamanhos[nome] = (
+            backend.num_variaveis(),
+            backend.num_restricoes(),
+            backend.status(),
+        )
+        if agregacao is not None and backend.tem_solucao():
+            solucao = desagregar_solucao(
+                agregacao,
+                backend.valores(backend._W),
+                backend.valores(backend._x),
+                S,
+            )
+        backend.descartar()
+
+    print(f"\n{'modelo':>11} {'variáveis':>10} {'restrições':>11} status")
+    for nome, (variaveis, restricoes, status) in tamanhos.items():
+        print(f"{nome:>11} {variaveis:>10} {restricoes:>11} {status}")
+    if solucao is not None:
+        print("posições recuperadas na última seção:", solucao["posicoes"][-1])
+    else:
+        print("modelo agregado sem solução: nada a desagregar")
+
+    objetivos = comparar_objetivos()
+    for (ocupacao, agregar), (variaveis, objetivo) in objetivos.items():
+        print(
+            f"gerar_modelo(ocupacao={ocupacao!r}, agregar={agregar}):"
+            f" {variaveis} variáveis, objetivo {objetivo}"
+        )
+    for ocupacao in ("acumulada", "fluxo"):
+        sem_agregar = objetivos[ocupacao, False][1]
+        agregado = objetivos[ocupacao, True][1]
+        if None in (sem_agregar, agregado) or abs(sem_agregar - agregado) > 1e-6:
+            raise SystemExit(
+                f"R16 {ocupacao}: o modelo agregado não tem o objetivo do modelo por bobina."
+            )
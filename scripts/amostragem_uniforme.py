@@ -0,0 +1,179 @@
+"""
+Amostragem uniforme de configurações de empilhamento.
+
+distribuir_bobinas sorteia a próxima posição entre as candidatas de cada
+passo, o que concentra as instâncias em poucas configurações finais. Aqui a
+configuração de uma fileira é a contagem por camada (N_1, N_2, ...), com
+N_1 <= base e N_l <= N_(l-1) - 1, ou seja, uma partição do número de bobinas
+em partes distintas <= base. O número dessas configurações é contado por
+programação dinâmica memorizada por (base, bobinas, camadas), e a
+configuração do pátio inteiro é sorteada de modo exatamente uniforme entre
+todas as que têm o total de bobinas pedido (contagens com inteiros exatos
+e um único sorteio por instância).
+
+Uso:
+    python scripts/amostragem_uniforme.py
+"""
+
+import random
+from functools import lru_cache
+from typing import List, Tuple
+
+from instancias_lote import posicoes_do_lote
+
+
+@lru_cache(maxsize=None)
+def configuracoes_fileira(base: int, bobinas: int, camadas: int) -> int:
+    """
+    Número de configurações de uma fileira com `bobinas` bobinas, base de
+    até `base` posições e no máximo `camadas` camadas.
+    """
+    if bobinas == 0:
+        return 1
+    if base == 0 or camadas == 0 or bobinas > base * (base + 1) // 2:
+        return 0
+    # A maior camada tem `base` bobinas ou não
+    com_base = (
+        configuracoes_fileira(base - 1, bobinas - base, camadas - 1)
+        if bobinas >= base
+        else 0
+    )
+    return configuracoes_fileira(base - 1, bobinas, camadas) + com_base
+
+
+def _tabela_patio(num_fileiras: int, base: int, camadas: int, num_bobinas: int):
+    # tabela[r][n]: configurações de r fileiras com n bobinas no total
+    capacidade = min(base, camadas) * (2 * base - min(base, camadas) + 1) // 2
+    fileira = [
+        configuracoes_fileira(base, k, camadas)
+        for k in range(min(capacidade, num_bobinas) + 1)
+    ]
+    tabela = [[1] + [0] * num_bobinas]
+    for _ in range(num_fileiras):
+        anterior = tabela[-1]
+        tabela.append(
+            [
+                sum(
+                    fileira[k] * anterior[n - k]
+                    for k in range(min(n, len(fileira) - 1) + 1)
+                )
+                for n in range(num_bobinas + 1)
+            ]
+        )
+    return fileira, tabela
+
+
+def contar_configuracoes(
+    num_total_bobinas: int,
+    num_fileiras: int,
+    max_bobinas_base_fileira: int,
+    max_camadas: int = None,
+) -> int:
+    """
+    Número de configurações válidas do pátio com `num_total_bobinas`.
+    """
+    camadas = max_camadas or max_bobinas_base_fileira
+    _, tabela = _tabela_patio(
+        num_fileiras, max_bobinas_base_fileira, camadas, num_total_bobinas
+    )
+    return tabela[num_fileiras][num_total_bobinas]
+
+
+def _camadas_da_fileira(base: int, bobinas: int, camadas: int, indice: int):
+    # Configuração de número `indice` (0 <= indice < configuracoes_fileira)
+    contagens = []
+    while bobinas > 0:
+        com_base = (
+            configuracoes_fileira(base - 1, bobinas - base, camadas - 1)
+            if bobinas >= base
+            else 0
+        )
+        if indice < com_base:
+            contagens.append(base)
+            bobinas -= base
+            camadas -= 1
+        else:
+            indice -= com_base
+        base -= 1
+    return contagens
+
+
+def amostrar_configuracao(
+    num_total_bobinas: int,
+    num_fileiras: int,
+    max_bobinas_base_fileira: int,
+    max_camadas: int = None,
+    rng: random.Random = None,
+) -> Tuple[List[Tuple[int, int, int]], List[int]]:
+    """
+    Sorteia uma configuração uniforme entre todas as válidas com
+    `num_total_bobinas` bobinas. Mesmo retorno de distribuir_bobinas: a
+    lista (fileira, camada, posicao_na_camada) das bobinas, camada por
+    camada, e o array de ocupação na ordem de posicoes_do_lote.
+    """
+    rng = rng or random
+    posicoes = posicoes_do_lote(num_fileiras, max_bobinas_base_fileira, max_camadas)
+    camadas = max_camadas or max_bobinas_base_fileira
+    fileira, tabela = _tabela_patio(
+        num_fileiras, max_bobinas_base_fileira, camadas, num_total_bobinas
+    )
+    total = tabela[num_fileiras][num_total_bobinas]
+    if total == 0:
+        print(f"Erro: O número de bobinas ({num_total_bobinas}) excede a capacidade máxima "
+              f"do sistema ({len(posicoes)}) definida pelas dimensões.")
+        return [], [0] * len(posicoes)
+
+    # Um único inteiro uniforme em [0, total) define a configuração inteira
+    indice = rng.randrange(total)
+    restantes = num_total_bobinas
+    bobinas_colocadas = []
+    for r_idx in range(1, num_fileiras + 1):
+        outras = tabela[num_fileiras - r_idx]
+        for k in range(min(restantes, len(fileira) - 1) + 1):
+            bloco = fileira[k] * outras[restantes - k]
+            if indice < bloco:
+                break
+            indice -= bloco
+        indice_fileira, indice = divmod(indice, outras[restantes - k])
+        contagens = _camadas_da_fileira(
+            max_bobinas_base_fileira, k, camadas, indice_fileira
+        )
+        for l_idx, n_camada in enumerate(contagens, start=1):
+            bobinas_colocadas.extend((r_idx, l_idx, p) for p in range(1, n_camada + 1))
+        restantes -= k
+
+    conjunto = set(bobinas_colocadas)
+    ocupacao = [1 if posicao in conjunto else 0 for posicao in posicoes]
+    return bobinas_colocadas, ocupacao
+
+
+if __name__ == "__main__":
+    import collections
+    import contextlib
+    import io
+
+    from instancias_teste import distribuir_bobinas
+
+    num_bobinas, num_fileiras, base = 6, 2, 4
+    amostras = 20_000
+    total = contar_configuracoes(num_bobinas, num_fileiras, base)
+    print(f"\n{num_bobinas} bobinas, {num_fileiras} fileiras, base {base}:"
+          f" {total} configurações válidas")
+
+    random.seed(0)
+    uniforme = collections.Counter(
+        tuple(amostrar_configuracao(num_bobinas, num_fileiras, base)[1])
+        for _ in range(amostras)
+    )
+    sequencial = collections.Counter()
+    for _ in range(amostras):
+        with contextlib.redirect_stdout(io.StringIO()):
+            sequencial[tuple(distribuir_bobinas(num_bobinas, num_fileiras, base)[1])] += 1
+
+    for nome, contagem in (("uniforme", uniforme), ("distribuir_bobinas", sequencial)):
+        frequencias = sorted(contagem.values())
+        print(
+            f"{nome:>18}: {len(contagem):>3} configurações distintas,"
+            f" frequência mín. {frequencias[0]}, máx. {frequencias[-1]}"
+            f" (esperado {amostras / total:.0f})"
+        )
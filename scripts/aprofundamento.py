@@ -0,0 +1,233 @@
+"""
+Aprofundamento iterativo sobre o número de seções S.
+
+S define o tamanho de todos os blocos de variáveis: pequeno demais torna o
+modelo inviável, grande demais o infla. Aqui S parte de um limite inferior
+(limite_inferior_secoes) e cresce até o modelo ter solução. Posições,
+custos, janelas, arcos e a solução da heurística construtiva são calculados
+uma vez e reaproveitados em todos os passos; a solução é carregada como
+solução inicial de cada modelo.
+
+Cada passo é uma reconstrução completa, sem ModeloTemplate nem incumbente
+do passo anterior:
+- o template é chaveado por S e todos os blocos de variáveis têm dimensão S;
+- usar um único modelo com S_max seções e zerar W e V das seções >= S não
+  reproduz o modelo com S seções: x das seções extras passa a registrar a
+  movimentação da última seção, e R10 (no máximo uma bobina na saída) e R7
+  valem também depois dela, o que torna inviáveis instâncias com duas ou
+  mais bobinas de saída que o modelo com S seções aceita;
+- os passos anteriores não deixam incumbente: o laço para no primeiro S com
+  solução, então todo passo anterior terminou sem solução.
+Só a solução da heurística passa de um passo para o outro.
+
+Uso:
+    python scripts/aprofundamento.py
+"""
+
+import time
+import numpy as np
+
+from backends import criar_backend
+from heuristica import (
+    carregar_solucao_inicial,
+    heuristica_construtiva,
+    posicoes_iniciais,
+    vizinhanca_empilhamento,
+)
+from teste import construir_modelo, gerar_arcos
+
+
+def limite_inferior_secoes(Phi, I, O, A, A_in, A_out, ocupacao_inicial=None):
+    """
+    Menor S possível: cada bobina que entra ou sai e cada bobina que bloqueia
+    uma bobina de saída exigem uma movimentação carregada, cada seção tem
+    no máximo uma movimentação (R13) e R14 exige uma movimentação vazia na
+    seção anterior a cada carregada, exceto uma carregada na seção 0. L
+    carregadas ocupam portanto 2L - 1 seções.
+
+    A movimentação da última seção não é ligada a x (R16 só liga x[s] às
+    seções anteriores a s), então as bloqueadoras da bobina de saída movida
+    por último não precisam sair; o limite descarta as da bobina que deixa
+    menos realocações.
+    """
+    saida = len(Phi) - 1
+    posicao = posicoes_iniciais(ocupacao_inicial, A, A_in)
+    _, _, bloqueadores = vizinhanca_empilhamento(Phi, I, O)
+
+    ocupadas = set(posicao.values())
+    bloqueando = {
+        a: {j for j in bloqueadores[posicao[a]] if j in ocupadas}
+        for a in A_out
+        if posicao[a] != saida
+    }
+    realocadas = min(
+        (
+            len(set().union(*(b for c, b in bloqueando.items() if c != ultima)))
+            for ultima in bloqueando
+        ),
+        default=0,
+    )
+
+    tarefas = {a for a in set(A_in) | set(A_out) if posicao[a] != saida}
+    carregadas = len(tarefas) + realocadas
+    return max(1, 2 * carregadas - 1)
+
+
+def resolver_aprofundando(
+    posicoes,
+    custos,
+    A,
+    A_in,
+    A_out,
+    janelas,
+    ocupacao_inicial=None,
+    S_max=None,
+    passo: int = 1,
+    S_inicial=None,
+    solver: str = "gurobi",
+    arcos_esparsos: bool = False,
+    ocupacao: str = "acumulada",
+    limite_tempo=None,
+):
+    """
+    Resolve o modelo para S = limite inferior, S + passo, ... até S_max e
+    para no primeiro S com solução, construindo um modelo novo a cada S.
+    `S_inicial` substitui o limite inferior como primeiro S.
+
+    Sem `S_max`, usa o número de seções da heurística (ou o dobro do limite
+    inferior quando não há ocupação inicial). Retorna um dicionário com o S
+    encontrado (None se nenhum), o backend resolvido e o histórico
+    (S, status, objetivo, tempo de construção, tempo de resolução) de cada
+    passo; os backends dos passos sem solução são descartados.
+    """
+    Phi, I, O = posicoes["Phi"], posicoes["I"], posicoes["O"]
+    S = limite_inferior_secoes(Phi, I, O, A, A_in, A_out, ocupacao_inicial)
+    if S_inicial is not None:
+        S = S_inicial
+
+    solucao = None
+    if ocupacao_inicial is not None:
+        solucao = heuristica_construtiva(
+            Phi,
+            I,
+            O,
+            custos["t_load"],
+            custos["t_empty"],
+            custos["E_load"],
+            custos["E_empty"],
+            A,
+            A_in,
+            A_out,
+            ocupacao_inicial,
+            janelas,
+        )
+    if S_max is None:
+        S_max = max(S, solucao["num_secoes"]) if solucao else 2 * S
+
+    arcos = gerar_arcos(Phi, A, A_out) if arcos_esparsos else None
+
+    historico = []
+    while S <= S_max:
+        backend = criar_backend(solver)
+        inicio = time.perf_counter()
+        construir_modelo(
+            backend,
+            posicoes["Psi"],
+            posicoes["Psi1"],
+            posicoes["Psi2"],
+            Phi,
+            I,
+            O,
+            custos["t_load"],
+            custos["t_empty"],
+            custos["E_load"],
+            custos["E_empty"],
+            A,
+            A_in,
+            A_out,
+            S,
+            janelas,
+            arcos=arcos,
+            ocupacao=ocupacao,
+            ocupacao_inicial=ocupacao_inicial,
+        )
+        tempo_construcao = time.perf_counter() - inicio
+        if solucao is not None:
+            carregar_solucao_inicial(backend, solucao)
+
+        backend.resolver(limite_tempo=limite_tempo, silencioso=True)
+        historico.append(
+            {
+                "S": S,
+                "status": backend.status(),
+                "objetivo": backend.valor_objetivo(),
+                "construcao": tempo_construcao,
+                "resolucao": backend.tempo_execucao(),
+            }
+        )
+        if backend.tem_solucao():
+            return {"S": S, "backend": backend, "historico": historico}
+
+        backend.descartar()
+        S += passo
+
+    return {"S": None, "backend": None, "historico": historico}
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    from teste import gerar_custos_de_movimentacao, gerar_janelas_de_tempo, gerar_posicoes
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        posicoes = gerar_posicoes(1, 3, 1)
+        Phi = posicoes["Phi"]
+        A = [0, 1, 2]
+        A_out = [0, 1]
+        # Durações de até 1 (R8) para que as movimentações caibam nas seções
+        custos = gerar_custos_de_movimentacao(
+            Phi,
+            len(A),
+            "chebyshev",
+            velocidade_portico=60,
+            velocidade_carro=60,
+            velocidade_elevacao=30,
+        )
+    np.random.seed(0)
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    # Bobinas de saída 0 e 1, ambas sob a bloqueadora 2: três carregadas,
+    # S >= 5
+    indice = {p: i for i, p in enumerate(Phi)}
+    ocupacao_inicial = np.zeros((len(Phi), len(A)), dtype=int)
+    ocupacao_inicial[indice[(1, 1, 1)], 0] = 1
+    ocupacao_inicial[indice[(1, 1, 2)], 1] = 1
+    ocupacao_inicial[indice[(1, 2, 1)], 2] = 1
+
+    limite = limite_inferior_secoes(
+        Phi, posicoes["I"], posicoes["O"], A, [], A_out, ocupacao_inicial
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = resolver_aprofundando(
+            posicoes,
+            custos,
+            A,
+            [],
+            A_out,
+            janelas,
+            ocupacao_inicial,
+            arcos_esparsos=True,
+            ocupacao="fluxo",
+            # Duas seções abaixo do limite inferior, que devem ser inviáveis
+            S_inicial=limite - 2,
+        )
+
+    print(f"\n{'S':>3} {'status':>13} {'constr.(s)':>11} {'resol.(s)':>10} objetivo")
+    for passo in resultado["historico"]:
+        print(
+            f"{passo['S']:>3} {passo['status']:>13} {passo['construcao']:>11.4f}"
+            f" {passo['resolucao']:>10.4f} {passo['objetivo']}"
+        )
+    print("limite inferior:", limite, "S encontrado:", resultado["S"])
+    resultado["backend"].descartar()
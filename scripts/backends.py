@@ -0,0 +1,310 @@
+"""
+Camada de backends de solver para o modelo de armazenagem.
+
+Cada backend oferece a mesma interface para criação de variáveis, restrições
+lineares, objetivo, resolução, valores da solução e status, de forma que
+construir_modelo (teste.py) não dependa do gurobipy. As expressões lineares
+são as do próprio solver (LinExpr no Gurobi, highs_linear_expression no
+HiGHS), montadas com os operadores usuais e com `soma`.
+
+Backends disponíveis:
+- "gurobi": gurobipy (requer licença);
+- "highs": highspy (código aberto, `pip install highspy`).
+
+Cada backend é um modelo novo. Os modelos Gurobi são criados no ambiente
+compartilhado do processo (ambiente_gurobi), iniciado uma única vez, e um
+backend pode ser usado com `with` para que o modelo seja descartado ao sair
+do bloco.
+"""
+
+from itertools import product
+import numpy as np
+
+BINARIA = "binaria"
+CONTINUA = "continua"
+
+# Status normalizados
+OTIMO = "otimo"
+INVIAVEL = "inviavel"
+ILIMITADO = "ilimitado"
+LIMITE_TEMPO = "limite_tempo"
+OUTRO = "outro"
+
+
+def _normalizar_indices(indices):
+    """
+    Aceita um inteiro (n -> 0..n-1), uma tupla de dimensões ou uma sequência
+    de índices e retorna a lista de índices.
+    """
+    if isinstance(indices, int):
+        return list(range(indices))
+    if isinstance(indices, tuple) and all(isinstance(d, int) for d in indices):
+        return list(product(*(range(d) for d in indices)))
+    return list(indices)
+
+
+_ambiente_gurobi = None
+
+
+def ambiente_gurobi():
+    """
+    gurobipy.Env compartilhado pelos modelos do processo, iniciado (licença
+    e ambiente) na primeira chamada.
+    """
+    global _ambiente_gurobi
+    if _ambiente_gurobi is None:
+        from gurobipy import Env
+
+        _ambiente_gurobi = Env()
+    return _ambiente_gurobi
+
+
+def liberar_ambiente_gurobi():
+    """
+    Descarta o ambiente compartilhado (os modelos criados nele devem ter
+    sido descartados antes).
+    """
+    global _ambiente_gurobi
+    if _ambiente_gurobi is not None:
+        _ambiente_gurobi.dispose()
+        _ambiente_gurobi = None
+
+
+def _nome_indice(nome, indice):
+    if isinstance(indice, tuple):
+        return f"{nome}[{','.join(str(i) for i in indice)}]"
+    return f"{nome}[{indice}]"
+
+
+class BackendGurobi:
+    nome = "gurobi"
+
+    def __init__(self, model=None, nome_modelo="Armazenagem", env=None):
+        from gurobipy import GRB, Model, quicksum
+
+        self._GRB = GRB
+        self.soma = quicksum
+        if model is None:
+            model = Model(nome_modelo, env=env or ambiente_gurobi())
+        self.model = model
+
+    def adicionar_variaveis(self, indices, tipo=BINARIA, nome=""):
+        vtype = self._GRB.BINARY if tipo == BINARIA else self._GRB.CONTINUOUS
+        return self.model.addVars(
+            _normalizar_indices(indices), vtype=vtype, name=nome
+        )
+
+    def adicionar_restricao(self, restricao, nome=""):
+        return self.model.addConstr(restricao, name=nome)
+
+    def definir_objetivo(self, expressao):
+        self.model.setObjective(expressao, self._GRB.MINIMIZE)
+
+    def fixar(self, variavel, valor):
+        self.definir_limites(variavel, valor, valor)
+
+    def definir_limites(self, variavel, inferior, superior):
+        variavel.LB = inferior
+        variavel.UB = superior
+
+    def atualizar(self):
+        self.model.update()
+
+    def definir_solucao_inicial(self, valores):
+        """
+        Carrega valores iniciais (MIP start) a partir de {variavel: valor}.
+        """
+        self.model.setAttr("Start", list(valores.keys()), list(valores.values()))
+
+    def resolver(
+        self, limite_tempo=None, threads=None, silencioso=False, callback=None
+    ):
+        if limite_tempo is not None:
+            self.model.Params.TimeLimit = limite_tempo
+        if threads is not None:
+            self.model.Params.Threads = threads
+        # silencioso vale só para esta chamada
+        output_flag = self.model.Params.OutputFlag
+        if silencioso:
+            self.model.Params.OutputFlag = 0
+        try:
+            if callback is None:
+                self.model.optimize()
+            else:
+                self.model.optimize(callback)
+        finally:
+            self.model.Params.OutputFlag = output_flag
+
+    def status(self):
+        GRB = self._GRB
+        return {
+            GRB.OPTIMAL: OTIMO,
+            GRB.INFEASIBLE: INVIAVEL,
+            GRB.INF_OR_UNBD: INVIAVEL,
+            GRB.UNBOUNDED: ILIMITADO,
+            GRB.TIME_LIMIT: LIMITE_TEMPO,
+        }.get(self.model.Status, OUTRO)
+
+    def tem_solucao(self):
+        return self.model.SolCount > 0
+
+    def valor(self, variavel):
+        return variavel.X
+
+    def valores(self, variaveis):
+        chaves = list(variaveis.keys())
+        valores = self.model.getAttr("X", list(variaveis.values()))
+        return dict(zip(chaves, valores))
+
+    def valor_objetivo(self):
+        return self.model.ObjVal if self.tem_solucao() else None
+
+    def tempo_execucao(self):
+        return self.model.Runtime
+
+    def num_variaveis(self):
+        return self.model.NumVars
+
+    def num_restricoes(self):
+        return self.model.NumConstrs
+
+    def descartar(self):
+        self.model.dispose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.descartar()
+
+
+class BackendHighs:
+    nome = "highs"
+
+    def __init__(self, nome_modelo="Armazenagem"):
+        import highspy
+
+        self._highspy = highspy
+        self.model = highspy.Highs()
+        self.model.silent()
+        self.soma = highspy.Highs.qsum
+        self.nome_modelo = nome_modelo
+
+    def adicionar_variaveis(self, indices, tipo=BINARIA, nome=""):
+        indices = _normalizar_indices(indices)
+        if not indices:
+            return {}
+        nomes = [_nome_indice(nome, i) for i in indices]
+        if tipo == BINARIA:
+            return self.model.addVariables(
+                indices,
+                lb=0,
+                ub=1,
+                type=self._highspy.HighsVarType.kInteger,
+                name=nomes,
+            )
+        return self.model.addVariables(indices, lb=0, name=nomes)
+
+    def adicionar_restricao(self, restricao, nome=""):
+        return self.model.addConstr(restricao, name=nome)
+
+    def definir_objetivo(self, expressao):
+        self.model.setObjective(expressao, self._highspy.ObjSense.kMinimize)
+
+    def fixar(self, variavel, valor):
+        self.definir_limites(variavel, valor, valor)
+
+    def definir_limites(self, variavel, inferior, superior):
+        self.model.changeColBounds(variavel.index, inferior, superior)
+
+    def atualizar(self):
+        pass
+
+    def definir_solucao_inicial(self, valores):
+        """
+        Carrega valores iniciais (MIP start) a partir de {variavel: valor}.
+        """
+        indices = np.array([v.index for v in valores.keys()], dtype=np.int32)
+        self.model.setSolution(
+            len(indices), indices, np.array(list(valores.values()), dtype=float)
+        )
+
+    def resolver(self, limite_tempo=None, threads=None, silencioso=True):
+        if limite_tempo is not None:
+            self.model.setOptionValue("time_limit", float(limite_tempo))
+        if threads is not None:
+            self.model.setOptionValue("threads", int(threads))
+        self.model.setOptionValue("output_flag", not silencioso)
+        self.model.run()
+
+    def status(self):
+        status = self.model.getModelStatus()
+        Status = self._highspy.HighsModelStatus
+        return {
+            Status.kOptimal: OTIMO,
+            Status.kInfeasible: INVIAVEL,
+            Status.kUnboundedOrInfeasible: INVIAVEL,
+            Status.kUnbounded: ILIMITADO,
+            Status.kTimeLimit: LIMITE_TEMPO,
+        }.get(status, OUTRO)
+
+    def tem_solucao(self):
+        return self.model.getInfo().primal_solution_status == 2
+
+    def valor(self, variavel):
+        return self.model.val(variavel)
+
+    def valores(self, variaveis):
+        chaves = list(variaveis.keys())
+        valores = self.model.vals(list(variaveis.values()))
+        return dict(zip(chaves, valores))
+
+    def valor_objetivo(self):
+        if not self.tem_solucao():
+            return None
+        return self.model.getInfo().objective_function_value
+
+    def tempo_execucao(self):
+        return self.model.getRunTime()
+
+    def num_variaveis(self):
+        return self.model.getNumCol()
+
+    def num_restricoes(self):
+        return self.model.getNumRow()
+
+    def descartar(self):
+        self.model.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.descartar()
+
+
+BACKENDS = {
+    BackendGurobi.nome: BackendGurobi,
+    BackendHighs.nome: BackendHighs,
+}
+
+
+def criar_backend(nome: str = "gurobi", **kwargs):
+    """
+    Cria um backend pelo nome ("gurobi" ou "highs").
+    """
+    if nome not in BACKENDS:
+        raise ValueError(
+            f"Backend desconhecido: {nome}. Opções: {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[nome](**kwargs)
+
+
+def como_backend(model):
+    """
+    Retorna o backend de `model`: um backend é usado como está e um
+    gurobipy.Model é envolvido em BackendGurobi.
+    """
+    if hasattr(model, "adicionar_restricao"):
+        return model
+    return BackendGurobi(model)
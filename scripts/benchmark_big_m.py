@@ -0,0 +1,161 @@
+"""
+Compara o M fixo (M = 999) de R5–R7 com o M apertado por restrição
+(calcular_big_m): faixa dos valores de M e limitante da raiz, dado pela
+relaxação linear, de cada opção.
+
+O objetivo não depende de tau, então o M só muda o limitante pelas frações
+de x que R5–R7 admitem. Nos cenários de `testes` (R16 acumulada) a relaxação
+já é inviável com qualquer M. Em cenarios_big_m (R16 por fluxo, uma bobina
+de entrada) o M fixo deixa a relaxação viável, com limitante finito, e o M
+apertado de R5/R6 a torna inviável: a inviabilidade, que com M = 999 só
+apareceria com ramificação, é provada na raiz.
+
+Uso:
+    python scripts/benchmark_big_m.py
+"""
+
+from gurobipy import GRB, Model
+
+from teste import (
+    calcular_big_m,
+    construir_modelo,
+    gerar_custos_de_movimentacao,
+    gerar_janelas_de_tempo,
+    gerar_posicoes,
+    testes,
+)
+
+OPCOES = ("fixo", "apertado")
+
+cenarios_big_m = [
+    {
+        "num_fileiras": 1,
+        "num_posicoes_nivel_inferior": 3,
+        "num_entrada_saida": 1,
+        "num_bobinas": 2,
+        "num_bobinas_entrada": 1,
+        "num_bobinas_saida": 0,
+        "S": 2,
+        "ocupacao": "fluxo",
+    },
+    {
+        "num_fileiras": 1,
+        "num_posicoes_nivel_inferior": 2,
+        "num_entrada_saida": 1,
+        "num_bobinas": 1,
+        "num_bobinas_entrada": 1,
+        "num_bobinas_saida": 0,
+        "S": 2,
+        "ocupacao": "fluxo",
+    },
+]
+
+
+def limitante_raiz(teste, big_m, janelas, S=3, ocupacao="acumulada"):
+    """
+    Valor da relaxação linear do modelo (None se a relaxação é inviável).
+    """
+    posicoes = gerar_posicoes(
+        teste["num_fileiras"],
+        teste["num_posicoes_nivel_inferior"],
+        teste["num_entrada_saida"],
+    )
+    custos = gerar_custos_de_movimentacao(posicoes["Phi"], teste["num_bobinas"])
+    A = list(range(teste["num_bobinas"]))
+    A_in = list(range(teste["num_bobinas_entrada"]))
+    A_out = list(range(teste["num_bobinas_saida"]))
+
+    model = Model(f"Armazenagem_{big_m}")
+    model.Params.OutputFlag = 0
+    construir_modelo(
+        model,
+        posicoes["Psi"],
+        posicoes["Psi1"],
+        posicoes["Psi2"],
+        posicoes["Phi"],
+        posicoes["I"],
+        posicoes["O"],
+        custos["t_load"],
+        custos["t_empty"],
+        custos["E_load"],
+        custos["E_empty"],
+        A,
+        A_in,
+        A_out,
+        S,
+        janelas,
+        ocupacao=ocupacao,
+        big_m=big_m,
+    )
+
+    relaxado = model.relax()
+    relaxado.Params.OutputFlag = 0
+    relaxado.optimize()
+    limitante = relaxado.ObjVal if relaxado.Status == GRB.OPTIMAL else None
+
+    if big_m == "apertado":
+        limites_M = calcular_big_m(janelas, custos["t_load"], custos["t_empty"], S)
+        valores_M = [limites_M[r].min() for r in ("R5", "R6", "R7")] + [
+            limites_M[r].max() for r in ("R5", "R6", "R7")
+        ]
+        faixa_M = (min(valores_M), max(valores_M))
+    else:
+        faixa_M = (model._M, model._M)
+
+    relaxado.dispose()
+    model.dispose()
+    return limitante, faixa_M
+
+
+def benchmark(S=3, cenarios=None):
+    """
+    Limitante da raiz das duas opções em cada cenário (`testes` por padrão);
+    as chaves "S" e "ocupacao" de um cenário substituem os padrões.
+    """
+    resultados = []
+    for teste in testes if cenarios is None else cenarios:
+        # Mesmas janelas de tempo para as duas opções
+        janelas = gerar_janelas_de_tempo(teste["num_bobinas"])
+        limitantes = {}
+        for big_m in OPCOES:
+            limitantes[big_m] = limitante_raiz(
+                teste,
+                big_m,
+                janelas,
+                teste.get("S", S),
+                teste.get("ocupacao", "acumulada"),
+            )
+        resultados.append((teste, limitantes))
+    return resultados
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultados = benchmark() + benchmark(cenarios=cenarios_big_m)
+
+    print(
+        f"\n{'instância':>12} {'R16':>10} {'M':>9} {'faixa de M':>17} {'limitante raiz':>15}"
+        f" {'melhora':>16}"
+    )
+    for teste, limitantes in resultados:
+        nome = (
+            f"{teste['num_fileiras']}x{teste['num_posicoes_nivel_inferior']}"
+            f"x{teste['num_entrada_saida']}"
+        )
+        base = limitantes["fixo"][0]
+        for big_m in OPCOES:
+            limitante, (M_min, M_max) = limitantes[big_m]
+            if limitante is None:
+                texto = "inviável"
+                melhora = "inviável na raiz" if base is not None else "-"
+            else:
+                texto = f"{limitante:.2f}"
+                melhora = "-" if base is None else f"{limitante - base:.2f}"
+            print(
+                f"{nome:>12} {teste.get('ocupacao', 'acumulada'):>10} {big_m:>9}"
+                f" {M_min:>8.1f}–{M_max:<8.1f}"
+                f" {texto:>15} {melhora:>16}"
+            )
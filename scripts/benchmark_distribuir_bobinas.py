@@ -0,0 +1,53 @@
+"""
+Tempo de distribuir_bobinas (instancias_teste e instancias_teste2) em pátios
+de 1 mil a 100 mil bobinas. Com as contagens por fileira e camada o tempo
+por bobina fica praticamente constante.
+
+Uso:
+    python scripts/benchmark_distribuir_bobinas.py
+"""
+
+import random
+import time
+
+import instancias_teste
+import instancias_teste2
+
+MAX_BOBINAS_BASE_FILEIRA = 60
+BOBINAS_POR_FILEIRA = 100
+TAMANHOS = (1_000, 10_000, 100_000)
+
+
+def benchmark(tamanhos=TAMANHOS, semente=0):
+    """
+    Retorna (módulo, bobinas solicitadas, bobinas colocadas, posições,
+    tempo em s) para cada gerador e tamanho.
+    """
+    resultados = []
+    for modulo in (instancias_teste, instancias_teste2):
+        for num_bobinas in tamanhos:
+            num_fileiras = num_bobinas // BOBINAS_POR_FILEIRA
+            random.seed(semente)
+            inicio = time.perf_counter()
+            colocadas, ocupacao = modulo.distribuir_bobinas(
+                num_bobinas, num_fileiras, MAX_BOBINAS_BASE_FILEIRA
+            )
+            tempo = time.perf_counter() - inicio
+            resultados.append(
+                (modulo.__name__, num_bobinas, len(colocadas), len(ocupacao), tempo)
+            )
+    return resultados
+
+
+if __name__ == "__main__":
+    resultados = benchmark()
+
+    print(
+        f"\n{'gerador':>18} {'bobinas':>8} {'colocadas':>10} {'posições':>9}"
+        f" {'tempo (s)':>10} {'µs/bobina':>10}"
+    )
+    for nome, num_bobinas, colocadas, posicoes, tempo in resultados:
+        print(
+            f"{nome:>18} {num_bobinas:>8} {colocadas:>10} {posicoes:>9}"
+            f" {tempo:>10.4f} {tempo / num_bobinas * 1e6:>10.2f}"
+        )
@@ -0,0 +1,134 @@
+"""
+Compara as formulações de R16 (ocupacao_depende_movimentos_anteriores):
+"acumulada", que liga x[s] a x[0] pela soma de W de todas as seções
+anteriores, e "fluxo", que liga x[s] a x[s-1] apenas pelas movimentações da
+seção s-1. As duas têm uma linha por (k, s, a) e as mesmas soluções.
+
+Para cada cenário de `testes` reporta número de não-zeros, tempo de
+construção, tempo de resolução e status. Nesses cenários (poucas centenas
+de variáveis) a construção leva milissegundos e as duas formulações ficam
+empatadas: a diferença só aparece com mais seções e posições, porque o
+número de não-zeros de R16 acumulada cresce com S² (cada linha soma W das
+seções anteriores) e o de fluxo com S. Por isso os cenários de
+cenarios_construcao (comparar_construtores.py) também são medidos, apenas
+na construção.
+
+Uso:
+    python scripts/benchmark_ocupacao.py
+"""
+
+import time
+from gurobipy import Model
+
+from comparar_construtores import cenarios_construcao
+from teste import (
+    construir_modelo,
+    gerar_arcos,
+    gerar_custos_de_movimentacao,
+    gerar_janelas_de_tempo,
+    gerar_posicoes,
+    testes,
+)
+
+FORMULACOES = ("acumulada", "fluxo")
+
+
+def medir(teste, ocupacao, janelas, S=3, arcos_esparsos=False, resolver=True):
+    posicoes = gerar_posicoes(
+        teste["num_fileiras"],
+        teste["num_posicoes_nivel_inferior"],
+        teste["num_entrada_saida"],
+    )
+    custos = gerar_custos_de_movimentacao(posicoes["Phi"], teste["num_bobinas"])
+    A = list(range(teste["num_bobinas"]))
+    A_in = list(range(teste["num_bobinas_entrada"]))
+    A_out = list(range(teste["num_bobinas_saida"]))
+    arcos = gerar_arcos(posicoes["Phi"], A, A_out) if arcos_esparsos else None
+
+    model = Model(f"Armazenagem_{ocupacao}")
+    model.Params.OutputFlag = 0
+
+    inicio = time.perf_counter()
+    construir_modelo(
+        model,
+        posicoes["Psi"],
+        posicoes["Psi1"],
+        posicoes["Psi2"],
+        posicoes["Phi"],
+        posicoes["I"],
+        posicoes["O"],
+        custos["t_load"],
+        custos["t_empty"],
+        custos["E_load"],
+        custos["E_empty"],
+        A,
+        A_in,
+        A_out,
+        S,
+        janelas,
+        arcos=arcos,
+        ocupacao=ocupacao,
+    )
+    tempo_construcao = time.perf_counter() - inicio
+
+    model.update()
+    resultado = {
+        "nnz": model.NumNZs,
+        "restricoes": model.NumConstrs,
+        "construcao": tempo_construcao,
+        "resolucao": None,
+        "status": None,
+        "objetivo": None,
+    }
+    if resolver:
+        model.optimize()
+        resultado.update(
+            resolucao=model.Runtime,
+            status=model.Status,
+            objetivo=model.ObjVal if model.SolCount > 0 else None,
+        )
+    model.dispose()
+    return resultado
+
+
+def benchmark(S=3, arcos_esparsos=False, cenarios=None, resolver=True):
+    """
+    Mede as duas formulações em cada cenário (`testes` por padrão); o S de
+    um cenário com a chave "S" substitui o argumento.
+    """
+    resultados = []
+    for teste in testes if cenarios is None else cenarios:
+        # Mesmas janelas de tempo para as duas formulações
+        janelas = gerar_janelas_de_tempo(teste["num_bobinas"])
+        for ocupacao in FORMULACOES:
+            resultado = medir(
+                teste, ocupacao, janelas, teste.get("S", S), arcos_esparsos, resolver
+            )
+            resultados.append((teste, ocupacao, resultado))
+    return resultados
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultados = benchmark()
+        resultados += benchmark(cenarios=cenarios_construcao, resolver=False)
+
+    print(
+        f"\n{'instância':>12} {'S':>3} {'R16':>10} {'nnz':>8} {'restr.':>7}"
+        f" {'constr.(s)':>11} {'resol.(s)':>10} {'status':>7} objetivo"
+    )
+    for teste, ocupacao, r in resultados:
+        nome = (
+            f"{teste['num_fileiras']}x{teste['num_posicoes_nivel_inferior']}"
+            f"x{teste['num_entrada_saida']}"
+        )
+        resolucao = "-" if r["resolucao"] is None else f"{r['resolucao']:.4f}"
+        status = "-" if r["status"] is None else r["status"]
+        print(
+            f"{nome:>12} {teste.get('S', 3):>3} {ocupacao:>10} {r['nnz']:>8}"
+            f" {r['restricoes']:>7} {r['construcao']:>11.4f} {resolucao:>10}"
+            f" {status:>7} {r['objetivo']}"
+        )
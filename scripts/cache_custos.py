@@ -0,0 +1,108 @@
+"""
+Cache em disco das matrizes de custo de movimentação.
+
+As matrizes de gerar_custos_de_movimentacao são gravadas como .npy em um
+diretório por chave (hash da lista de posições Phi e dos parâmetros do
+modelo de cinemática) e reabertas com np.load(mmap_mode="r"): a
+inicialização fica barata e vários processos compartilham a mesma cópia
+física das matrizes.
+
+E_load não é gravada: ela é refeita a partir de t_load pelo modelo de
+cinemática (uma visão sem cópia, ou o termo por peso quando há `pesos`).
+
+Uso:
+    python scripts/cache_custos.py
+"""
+
+import hashlib
+import json
+import os
+import time
+import numpy as np
+
+from cinematica import como_cinematica
+from teste import gerar_custos_de_movimentacao
+
+DIRETORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_custos")
+
+MATRIZES = ("t_load", "t_empty", "E_empty")
+
+
+def chave_custos(Phi, cinematica):
+    """
+    Hash das posições e dos parâmetros do modelo de cinemática.
+    """
+    resumo = hashlib.sha256()
+    resumo.update(np.ascontiguousarray(np.asarray(Phi, dtype=np.float64)).tobytes())
+    resumo.update(json.dumps(cinematica.parametros(), sort_keys=True).encode())
+    return resumo.hexdigest()[:32]
+
+
+def _gravar(diretorio, custos):
+    # Grava em um diretório temporário e renomeia, para que outro processo
+    # nunca abra um cache incompleto
+    temporario = f"{diretorio}.tmp{os.getpid()}"
+    os.makedirs(temporario, exist_ok=True)
+    for nome in MATRIZES:
+        np.save(os.path.join(temporario, f"{nome}.npy"), custos[nome])
+    try:
+        os.rename(temporario, diretorio)
+    except OSError:
+        # Outro processo gravou primeiro
+        for nome in MATRIZES:
+            os.remove(os.path.join(temporario, f"{nome}.npy"))
+        os.rmdir(temporario)
+
+
+def obter_custos_de_movimentacao(
+    Phi, A_size, cinematica=None, pesos=None, *, diretorio=None, **parametros
+):
+    """
+    Mesmo resultado de gerar_custos_de_movimentacao, lido do cache em disco
+    (somente leitura, mapeado em memória) e calculado apenas na primeira vez
+    para cada combinação de posições e modelo de cinemática. Os argumentos
+    seguem a ordem de gerar_custos_de_movimentacao; `diretorio` só por nome.
+    """
+    cinematica = como_cinematica(cinematica, **parametros)
+    diretorio = os.path.join(
+        diretorio or DIRETORIO_CACHE, chave_custos(Phi, cinematica)
+    )
+    if not os.path.isdir(diretorio):
+        os.makedirs(os.path.dirname(diretorio), exist_ok=True)
+        _gravar(diretorio, gerar_custos_de_movimentacao(Phi, A_size, cinematica))
+
+    custos = {
+        nome: np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode="r")
+        for nome in MATRIZES
+    }
+    custos["E_load_base"], custos["E_load"], _ = cinematica.energias(
+        custos["t_load"], custos["t_empty"], A_size, pesos
+    )
+    return custos
+
+
+def limpar_cache(diretorio=None):
+    import shutil
+
+    shutil.rmtree(diretorio or DIRETORIO_CACHE, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    from teste import gerar_posicoes
+
+    posicoes = gerar_posicoes(20, 30, 2)
+    Phi = posicoes["Phi"]
+
+    inicio = time.perf_counter()
+    gerar_custos_de_movimentacao(Phi, 100)
+    tempo_calculo = time.perf_counter() - inicio
+
+    obter_custos_de_movimentacao(Phi, 100)  # garante o cache
+    inicio = time.perf_counter()
+    custos = obter_custos_de_movimentacao(Phi, 100)
+    tempo_cache = time.perf_counter() - inicio
+
+    print(f"\n{len(Phi)} posições")
+    print(f"cálculo:           {tempo_calculo:.4f} s")
+    print(f"leitura do cache:  {tempo_cache:.4f} s")
+    print("mapeado em memória:", isinstance(custos["t_load"], np.memmap))
@@ -0,0 +1,205 @@
+"""
+Cache de resultados de resolução, endereçado pelo conteúdo da entrada.
+
+A chave é o hash canônico de tudo o que define a resolução (posições,
+matrizes de custo, janelas de tempo, conjuntos de bobinas, ocupação
+inicial, S e opções do solver). Cada resultado (status, objetivo, tempo de
+execução e a sequência de movimentos decodificada) é um arquivo JSON no
+diretório do cache; ao passar de `limite_bytes` os menos usados
+recentemente (pela data de modificação, atualizada a cada acerto) são
+removidos. Com ativo=False o cache é ignorado.
+
+Uso:
+    python scripts/cache_resultados.py
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+
+DIRETORIO_CACHE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cache_resultados"
+)
+
+
+def _atualizar_hash(resumo, nome, valor):
+    resumo.update(nome.encode())
+    if isinstance(valor, dict):
+        for chave in sorted(valor):
+            _atualizar_hash(resumo, f"{nome}.{chave}", valor[chave])
+    elif isinstance(valor, (np.ndarray, list, tuple)) and not (
+        isinstance(valor, (list, tuple)) and valor and isinstance(valor[0], str)
+    ):
+        array = np.asarray(valor)
+        resumo.update(str(array.shape).encode())
+        # Visões de np.broadcast_to (E_load de gerar_custos_de_movimentacao):
+        # os eixos de passo 0 entram uma vez só, sem materializar a visão
+        repetidos = [
+            eixo
+            for eixo, passo in enumerate(array.strides)
+            if passo == 0 and array.shape[eixo] > 1
+        ]
+        if repetidos:
+            resumo.update(f"repetidos{repetidos}".encode())
+            array = array[
+                tuple(
+                    slice(0, 1) if eixo in repetidos else slice(None)
+                    for eixo in range(array.ndim)
+                )
+            ]
+        resumo.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    else:
+        resumo.update(json.dumps(valor, sort_keys=True).encode())
+
+
+def chave_resolucao(**entrada):
+    """
+    Hash canônico (independe da ordem dos argumentos e do dtype dos arrays)
+    da entrada da resolução. Um array difundido (np.broadcast_to) é resumido
+    pela sua base e pela forma, então tem chave diferente da sua cópia
+    materializada.
+    """
+    resumo = hashlib.sha256()
+    for nome in sorted(entrada):
+        _atualizar_hash(resumo, nome, entrada[nome])
+    return resumo.hexdigest()[:32]
+
+
+def decodificar_movimentos(backend, modelo, bobinas=None):
+    """
+    Sequência de movimentos da solução: (s, "carregado", k, q, a) para W e
+    (s, "vazio", k, q, None) para V. `modelo` guarda os handles (_W, _V) e
+    `bobinas` mapeia o índice de cada bobina no modelo para o original
+    (após o presolve).
+    """
+    if not backend.tem_solucao():
+        return []
+    W, V = modelo._W, modelo._V
+    if hasattr(W, "shape"):
+        valores_W = {tuple(i): 1 for i in np.argwhere(W.X > 0.5)}
+        valores_V = {tuple(i): 1 for i in np.argwhere(V.X > 0.5)}
+    else:
+        valores_W = backend.valores(W)
+        valores_V = backend.valores(V)
+    movimentos = [
+        (int(s), "carregado", int(k), int(q), int(a if bobinas is None else bobinas[a]))
+        for (s, k, q, a), valor in valores_W.items()
+        if valor > 0.5
+    ]
+    movimentos += [
+        (int(s), "vazio", int(k), int(q), None)
+        for (s, k, q), valor in valores_V.items()
+        if valor > 0.5
+    ]
+    return sorted(movimentos, key=lambda m: (m[0], m[1]))
+
+
+class CacheResultados:
+    def __init__(self, diretorio=None, limite_bytes=64 * 2**20, ativo=True):
+        self.diretorio = diretorio or DIRETORIO_CACHE
+        self.limite_bytes = limite_bytes
+        self.ativo = ativo
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.json")
+
+    def obter(self, chave):
+        """
+        Resultado guardado para `chave` (None se não há ou se o cache está
+        desativado).
+        """
+        if not self.ativo:
+            return None
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho) as arquivo:
+                resultado = json.load(arquivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        os.utime(caminho)  # usado agora: fim da fila do LRU
+        resultado["movimentos"] = [tuple(m) for m in resultado["movimentos"]]
+        return resultado
+
+    def gravar(self, chave, resultado):
+        if not self.ativo:
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = f"{self._caminho(chave)}.tmp{os.getpid()}"
+        with open(temporario, "w") as arquivo:
+            json.dump(resultado, arquivo)
+        os.replace(temporario, self._caminho(chave))
+        self._remover_excedentes()
+
+    def _remover_excedentes(self):
+        entradas = []
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(".json"):
+                caminho = os.path.join(self.diretorio, nome)
+                estado = os.stat(caminho)
+                entradas.append((estado.st_mtime, estado.st_size, caminho))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            os.remove(caminho)
+            total -= tamanho
+
+    def limpar(self):
+        import shutil
+
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import tempfile
+    import time
+
+    from teste import (
+        gerar_custos_de_movimentacao,
+        gerar_janelas_de_tempo,
+        gerar_modelo,
+        gerar_posicoes,
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        posicoes = gerar_posicoes(1, 3, 1)
+    Phi = posicoes["Phi"]
+    A = list(range(2))
+    custos = gerar_custos_de_movimentacao(Phi, len(A))
+    ocupacao_inicial = np.zeros((len(Phi), len(A)), dtype=int)
+    ocupacao_inicial[1, 0] = ocupacao_inicial[3, 1] = 1
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    cache = CacheResultados(diretorio=tempfile.mkdtemp())
+    tempos = []
+    for cache_usado in (cache, cache, CacheResultados(ativo=False)):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = gerar_modelo(
+                posicoes["Psi"],
+                posicoes["Psi1"],
+                posicoes["Psi2"],
+                Phi,
+                posicoes["I"],
+                posicoes["O"],
+                custos["t_load"],
+                custos["t_empty"],
+                custos["E_load"],
+                custos["E_empty"],
+                A,
+                [],
+                [],
+                3,
+                ocupacao_inicial=ocupacao_inicial,
+                cache=cache_usado,
+                janelas=janelas,
+            )
+        tempos.append(time.perf_counter() - inicio)
+        print(
+            f"em cache: {resultado['em_cache']!s:>5}  status: {resultado['status']}"
+            f"  objetivo: {resultado['objetivo']}  tempo: {tempos[-1]:.4f} s"
+        )
+    cache.limpar()
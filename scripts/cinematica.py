@@ -0,0 +1,217 @@
+"""
+Modelos de cinemática da ponte rolante para as matrizes de tempo e energia.
+
+Cada modelo recebe o array de posições (n, 3) no formato (fileira, nível,
+coluna) e devolve as matrizes t_load e t_empty inteiras em uma chamada
+vetorizada. A energia é comum a todos os modelos: E_empty = t_empty ·
+energia_vazio e E_load[k, q, a] = t_load[k, q] · (energia_carregado +
+energia_por_peso · peso[a]); sem pesos, E_load é uma visão (broadcast) de
+t_load · energia_carregado.
+
+Modelos disponíveis:
+- "padrao": fórmula original de gerar_custos_de_movimentacao;
+- "chebyshev": pórtico e carro se movem ao mesmo tempo (tempo horizontal é
+  o máximo dos dois eixos) com velocidade constante;
+- "aceleracao": como "chebyshev", com perfil trapezoidal (aceleração e
+  desaceleração) em cada eixo.
+"""
+
+import math
+import numpy as np
+
+
+def tempo_trapezoidal(distancia, velocidade_maxima, aceleracao):
+    """
+    Tempo para percorrer `distancia` partindo e chegando parado, com
+    aceleração e desaceleração `aceleracao` e velocidade limitada a
+    `velocidade_maxima` (perfil triangular quando não há trecho de cruzeiro).
+    """
+    distancia = np.abs(distancia)
+    distancia_rampas = velocidade_maxima**2 / aceleracao
+    return np.where(
+        distancia < distancia_rampas,
+        2 * np.sqrt(distancia / aceleracao),
+        distancia / velocidade_maxima + velocidade_maxima / aceleracao,
+    )
+
+
+class Cinematica:
+    """
+    Base dos modelos: subclasses implementam `tempos`.
+    """
+
+    nome = None
+
+    def __init__(
+        self,
+        fator_vazio=0.9,
+        energia_vazio=20,
+        energia_carregado=100,
+        energia_por_peso=0.0,
+    ):
+        self.fator_vazio = fator_vazio
+        self.energia_vazio = energia_vazio
+        self.energia_carregado = energia_carregado
+        self.energia_por_peso = energia_por_peso
+
+    def parametros(self):
+        """
+        Nome e parâmetros do modelo (usados como chave de cache).
+        """
+        return {"nome": self.nome, **vars(self)}
+
+    def tempos(self, posicoes):
+        raise NotImplementedError
+
+    def energias(self, t_load, t_empty, num_bobinas, pesos=None):
+        """
+        Retorna (E_load_base, E_load, E_empty). E_load_base é a parte que não
+        depende da bobina.
+        """
+        num_Phi = t_load.shape[0]
+        E_empty = t_empty * self.energia_vazio
+        E_load_base = t_load * self.energia_carregado
+        if pesos is None or self.energia_por_peso == 0:
+            E_load = np.broadcast_to(
+                E_load_base[:, :, None], (num_Phi, num_Phi, num_bobinas)
+            )
+        else:
+            pesos = np.asarray(pesos, dtype=float)[:num_bobinas]
+            E_load = E_load_base[:, :, None] + (
+                t_load[:, :, None] * self.energia_por_peso * pesos[None, None, :]
+            )
+        return E_load_base, E_load, E_empty
+
+
+class CinematicaPadrao(Cinematica):
+    nome = "padrao"
+
+    def __init__(self, peso_vertical=20, peso_horizontal=10, **kwargs):
+        super().__init__(**kwargs)
+        self.peso_vertical = peso_vertical
+        self.peso_horizontal = peso_horizontal
+
+    def tempos(self, posicoes):
+        fileira, nivel, coluna = posicoes[:, 0], posicoes[:, 1], posicoes[:, 2]
+        t_vertical = (3 - nivel)[:, None] + (3 - nivel)[None, :]
+        t_horizontal = (
+            (fileira[None, :] - fileira[:, None])
+            + (coluna[None, :] - coluna[:, None])
+        ) * 0.5 / math.sqrt(2)
+        ## TODO: Avaliar pesos abaixo
+        t_load = t_vertical * self.peso_vertical + t_horizontal * self.peso_horizontal
+        np.fill_diagonal(t_load, 0.0)
+        return t_load, t_load * self.fator_vazio
+
+
+class CinematicaChebyshev(Cinematica):
+    """
+    Pórtico (entre fileiras) e carro (entre colunas) em movimento simultâneo
+    a velocidade constante; a elevação sobe do nível de origem até a altura
+    de transporte e desce até o nível de destino.
+    """
+
+    nome = "chebyshev"
+
+    def __init__(
+        self,
+        velocidade_portico=1.0,
+        velocidade_carro=1.0,
+        velocidade_elevacao=0.5,
+        distancia_fileira=2.0,
+        distancia_coluna=1.0,
+        altura_nivel=1.0,
+        nivel_transporte=3,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.velocidade_portico = velocidade_portico
+        self.velocidade_carro = velocidade_carro
+        self.velocidade_elevacao = velocidade_elevacao
+        self.distancia_fileira = distancia_fileira
+        self.distancia_coluna = distancia_coluna
+        self.altura_nivel = altura_nivel
+        self.nivel_transporte = nivel_transporte
+
+    def _deslocamentos(self, posicoes):
+        fileira, nivel, coluna = posicoes[:, 0], posicoes[:, 1], posicoes[:, 2]
+        dy = (fileira[None, :] - fileira[:, None]) * self.distancia_fileira
+        dx = (coluna[None, :] - coluna[:, None]) * self.distancia_coluna
+        subida = (self.nivel_transporte - nivel) * self.altura_nivel
+        return dy, dx, subida
+
+    def tempos(self, posicoes):
+        dy, dx, subida = self._deslocamentos(posicoes)
+        t_horizontal = np.maximum(
+            np.abs(dy) / self.velocidade_portico,
+            np.abs(dx) / self.velocidade_carro,
+        )
+        t_elevacao = subida / self.velocidade_elevacao
+        t_load = t_elevacao[:, None] + t_horizontal + t_elevacao[None, :]
+        np.fill_diagonal(t_load, 0.0)
+        return t_load, t_load * self.fator_vazio
+
+
+class CinematicaAceleracao(CinematicaChebyshev):
+    """
+    Como CinematicaChebyshev, com perfil trapezoidal em cada eixo.
+    """
+
+    nome = "aceleracao"
+
+    def __init__(
+        self,
+        aceleracao_portico=0.5,
+        aceleracao_carro=0.5,
+        aceleracao_elevacao=0.3,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.aceleracao_portico = aceleracao_portico
+        self.aceleracao_carro = aceleracao_carro
+        self.aceleracao_elevacao = aceleracao_elevacao
+
+    def tempos(self, posicoes):
+        dy, dx, subida = self._deslocamentos(posicoes)
+        t_horizontal = np.maximum(
+            tempo_trapezoidal(dy, self.velocidade_portico, self.aceleracao_portico),
+            tempo_trapezoidal(dx, self.velocidade_carro, self.aceleracao_carro),
+        )
+        t_elevacao = tempo_trapezoidal(
+            subida, self.velocidade_elevacao, self.aceleracao_elevacao
+        )
+        t_load = t_elevacao[:, None] + t_horizontal + t_elevacao[None, :]
+        np.fill_diagonal(t_load, 0.0)
+        return t_load, t_load * self.fator_vazio
+
+
+CINEMATICAS = {
+    CinematicaPadrao.nome: CinematicaPadrao,
+    CinematicaChebyshev.nome: CinematicaChebyshev,
+    CinematicaAceleracao.nome: CinematicaAceleracao,
+}
+
+
+def criar_cinematica(nome: str = "padrao", **kwargs):
+    """
+    Cria um modelo de cinemática pelo nome ("padrao", "chebyshev" ou
+    "aceleracao").
+    """
+    if nome not in CINEMATICAS:
+        raise ValueError(
+            f"Cinemática desconhecida: {nome}. Opções: {', '.join(CINEMATICAS)}"
+        )
+    return CINEMATICAS[nome](**kwargs)
+
+
+def como_cinematica(cinematica=None, **kwargs):
+    """
+    Aceita um modelo pronto, um nome ou None (modelo padrão com `kwargs`).
+    """
+    if cinematica is None:
+        return CinematicaPadrao(**kwargs)
+    if isinstance(cinematica, str):
+        return criar_cinematica(cinematica, **kwargs)
+    if kwargs:
+        raise ValueError("Parâmetros só podem ser passados com o nome do modelo.")
+    return cinematica
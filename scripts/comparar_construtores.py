@@ -0,0 +1,245 @@
+"""
+Compara a construção do modelo por laços (construir_modelo) com a construção
+matricial (construir_modelo_matricial): tempo de construção de cada caminho e
+verificação de que os dois modelos são iguais.
+
+Nos cenários de `testes` (poucas dezenas de variáveis) a construção
+matricial é mais lenta que a por laços: o custo fixo de montar as MVar e os
+MLinExpr domina. Ela passa a compensar a partir de layouts como 2x6x1 com 6
+bobinas e 5 seções (cenarios_construcao), em que a construção por laços leva
+frações de segundo ou mais.
+
+Nos cenários de cenarios_highs o modelo por laços também é construído e
+resolvido no backend HiGHS (comparar_highs), o que cobre as restrições com M
+de R5–R7; a coluna "HiGHS" mostra o status do Gurobi e se status e objetivo
+coincidem nos dois backends.
+
+Uso:
+    python scripts/comparar_construtores.py
+"""
+
+import time
+import numpy as np
+from gurobipy import Model
+
+from backends import BackendGurobi, BackendHighs
+from teste import (
+    construir_modelo,
+    gerar_custos_de_movimentacao,
+    gerar_janelas_de_tempo,
+    gerar_posicoes,
+    testes,
+)
+from modelo_matricial import construir_modelo_matricial
+
+
+def modelos_iguais(model_a, model_b, tol=1e-9) -> bool:
+    """
+    Verifica se dois modelos têm a mesma matriz de restrições, lados direitos,
+    sentidos, limites, tipos de variáveis e objetivo. Os nomes são ignorados.
+    """
+    if (model_a.NumVars, model_a.NumConstrs) != (model_b.NumVars, model_b.NumConstrs):
+        return False
+
+    A_a = model_a.getA().tocsr()
+    A_b = model_b.getA().tocsr()
+    A_a.sum_duplicates()
+    A_b.sum_duplicates()
+    A_a.eliminate_zeros()
+    A_b.eliminate_zeros()
+    diferenca = abs(A_a - A_b)
+    if diferenca.nnz and diferenca.max() > tol:
+        return False
+
+    vars_a = model_a.getVars()
+    vars_b = model_b.getVars()
+    constrs_a = model_a.getConstrs()
+    constrs_b = model_b.getConstrs()
+    for attr, objs_a, objs_b in (
+        ("LB", vars_a, vars_b),
+        ("UB", vars_a, vars_b),
+        ("Obj", vars_a, vars_b),
+        ("RHS", constrs_a, constrs_b),
+    ):
+        valores_a = np.array(model_a.getAttr(attr, objs_a), dtype=float)
+        valores_b = np.array(model_b.getAttr(attr, objs_b), dtype=float)
+        if not np.allclose(valores_a, valores_b, atol=tol):
+            return False
+
+    return (
+        model_a.getAttr("VType", vars_a) == model_b.getAttr("VType", vars_b)
+        and model_a.getAttr("Sense", constrs_a) == model_b.getAttr("Sense", constrs_b)
+        and model_a.ModelSense == model_b.ModelSense
+        and abs(model_a.ObjCon - model_b.ObjCon) <= tol
+    )
+
+
+# Cenário pequeno com solução (uma bobina de saída, sem entrada), para que
+# a comparação com o HiGHS não se limite a modelos inviáveis
+cenarios_highs = testes + [
+    {
+        "num_fileiras": 1,
+        "num_posicoes_nivel_inferior": 3,
+        "num_entrada_saida": 1,
+        "num_bobinas": 2,
+        "num_bobinas_entrada": 0,
+        "num_bobinas_saida": 1,
+    },
+]
+
+# Cenários em que o tempo de construção importa (S em cada cenário)
+cenarios_construcao = [
+    {
+        "num_fileiras": 2,
+        "num_posicoes_nivel_inferior": 6,
+        "num_entrada_saida": 1,
+        "num_bobinas": 6,
+        "num_bobinas_entrada": 1,
+        "num_bobinas_saida": 2,
+        "S": 5,
+    },
+    {
+        "num_fileiras": 3,
+        "num_posicoes_nivel_inferior": 8,
+        "num_entrada_saida": 1,
+        "num_bobinas": 8,
+        "num_bobinas_entrada": 1,
+        "num_bobinas_saida": 2,
+        "S": 6,
+    },
+]
+
+
+def comparar(teste, S=3, ocupacao="acumulada", big_m="fixo"):
+    posicoes = gerar_posicoes(
+        teste["num_fileiras"],
+        teste["num_posicoes_nivel_inferior"],
+        teste["num_entrada_saida"],
+    )
+    custos = gerar_custos_de_movimentacao(posicoes["Phi"], teste["num_bobinas"])
+    A = list(range(teste["num_bobinas"]))
+    A_in = list(range(teste["num_bobinas_entrada"]))
+    A_out = list(range(teste["num_bobinas_saida"]))
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    tempos = {}
+    modelos = {}
+    for nome, construtor in (
+        ("laços", construir_modelo),
+        ("matricial", construir_modelo_matricial),
+    ):
+        model = Model(f"Armazenagem_{nome}")
+        inicio = time.perf_counter()
+        construtor(
+            model,
+            posicoes["Psi"],
+            posicoes["Psi1"],
+            posicoes["Psi2"],
+            posicoes["Phi"],
+            posicoes["I"],
+            posicoes["O"],
+            custos["t_load"],
+            custos["t_empty"],
+            custos["E_load"],
+            custos["E_empty"],
+            A,
+            A_in,
+            A_out,
+            S,
+            janelas,
+            ocupacao=ocupacao,
+            big_m=big_m,
+        )
+        tempos[nome] = time.perf_counter() - inicio
+        modelos[nome] = model
+
+    iguais = modelos_iguais(modelos["laços"], modelos["matricial"])
+    for model in modelos.values():
+        model.dispose()
+
+    return tempos, iguais
+
+
+def comparar_highs(teste, S=3, ocupacao="acumulada", big_m="fixo"):
+    """
+    Constrói o modelo por laços nos backends Gurobi e HiGHS, resolve os dois
+    e retorna o status do Gurobi e se status e objetivo coincidem.
+    """
+    posicoes = gerar_posicoes(
+        teste["num_fileiras"],
+        teste["num_posicoes_nivel_inferior"],
+        teste["num_entrada_saida"],
+    )
+    custos = gerar_custos_de_movimentacao(posicoes["Phi"], teste["num_bobinas"])
+    A = list(range(teste["num_bobinas"]))
+    A_in = list(range(teste["num_bobinas_entrada"]))
+    A_out = list(range(teste["num_bobinas_saida"]))
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    resultados = []
+    for backend in (BackendGurobi(), BackendHighs()):
+        with backend:
+            construir_modelo(
+                backend,
+                posicoes["Psi"],
+                posicoes["Psi1"],
+                posicoes["Psi2"],
+                posicoes["Phi"],
+                posicoes["I"],
+                posicoes["O"],
+                custos["t_load"],
+                custos["t_empty"],
+                custos["E_load"],
+                custos["E_empty"],
+                A,
+                A_in,
+                A_out,
+                S,
+                janelas,
+                ocupacao=ocupacao,
+                big_m=big_m,
+            )
+            backend.resolver(silencioso=True)
+            resultados.append((backend.status(), backend.valor_objetivo()))
+
+    (status_gurobi, objetivo_gurobi), (status_highs, objetivo_highs) = resultados
+    if objetivo_gurobi is None or objetivo_highs is None:
+        mesmo_objetivo = objetivo_gurobi is objetivo_highs
+    else:
+        mesmo_objetivo = abs(objetivo_gurobi - objetivo_highs) <= 1e-6 * max(
+            1.0, abs(objetivo_gurobi)
+        )
+    return status_gurobi, status_gurobi == status_highs and mesmo_objetivo
+
+
+if __name__ == "__main__":
+    resultados = []
+    for teste in cenarios_highs + cenarios_construcao:
+        for ocupacao in ("acumulada", "fluxo"):
+            for big_m in ("fixo", "apertado"):
+                tempos, iguais = comparar(
+                    teste, S=teste.get("S", 3), ocupacao=ocupacao, big_m=big_m
+                )
+                highs = (
+                    comparar_highs(teste, ocupacao=ocupacao, big_m=big_m)
+                    if teste in cenarios_highs
+                    else None
+                )
+                resultados.append((teste, ocupacao, big_m, tempos, iguais, highs))
+
+    print("\nTempo de construção (s)")
+    print(
+        f"{'instância':>12} {'S':>3} {'R16':>10} {'M':>9} {'laços':>10} {'matricial':>10}"
+        f" {'speedup':>8} {'iguais':>6} HiGHS"
+    )
+    for teste, ocupacao, big_m, tempos, iguais, highs in resultados:
+        nome = (
+            f"{teste['num_fileiras']}x{teste['num_posicoes_nivel_inferior']}"
+            f"x{teste['num_entrada_saida']}"
+        )
+        print(
+            f"{nome:>12} {teste.get('S', 3):>3} {ocupacao:>10} {big_m:>9} {tempos['laços']:>10.4f}"
+            f" {tempos['matricial']:>10.4f}"
+            f" {tempos['laços'] / tempos['matricial']:>8.1f} {iguais!s:>6}"
+            f" {'-' if highs is None else f'{highs[0]} {highs[1]}'}"
+        )
@@ -0,0 +1,249 @@
+"""
+Restrições de empilhamento R17–R19 como restrições lazy (Gurobi).
+
+Com empilhamento="lazy", construir_modelo não adiciona R17 (vizinho
+superior), R18 (vizinho inferior) e R19 (inferiores ocupados); guarda apenas
+os índices de cada uma em model._empilhamento. callback_empilhamento
+verifica cada solução incumbente e adiciona como corte lazy somente as
+restrições violadas.
+
+O `__main__` compara os dois modos. Nos cenários resolvidos (bobina de saída
+sob uma bloqueadora, R16 "fluxo", arcos esparsos) o tamanho é limitado pela
+licença restrita do Gurobi (2000 variáveis), e ali a resolução leva
+centésimos de segundo nos dois modos: o modo lazy retira cerca de 15% das
+linhas (R17–R19), mas a incumbente viola algumas delas e os cortes e o
+callback deixam a resolução mais lenta que a do modelo explícito. Nos
+cenários de cenarios_construcao (comparar_construtores.py), com dezenas de
+milhares de variáveis, apenas a construção é medida; a comparação da
+resolução nesses tamanhos precisa de uma licença completa.
+
+Uso:
+    python scripts/cortes_empilhamento.py
+"""
+
+import time
+import numpy as np
+from gurobipy import GRB, Model, quicksum
+
+from teste import (
+    construir_modelo,
+    gerar_arcos,
+    gerar_custos_de_movimentacao,
+    gerar_janelas_de_tempo,
+    gerar_posicoes,
+)
+
+TOLERANCIA = 1e-6
+
+
+def _movimentos_saindo(dados, valores_W, s, k):
+    return sum(
+        valores_W[s, k, q, a]
+        for a in dados["range_A"]
+        for q in dados["sucessores_W"][dados["classe"][a]][k]
+    )
+
+
+def _movimentos_chegando(dados, valores_W, s, q):
+    return sum(
+        valores_W[s, k, q, a]
+        for a in dados["range_A"]
+        for k in dados["predecessores_W"][dados["classe"][a]][q]
+    )
+
+
+def _ocupacao(dados, valores_x, s, j):
+    return sum(valores_x[s, j, a] for a in dados["range_A"]) + dados["ocupacao_fixa"][j]
+
+
+def restricoes_violadas(dados, valores_W, valores_x):
+    """
+    Retorna as restrições de empilhamento (família, índices) violadas pelos
+    valores de W e x.
+    """
+    violadas = []
+    for familia in ("R17", "R18"):
+        for s, k, j in dados[familia]:
+            if (
+                _movimentos_saindo(dados, valores_W, s, k)
+                > 1 - _ocupacao(dados, valores_x, s, j) + TOLERANCIA
+            ):
+                violadas.append((familia, (s, k, j)))
+    for s, q, esquerda, direita in dados["R19"]:
+        if (
+            2 * _movimentos_chegando(dados, valores_W, s, q)
+            > _ocupacao(dados, valores_x, s, esquerda)
+            + _ocupacao(dados, valores_x, s, direita)
+            + TOLERANCIA
+        ):
+            violadas.append(("R19", (s, q, esquerda, direita)))
+    return violadas
+
+
+def expressao_restricao(dados, familia, indices):
+    """
+    Restrição de empilhamento (a mesma que construir_modelo adiciona) sobre
+    as variáveis de dados["W"] e dados["x"].
+    """
+    W, x = dados["W"], dados["x"]
+    range_A = dados["range_A"]
+    classe = dados["classe"]
+    fixa = dados["ocupacao_fixa"]
+
+    if familia == "R19":
+        s, q, esquerda, direita = indices
+        return 2 * quicksum(
+            W[s, k, q, a]
+            for a in range_A
+            for k in dados["predecessores_W"][classe[a]][q]
+        ) <= quicksum(
+            x[s, esquerda, a] + x[s, direita, a] for a in range_A
+        ) + fixa[esquerda] + fixa[direita]
+
+    s, k, j = indices
+    return quicksum(
+        W[s, k, q, a]
+        for a in range_A
+        for q in dados["sucessores_W"][classe[a]][k]
+    ) <= 1 - quicksum(x[s, j, a] for a in range_A) - fixa[j]
+
+
+def callback_empilhamento(model, where):
+    """
+    Callback de solução inteira: adiciona como lazy as restrições de
+    empilhamento violadas pela incumbente.
+    """
+    if where != GRB.Callback.MIPSOL:
+        return
+    dados = model._empilhamento
+    valores_W = dict(
+        zip(dados["W"].keys(), model.cbGetSolution(list(dados["W"].values())))
+    )
+    valores_x = dict(
+        zip(dados["x"].keys(), model.cbGetSolution(list(dados["x"].values())))
+    )
+    for familia, indices in restricoes_violadas(dados, valores_W, valores_x):
+        model.cbLazy(expressao_restricao(dados, familia, indices))
+        dados["cortes_adicionados"] += 1
+
+
+# Bobina de saída 0 sob a bloqueadora 1, as demais no nível inferior
+cenarios_resolvidos = [
+    {"num_fileiras": 1, "num_posicoes_nivel_inferior": 3, "num_bobinas": 3, "S": 3},
+    {"num_fileiras": 1, "num_posicoes_nivel_inferior": 5, "num_bobinas": 4, "S": 4},
+]
+
+
+def medir(teste, empilhamento, resolver=True):
+    """
+    Constrói (e, com `resolver`, resolve) o cenário no modo `empilhamento`.
+    Só os cenários resolvidos recebem ocupação inicial.
+    """
+    posicoes = gerar_posicoes(
+        teste["num_fileiras"], teste["num_posicoes_nivel_inferior"], 1
+    )
+    Phi = posicoes["Phi"]
+    A = list(range(teste["num_bobinas"]))
+    A_in = list(range(teste.get("num_bobinas_entrada", 0)))
+    A_out = list(range(teste.get("num_bobinas_saida", 1)))
+    # Durações de até 1 (R8) para que a saída caiba nas seções
+    custos = gerar_custos_de_movimentacao(
+        Phi,
+        len(A),
+        cinematica="chebyshev",
+        velocidade_portico=60,
+        velocidade_carro=60,
+        velocidade_elevacao=30,
+    )
+    np.random.seed(0)
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    ocupacao_inicial = None
+    if resolver:
+        indice = {p: k for k, p in enumerate(Phi)}
+        ocupacao_inicial = np.zeros((len(Phi), len(A)), dtype=int)
+        ocupacao_inicial[indice[(1, 1, 1)], 0] = 1
+        ocupacao_inicial[indice[(1, 2, 1)], 1] = 1
+        for a, posicao in zip(A[2:], posicoes["Psi1"][1:]):
+            ocupacao_inicial[indice[posicao], a] = 1
+
+    model = Model(f"Armazenagem_{empilhamento}")
+    model.Params.OutputFlag = 0
+    inicio = time.perf_counter()
+    construir_modelo(
+        model,
+        posicoes["Psi"],
+        posicoes["Psi1"],
+        posicoes["Psi2"],
+        Phi,
+        posicoes["I"],
+        posicoes["O"],
+        custos["t_load"],
+        custos["t_empty"],
+        custos["E_load"],
+        custos["E_empty"],
+        A,
+        A_in,
+        A_out,
+        teste["S"],
+        janelas,
+        arcos=gerar_arcos(Phi, A, A_out),
+        ocupacao="fluxo",
+        ocupacao_inicial=ocupacao_inicial,
+        empilhamento=empilhamento,
+    )
+    model.update()
+    resultado = {
+        "variaveis": model.NumVars,
+        "restricoes": model.NumConstrs,
+        "construcao": time.perf_counter() - inicio,
+        "resolucao": None,
+        "objetivo": None,
+        "cortes": None,
+    }
+    if resolver:
+        if empilhamento == "lazy":
+            model.optimize(callback_empilhamento)
+            resultado["cortes"] = model._empilhamento["cortes_adicionados"]
+        else:
+            model.optimize()
+        resultado.update(
+            resolucao=model.Runtime,
+            objetivo=model.ObjVal if model.SolCount > 0 else None,
+        )
+    model.dispose()
+    return resultado
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    from comparar_construtores import cenarios_construcao
+
+    resultados = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for cenarios, resolver in (
+            (cenarios_resolvidos, True),
+            (cenarios_construcao, False),
+        ):
+            for teste in cenarios:
+                for empilhamento in ("explicito", "lazy"):
+                    resultados.append(
+                        (teste, empilhamento, medir(teste, empilhamento, resolver))
+                    )
+
+    print(
+        f"\n{'instância':>10} {'S':>2} {'R17–R19':>10} {'variáveis':>10}"
+        f" {'restr.':>7} {'constr.(s)':>11} {'resol.(s)':>10} {'objetivo':>10} cortes"
+    )
+    for teste, empilhamento, r in resultados:
+        nome = f"{teste['num_fileiras']}x{teste['num_posicoes_nivel_inferior']}x1"
+        resolucao = "-" if r["resolucao"] is None else f"{r['resolucao']:.4f}"
+        objetivo = "-" if r["objetivo"] is None else f"{r['objetivo']:.2f}"
+        cortes = "-" if r["cortes"] is None else r["cortes"]
+        print(
+            f"{nome:>10} {teste['S']:>2} {empilhamento:>10} {r['variaveis']:>10}"
+            f" {r['restricoes']:>7} {r['construcao']:>11.4f} {resolucao:>10}"
+            f" {objetivo:>10} {cortes}"
+        )
@@ -0,0 +1,235 @@
+"""
+Execução paralela de cenários (como os de `testes` em teste.py) em um pool
+de processos.
+
+Cada processo cria no início o seu próprio ambiente do solver (gurobipy.Env
+com Threads = núcleos // processos) e um modelo novo por cenário, que é
+descartado ao final. Os resultados são devolvidos à medida que ficam
+prontos. O tempo de cada cenário é limitado a `limite_tempo` segundos de
+relógio, contados desde a geração das posições: a construção é
+interrompida por um alarme (SIGALRM, onde houver) quando esgota o limite e
+a resolução recebe o que sobra. Um cenário que falha (exceção no processo
+ou processo encerrado) volta com status ERRO e a mensagem em "erro", sem
+interromper os demais.
+
+As janelas de tempo são sorteadas no processo principal, com a semente
+`semente + índice do cenário`, e enviadas a cada processo: os processos
+criados por fork herdam o mesmo estado de np.random, e o resultado de um
+cenário não depende do processo que o resolve.
+
+Uso:
+    python scripts/executor_paralelo.py
+"""
+
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from backends import LIMITE_TEMPO, BackendGurobi, criar_backend
+
+# Status de um cenário cujo processo levantou uma exceção
+ERRO = "erro"
+
+# Estado de cada processo do pool (definido por _iniciar_processo)
+_env = None
+_threads = None
+
+
+def _iniciar_processo(threads: int, solver: str):
+    global _env, _threads
+    _threads = threads
+    if solver == "gurobi":
+        from gurobipy import Env
+
+        _env = Env(empty=True)
+        _env.setParam("OutputFlag", 0)
+        _env.setParam("Threads", threads)
+        _env.start()
+
+
+class _TempoEsgotado(Exception):
+    pass
+
+
+def _alarme(signum, frame):
+    raise _TempoEsgotado
+
+
+def resolver_cenario(
+    cenario: dict,
+    S: int = 3,
+    limite_tempo: float = 60.0,
+    solver: str = "gurobi",
+    janelas=None,
+    **opcoes,
+):
+    """
+    Constrói e resolve um cenário no formato de `testes` no processo atual.
+    `janelas` são as janelas de tempo das bobinas (sorteadas aqui, pelo
+    estado global de np.random, quando não vêm de executar_cenarios).
+    """
+    from teste import (
+        construir_modelo,
+        gerar_custos_de_movimentacao,
+        gerar_janelas_de_tempo,
+        gerar_posicoes,
+    )
+
+    # Alarme de relógio para interromper a construção (onde houver SIGALRM
+    # e apenas no thread principal)
+    alarme = hasattr(signal, "setitimer")
+    if alarme:
+        try:
+            anterior = signal.signal(signal.SIGALRM, _alarme)
+        except ValueError:
+            alarme = False
+
+    inicio = time.perf_counter()
+    if alarme:
+        signal.setitimer(signal.ITIMER_REAL, limite_tempo)
+    backend = None
+    try:
+        try:
+            posicoes = gerar_posicoes(
+                cenario["num_fileiras"],
+                cenario["num_posicoes_nivel_inferior"],
+                cenario["num_entrada_saida"],
+            )
+            custos = gerar_custos_de_movimentacao(
+                posicoes["Phi"], cenario["num_bobinas"]
+            )
+            A = list(range(cenario["num_bobinas"]))
+            A_in = list(range(cenario["num_bobinas_entrada"]))
+            A_out = list(range(cenario["num_bobinas_saida"]))
+            if janelas is None:
+                janelas = gerar_janelas_de_tempo(len(A))
+
+            if solver == "gurobi":
+                backend = BackendGurobi(env=_env)
+            else:
+                backend = criar_backend(solver)
+            construir_modelo(
+                backend,
+                posicoes["Psi"],
+                posicoes["Psi1"],
+                posicoes["Psi2"],
+                posicoes["Phi"],
+                posicoes["I"],
+                posicoes["O"],
+                custos["t_load"],
+                custos["t_empty"],
+                custos["E_load"],
+                custos["E_empty"],
+                A,
+                A_in,
+                A_out,
+                S,
+                janelas,
+                **opcoes,
+            )
+            construido = True
+        except _TempoEsgotado:
+            construido = False
+        finally:
+            if alarme:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        tempo_construcao = time.perf_counter() - inicio
+        restante = limite_tempo - tempo_construcao
+        if not construido or restante <= 0:
+            status, objetivo, tempo_resolucao = LIMITE_TEMPO, None, 0.0
+        else:
+            backend.resolver(limite_tempo=restante, threads=_threads, silencioso=True)
+            status = backend.status()
+            objetivo = backend.valor_objetivo()
+            tempo_resolucao = backend.tempo_execucao()
+        return {
+            "pid": os.getpid(),
+            "threads": _threads,
+            "variaveis": backend.num_variaveis() if backend is not None else 0,
+            "status": status,
+            "objetivo": objetivo,
+            "tempo_construcao": tempo_construcao,
+            "tempo_resolucao": tempo_resolucao,
+            "tempo_total": time.perf_counter() - inicio,
+        }
+    finally:
+        if backend is not None:
+            backend.descartar()
+        if alarme:
+            signal.signal(signal.SIGALRM, anterior)
+
+
+def executar_cenarios(
+    cenarios,
+    num_processos: int = None,
+    limite_tempo: float = 60.0,
+    S: int = 3,
+    solver: str = "gurobi",
+    semente: int = 0,
+    **opcoes,
+):
+    """
+    Resolve os cenários em paralelo e gera (índice do cenário, resultado) na
+    ordem em que terminam. Cada processo usa núcleos // num_processos threads.
+    As janelas do cenário i vêm de np.random.default_rng(semente + i).
+    """
+    from teste import gerar_janelas_de_tempo
+
+    cenarios = list(cenarios)
+    nucleos = os.cpu_count() or 1
+    num_processos = num_processos or min(len(cenarios), nucleos)
+    threads = max(1, nucleos // num_processos)
+
+    with ProcessPoolExecutor(
+        max_workers=num_processos,
+        initializer=_iniciar_processo,
+        initargs=(threads, solver),
+    ) as executor:
+        futuros = {
+            executor.submit(
+                resolver_cenario,
+                cenario,
+                S,
+                limite_tempo,
+                solver,
+                gerar_janelas_de_tempo(
+                    cenario["num_bobinas"], np.random.default_rng(semente + i)
+                ),
+                **opcoes,
+            ): i
+            for i, cenario in enumerate(cenarios)
+        }
+        for futuro in as_completed(futuros):
+            try:
+                resultado = futuro.result()
+            except Exception as erro:
+                resultado = {"status": ERRO, "erro": repr(erro)}
+            yield futuros[futuro], resultado
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    from teste import testes
+
+    # O último cenário está incompleto: volta com status ERRO
+    cenarios = testes * 4 + [{"num_fileiras": 1, "num_bobinas": 2}]
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultados = list(executar_cenarios(cenarios, num_processos=4, limite_tempo=10))
+    tempo = time.perf_counter() - inicio
+
+    print(f"\n{'cenário':>8} {'pid':>8} {'threads':>8} {'status':>10} {'total (s)':>10}")
+    for i, resultado in resultados:
+        if resultado["status"] == ERRO:
+            print(f"{i:>8} {'-':>8} {'-':>8} {ERRO:>10} {resultado['erro']}")
+            continue
+        print(
+            f"{i:>8} {resultado['pid']:>8} {resultado['threads']:>8}"
+            f" {resultado['status']:>10} {resultado['tempo_total']:>10.3f}"
+        )
+    print(f"{len(cenarios)} cenários em {tempo:.2f} s")
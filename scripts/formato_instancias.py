@@ -0,0 +1,200 @@
+"""
+Formato binário colunar para suítes de instâncias.
+
+Uma suíte é um diretório de arquivos .npy, lidos com np.load(mmap_mode="r")
+como no cache de custos: abrir a suíte é instantâneo e cada instância é
+lida do disco só quando acessada.
+
+- Instâncias de gerar_instancia_armazenagem (listas de dicionários):
+  registros.npy guarda todos os registros em um array estruturado
+  (REGISTRO, com o tipo como enum de TIPOS) e inicios.npy o deslocamento de
+  cada instância (N + 1 valores).
+- Matrizes de ocupação (distribuir_bobinas, gerar_lote_ocupacao):
+  ocupacao.npy (N, num_posicoes) uint8, posicoes.npy (num_posicoes, 3) e
+  num_bobinas.npy.
+
+Uso:
+    python scripts/formato_instancias.py
+"""
+
+import os
+import shutil
+import numpy as np
+
+TIPOS = ("vazio", "entrada", "saida", "bloqueadora", "irrelevante")
+CODIGO_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+REGISTRO = np.dtype(
+    [
+        ("id", np.int32),  # número da bobina ("B12" -> 12), -1 sem bobina
+        ("x", np.float32),
+        ("y", np.float32),
+        ("z", np.int8),
+        ("tipo", np.uint8),
+        ("nivel", np.int8),
+    ]
+)
+
+
+def _gravar(diretorio, arrays):
+    # Grava em um diretório temporário e renomeia, como em cache_custos. Uma
+    # suíte existente é renomeada para o lado antes e removida só depois que
+    # a nova está no lugar: em qualquer ponto de uma falha uma das duas
+    # continua inteira no disco
+    temporario = f"{diretorio}.tmp{os.getpid()}"
+    os.makedirs(temporario, exist_ok=True)
+    for nome, array in arrays.items():
+        np.save(os.path.join(temporario, f"{nome}.npy"), array)
+    antigo = None
+    if os.path.isdir(diretorio):
+        antigo = f"{diretorio}.antigo{os.getpid()}"
+        os.rename(diretorio, antigo)
+    try:
+        os.rename(temporario, diretorio)
+    except OSError:
+        if antigo is not None:
+            os.rename(antigo, diretorio)
+        raise
+    if antigo is not None:
+        shutil.rmtree(antigo)
+
+
+def _carregar(diretorio, nomes):
+    return {
+        nome: np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode="r")
+        for nome in nomes
+    }
+
+
+def para_registros(instancia):
+    """
+    Converte uma instância (lista de dicionários) no array estruturado.
+    """
+    registros = np.empty(len(instancia), dtype=REGISTRO)
+    registros["id"] = [-1 if b["id"] is None else int(b["id"][1:]) for b in instancia]
+    registros["x"] = [b["x"] for b in instancia]
+    registros["y"] = [b["y"] for b in instancia]
+    registros["z"] = [b["z"] for b in instancia]
+    registros["tipo"] = [CODIGO_TIPO[b["tipo"]] for b in instancia]
+    registros["nivel"] = [b["nivel"] for b in instancia]
+    return registros
+
+
+def para_dicionarios(registros):
+    """
+    Converte o array estruturado de volta na lista de dicionários.
+    """
+    instancia = []
+    for id_, x, y, z, tipo, nivel in registros.tolist():
+        instancia.append({
+            "id": None if id_ < 0 else f"B{id_}",
+            "x": x if z == 1 else int(x),
+            "y": int(y),
+            "z": z,
+            "tipo": TIPOS[tipo],
+            "nivel": nivel,
+        })
+    return instancia
+
+
+class SuiteInstancias:
+    """
+    Suíte aberta de disco; suite[i] é o array estruturado da instância i
+    (uma visão do arquivo mapeado em memória).
+    """
+
+    def __init__(self, diretorio):
+        arrays = _carregar(diretorio, ("registros", "inicios"))
+        self.registros = arrays["registros"]
+        self.inicios = arrays["inicios"]
+
+    def __len__(self):
+        return len(self.inicios) - 1
+
+    def __getitem__(self, i):
+        return self.registros[self.inicios[i] : self.inicios[i + 1]]
+
+    def instancia(self, i):
+        return para_dicionarios(self[i])
+
+
+def salvar_instancias(diretorio, instancias):
+    """
+    Grava uma lista de instâncias de gerar_instancia_armazenagem.
+    """
+    tamanhos = [len(instancia) for instancia in instancias]
+    inicios = np.zeros(len(instancias) + 1, dtype=np.int64)
+    np.cumsum(tamanhos, out=inicios[1:])
+    registros = (
+        np.concatenate([para_registros(instancia) for instancia in instancias])
+        if instancias
+        else np.empty(0, dtype=REGISTRO)
+    )
+    _gravar(diretorio, {"registros": registros, "inicios": inicios})
+
+
+def carregar_instancias(diretorio):
+    return SuiteInstancias(diretorio)
+
+
+def salvar_ocupacoes(diretorio, ocupacao, posicoes, num_bobinas=None):
+    """
+    Grava uma suíte de matrizes de ocupação (uma linha por instância) e a
+    ordem das posições (fileira, camada, posicao_na_camada) das colunas.
+    """
+    ocupacao = np.asarray(ocupacao, dtype=np.uint8)
+    if num_bobinas is None:
+        num_bobinas = ocupacao.sum(axis=1, dtype=np.int64)
+    _gravar(
+        diretorio,
+        {
+            "ocupacao": ocupacao,
+            "posicoes": np.asarray(posicoes, dtype=np.int32).reshape(-1, 3),
+            "num_bobinas": np.asarray(num_bobinas, dtype=np.int64),
+        },
+    )
+
+
+def carregar_ocupacoes(diretorio):
+    """
+    Retorna {"ocupacao", "posicoes", "num_bobinas"} mapeados em memória;
+    ocupacao[i] lê apenas a linha da instância i.
+    """
+    return _carregar(diretorio, ("ocupacao", "posicoes", "num_bobinas"))
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    from gerar_instancia_armazenagem import gerar_instancia_armazenagem
+    from instancias_lote import gerar_lote_ocupacao
+
+    diretorio = tempfile.mkdtemp()
+
+    instancias = [
+        gerar_instancia_armazenagem(3, 6, 2, 3, 2, [(0, -1)], [(0, 7)], random_seed=i)
+        for i in range(1000)
+    ]
+    caminho = os.path.join(diretorio, "instancias")
+    inicio = time.perf_counter()
+    salvar_instancias(caminho, instancias)
+    tempo_gravacao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    suite = carregar_instancias(caminho)
+    instancia = suite.instancia(737)
+    tempo_leitura = time.perf_counter() - inicio
+    print(f"\n{len(suite)} instâncias: gravação {tempo_gravacao:.3f} s,"
+          f" abertura + leitura de uma {tempo_leitura * 1000:.2f} ms")
+    print("instância 737 igual à original:", instancia == instancias[737])
+
+    lote = gerar_lote_ocupacao(100_000, 3, 9, semente=0)
+    caminho = os.path.join(diretorio, "ocupacoes")
+    salvar_ocupacoes(caminho, lote["ocupacao"], lote["posicoes"], lote["num_bobinas"])
+    ocupacoes = carregar_ocupacoes(caminho)
+    print(f"{len(ocupacoes['ocupacao'])} matrizes de ocupação,"
+          f" {os.path.getsize(os.path.join(caminho, 'ocupacao.npy')) / 2**20:.1f} MiB;"
+          f" linha 4242 igual:",
+          np.array_equal(ocupacoes["ocupacao"][4242], lote["ocupacao"][4242]))
+
+    shutil.rmtree(diretorio)
@@ -54,6 +54,8 @@ from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 import math
 
+from indice_posicoes import IndicePosicoes
+
 def plotar_instancia_2d(instancia):
     cores = {
         "entrada": "blue",
@@ -213,6 +215,20 @@ def converter_posicoes_para_instancia(posicoes, num_posicoes_nivel_inferior):
         })
     return instancia
 
+def indice_do_layout(num_fileiras: int, num_posicoes_nivel_inferior: int):
+    """
+    Índice de posições do layout no formato de gerar_posicoes (fileira,
+    nível, coluna), sem pontos de entrada e saída.
+    """
+    Phi = []
+    for y in range(num_fileiras):
+        for x in range(num_posicoes_nivel_inferior):
+            Phi.append((y + 1, 1, x + 1))
+            if x < num_posicoes_nivel_inferior - 1:
+                Phi.append((y + 1, 2, x + 1))
+    return IndicePosicoes(Phi, [], [])
+
+
 def gerar_instancia_armazenagem(
     num_fileiras: int,
     num_posicoes_nivel_inferior: int,
@@ -237,6 +253,42 @@ def gerar_instancia_armazenagem(
 
     random.shuffle(posicoes)
 
+    # (x, y, z) da instância -> índice da posição (y + 1, z + 1, ⌊x⌋ + 1)
+    indice = indice_do_layout(num_fileiras, num_posicoes_nivel_inferior)
+    ocupada = np.zeros(len(indice), dtype=bool)
+
+    def indice_de(x, y, z):
+        return indice.indice[(y + 1, z + 1, int(x) + 1)]
+
+    def tem_suporte(k):
+        return all(ocupada[j] for j in indice.apoios(k))
+
+    # As posições são consumidas da lista embaralhada por um cursor. Uma
+    # posição superior sem suporte fica pendente e, quando suas duas
+    # inferiores são ocupadas, volta para um ponto aleatório do trecho ainda
+    # não consumido. Cada posição entra e sai no máximo duas vezes: O(n).
+    cursor = 0
+    pendentes = {}
+
+    def proxima_posicao():
+        nonlocal cursor
+        while cursor < len(posicoes):
+            x, y, z = posicoes[cursor]
+            cursor += 1
+            k = indice_de(x, y, z)
+            if tem_suporte(k):
+                return k, x, y, z
+            pendentes[k] = (x, y, z)  # sem suporte (ainda)
+        return None
+
+    def ocupar(k):
+        ocupada[k] = True
+        for q in indice.bloqueadores(k):
+            if q in pendentes and tem_suporte(q):
+                posicoes.append(pendentes.pop(q))
+                j = random.randrange(cursor, len(posicoes))
+                posicoes[j], posicoes[-1] = posicoes[-1], posicoes[j]
+
     instancia = []
     contador_id = 1
 
@@ -244,65 +296,41 @@ def gerar_instancia_armazenagem(
         nonlocal contador_id
         bobinas = []
         for _ in range(qtd):
-            while posicoes:
-                x, y, z = posicoes.pop(0)
-                if z == 1:
-                    # Verifica se há suporte embaixo
-                    esquerda = (x - 0.5, y, 0)
-                    direita = (x + 0.5, y, 0)
-                    if esquerda not in ocupadas or direita not in ocupadas:
-                        continue  # sem suporte
-                pos = {
-                    "id": f"B{contador_id}",
-                    "x": x,
-                    "y": y,
-                    "z": z,
-                    "tipo": tipo,
-                    "nivel": 1 if z == 0 else 2
-                }
-                ocupadas.add((x, y, z))
-                bobinas.append(pos)
-                contador_id += 1
+            proxima = proxima_posicao()
+            if proxima is None:
                 break
+            k, x, y, z = proxima
+            pos = {
+                "id": f"B{contador_id}",
+                "x": x,
+                "y": y,
+                "z": z,
+                "tipo": tipo,
+                "nivel": 1 if z == 0 else 2
+            }
+            ocupar(k)
+            bobinas.append(pos)
+            contador_id += 1
         return bobinas
 
-    ocupadas = set()
-
     instancia.extend(alocar_bobinas(num_bobinas_saida, "saida"))
     instancia.extend(alocar_bobinas(num_bobinas_bloqueadoras, "bloqueadora"))
     instancia.extend(alocar_bobinas(num_bobinas_entrada, "entrada"))
 
     if incluir_irrelevantes:
-        while posicoes:
-            x, y, z = posicoes.pop(0)
-            if z == 1:
-                esquerda = (x - 0.5, y, 0)
-                direita = (x + 0.5, y, 0)
-                if esquerda not in ocupadas or direita not in ocupadas:
-                    continue
-            instancia.append({
-                "id": f"B{contador_id}",
-                "x": x,
-                "y": y,
-                "z": z,
-                "tipo": "irrelevante",
-                "nivel": 1 if z == 0 else 2
-            })
-            ocupadas.add((x, y, z))
-            contador_id += 1
+        instancia.extend(alocar_bobinas(len(posicoes), "irrelevante"))
 
     # Adiciona posições vazias restantes (sem bobinas alocadas)
     for y in range(num_fileiras):
         for x in range(num_posicoes_nivel_inferior):
-            if (x, y, 0) not in ocupadas:
+            if not ocupada[indice_de(x, y, 0)]:
                 instancia.append({
                     "id": None, "x": x, "y": y, "z": 0, "tipo": "vazio", "nivel": 1
                 })
         for x in range(num_posicoes_nivel_inferior - 1):
-            if (x + 0.5, y, 1) not in ocupadas:
-                esquerda = (x, y, 0)
-                direita = (x + 1, y, 0)
-                if esquerda in ocupadas and direita in ocupadas:
+            k = indice_de(x + 0.5, y, 1)
+            if not ocupada[k]:
+                if tem_suporte(k):
                     instancia.append({
                         "id": None, "x": x + 0.5, "y": y, "z": 1, "tipo": "vazio", "nivel": 2
                     })
@@ -332,4 +360,24 @@ def gerar_instancia_armazenagem(
 #     print(b)
 
 # plotar_instancia_2d(instancia)
-# plotar_instancia_3d(instancia)
\ No newline at end of file
+# plotar_instancia_3d(instancia)
+
+
+if __name__ == "__main__":
+    import time
+
+    # Pátio grande: 100 fileiras x 200 posições na base (39.900 posições)
+    inicio = time.perf_counter()
+    instancia = gerar_instancia_armazenagem(
+        num_fileiras=100,
+        num_posicoes_nivel_inferior=200,
+        num_bobinas_entrada=500,
+        num_bobinas_saida=2000,
+        num_bobinas_bloqueadoras=1000,
+        pontos_entrada=[(0, -1)],
+        pontos_saida=[(0, 201)],
+        random_seed=42,
+    )
+    tempo = time.perf_counter() - inicio
+    bobinas = [b for b in instancia if b["id"] is not None]
+    print(f"{len(bobinas)} bobinas em {len(instancia)} registros: {tempo:.3f} s")
@@ -0,0 +1,407 @@
+"""
+Heurística construtiva gulosa para o problema de armazenagem.
+
+Gera rapidamente uma sequência de movimentações da ponte rolante que respeita
+o empilhamento (Psi1/Psi2): bobinas de saída são liberadas movendo as
+bloqueadoras que estão sobre elas, e bobinas de entrada são colocadas em
+posições livres e apoiadas. A solução pode ser usada sozinha ou carregada
+como solução inicial (MIP start) de W, V, x e tau antes de resolver.
+
+Uso:
+    python scripts/heuristica.py
+"""
+
+import time
+import numpy as np
+
+from backends import como_backend
+from indice_posicoes import indice_de_posicoes
+
+
+def vizinhanca_empilhamento(Phi, I, O):
+    """
+    Para cada índice de Phi retorna as posições de apoio (duas inferiores sob
+    uma posição superior) e as bloqueadoras (superiores apoiadas sobre uma
+    posição inferior). Entrada e saída não têm vizinhos.
+    """
+    indice = indice_de_posicoes(Phi, I, O)
+    armazenagem = range(len(I), len(Phi) - len(O))
+    apoios = [indice.apoios(k) for k in range(len(Phi))]
+    bloqueadores = [indice.bloqueadores(k) for k in range(len(Phi))]
+    return armazenagem, apoios, bloqueadores
+
+
+def posicoes_iniciais(ocupacao_inicial, A, A_in, entrada=0):
+    """
+    Converte a matriz de ocupação inicial (len(Phi), len(A)) na posição de
+    cada bobina. Bobinas de entrada sem posição ficam no ponto de entrada.
+    """
+    posicao = {}
+    if ocupacao_inicial is not None:
+        ocupacao_inicial = np.asarray(ocupacao_inicial)
+        for k, a in zip(*np.nonzero(ocupacao_inicial)):
+            posicao[int(a)] = int(k)
+    for a in A_in:
+        posicao.setdefault(a, entrada)
+    sem_posicao = [a for a in range(len(A)) if a not in posicao]
+    if sem_posicao:
+        raise ValueError(f"Bobinas sem posição inicial: {sem_posicao}")
+    return posicao
+
+
+def heuristica_construtiva(
+    Phi,
+    I,
+    O,
+    t_load,
+    t_empty,
+    E_load,
+    E_empty,
+    A,
+    A_in,
+    A_out,
+    ocupacao_inicial=None,
+    janelas=None,
+    ocupacao_fixa=None,
+):
+    """
+    Constrói uma sequência viável de movimentações, uma por seção.
+
+    As tarefas (retirar cada bobina de A_out, armazenar cada bobina de A_in)
+    são atendidas na ordem das janelas de tempo quando `janelas` é dado.
+    Cada movimentação carregada escolhe o destino livre e apoiado mais
+    próximo (t_load), evitando empilhar sobre bobinas que ainda vão sair.
+    As movimentações vazias seguem a precedência de R14/R15: R14 exige uma
+    movimentação vazia até k na seção s-1 antes de qualquer carregada que
+    parta de k na seção s, e R15 exige que a vazia parta do destino da
+    carregada anterior. Por isso cada movimentação carregada, exceto a
+    primeira (seção 0), é precedida pela vazia da ponte até a origem. Uma
+    bobina entregue só está na saída a partir de ω⁻ (R7).
+    Posições com `ocupacao_fixa[k]` = 1 (bobinas estáticas retiradas de A,
+    ver presolve.py) ficam ocupadas o tempo todo.
+
+    Retorna um dicionário com as movimentações (tipo, origem, destino,
+    bobina), a posição das bobinas no início de cada seção, tau, o custo de
+    energia, o número de seções usado e se todas as tarefas foram atendidas.
+    """
+    entrada = 0
+    saida = len(Phi) - 1
+    armazenagem, apoios, bloqueadores = vizinhanca_empilhamento(Phi, I, O)
+
+    posicao = posicoes_iniciais(ocupacao_inicial, A, A_in, entrada)
+    ocupante = [None] * len(Phi)
+    for a, k in posicao.items():
+        if k in armazenagem:
+            ocupante[k] = a
+    if ocupacao_fixa is not None:
+        for k in np.nonzero(ocupacao_fixa)[0]:
+            ocupante[k] = -1  # bobina estática
+
+    pendentes_saida = {a for a in A_out if posicao[a] != saida}
+
+    tarefas = [("saida", a) for a in A_out] + [("entrada", a) for a in A_in]
+    if janelas is not None:
+        tarefas.sort(
+            key=lambda t: janelas["omega_minus"][t[1]]
+            if t[0] == "saida"
+            else janelas["sigma_minus"][t[1]]
+        )
+
+    movimentos = []
+    estados = [dict(posicao)]
+    ponte = None  # posição da ponte rolante após a última movimentação
+
+    def apoiada(q):
+        return all(ocupante[j] is not None for j in apoios[q])
+
+    def bloqueada(k):
+        return any(ocupante[j] is not None for j in bloqueadores[k])
+
+    def escolher_destino(origem, evitar):
+        candidatos = [
+            q
+            for q in armazenagem
+            if ocupante[q] is None and q not in evitar and apoiada(q)
+        ]
+        # Preferir não empilhar sobre bobinas que ainda vão sair
+        livres = [
+            q
+            for q in candidatos
+            if not any(ocupante[j] in pendentes_saida for j in apoios[q])
+        ]
+        candidatos = livres or candidatos
+        if not candidatos:
+            return None
+        return min(candidatos, key=lambda q: t_load[origem, q])
+
+    def mover(a, k, q):
+        nonlocal ponte
+        if ponte is not None:
+            movimentos.append(("vazio", ponte, k, None))
+            estados.append(dict(posicao))
+        movimentos.append(("carregado", k, q, a))
+        if k in armazenagem:
+            ocupante[k] = None
+        if q in armazenagem:
+            ocupante[q] = a
+        posicao[a] = q
+        estados.append(dict(posicao))
+        ponte = q
+
+    completa = True
+    for tipo, a in tarefas:
+        k = posicao[a]
+        if tipo == "entrada":
+            if k != entrada:
+                continue
+            q = escolher_destino(entrada, evitar=set())
+            if q is None:
+                completa = False
+                continue
+            mover(a, entrada, q)
+        else:
+            if k == saida:
+                continue
+            for j in bloqueadores[k]:
+                b = ocupante[j]
+                if b is None:
+                    continue
+                q = escolher_destino(j, evitar={k})
+                if q is None:
+                    break
+                mover(b, j, q)
+            if bloqueada(k):
+                completa = False
+                continue
+            mover(a, k, saida)
+            pendentes_saida.discard(a)
+
+    # Instantes de início das seções (e do estado final); tau[0] = 0 (R1)
+    tau = [0.0]
+    for s, (tipo, k, q, a) in enumerate(movimentos):
+        inicio = tau[s]
+        if janelas is not None and tipo == "carregado" and s > 0:
+            if k == entrada and a in A_in:
+                inicio = max(inicio, float(janelas["sigma_minus"][a]))
+        tau[s] = inicio
+        duracao = t_load[k, q] if tipo == "carregado" else t_empty[k, q]
+        fim = inicio + duracao
+        if janelas is not None and tipo == "carregado" and q == saida and a in A_out:
+            # Na saída a partir da seção seguinte: R7 exige tau >= ω⁻
+            fim = max(fim, float(janelas["omega_minus"][a]))
+        tau.append(fim)
+
+    custo = sum(
+        E_load[k][q][a] if tipo == "carregado" else E_empty[k][q]
+        for tipo, k, q, a in movimentos
+    )
+
+    return {
+        "movimentos": movimentos,
+        "estados": estados,
+        "tau": tau,
+        "custo": float(custo),
+        "num_secoes": len(movimentos),
+        "completa": completa,
+    }
+
+
+def carregar_solucao_inicial(model, solucao):
+    """
+    Carrega a solução da heurística como valores iniciais de W, V, x e tau do
+    modelo construído por construir_modelo (ou construir_modelo_matricial).
+
+    Movimentações além do número de seções do modelo são descartadas; o
+    solver recebe então uma solução inicial parcial.
+    """
+    W, V, x, tau = model._W, model._V, model._x, model._tau
+    movimentos = solucao["movimentos"]
+    estados = solucao["estados"]
+    tempos = solucao["tau"]
+
+    if hasattr(W, "shape"):
+        # Variáveis matriciais (MVar)
+        num_S, num_Phi, _, num_A = W.shape
+        inicio_W = np.zeros(W.shape)
+        inicio_V = np.zeros(V.shape)
+        inicio_x = np.zeros(x.shape)
+        inicio_tau = np.zeros(tau.shape)
+        for s, (tipo, k, q, a) in enumerate(movimentos[:num_S]):
+            if tipo == "carregado":
+                inicio_W[s, k, q, a] = 1
+            else:
+                inicio_V[s, k, q] = 1
+        for s in range(num_S):
+            for a, k in estados[min(s, len(estados) - 1)].items():
+                inicio_x[s, k, a] = 1
+            inicio_tau[s] = tempos[min(s, len(tempos) - 1)]
+        W.Start = inicio_W
+        V.Start = inicio_V
+        x.Start = inicio_x
+        tau.Start = inicio_tau
+        return
+
+    valores = {var: 0.0 for var in W.values()}
+    valores.update({var: 0.0 for var in V.values()})
+    valores.update({var: 0.0 for var in x.values()})
+    num_S = len(tau)
+    for s, (tipo, k, q, a) in enumerate(movimentos[:num_S]):
+        if tipo == "carregado" and (s, k, q, a) in W:
+            valores[W[s, k, q, a]] = 1.0
+        elif tipo == "vazio" and (s, k, q) in V:
+            valores[V[s, k, q]] = 1.0
+    for s in range(num_S):
+        for a, k in estados[min(s, len(estados) - 1)].items():
+            valores[x[s, k, a]] = 1.0
+        valores[tau[s]] = tempos[min(s, len(tempos) - 1)]
+
+    como_backend(model).definir_solucao_inicial(valores)
+
+
+def demonstrar_solucao_inicial():
+    """
+    Carrega a heurística como solução inicial de um modelo pequeno (nas duas
+    formulações de R16, tempos em que cada movimentação cabe em uma seção
+    de R8) e resolve apenas o nó raiz, sem as heurísticas do Gurobi: há
+    solução só se o solver aceitou a solução inicial.
+    """
+    import contextlib
+    import io
+    from gurobipy import Model
+
+    from teste import (
+        construir_modelo,
+        gerar_arcos,
+        gerar_custos_de_movimentacao,
+        gerar_janelas_de_tempo,
+        gerar_posicoes,
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        posicoes = gerar_posicoes(1, 4, 1)
+    Phi = posicoes["Phi"]
+    indice = {p: i for i, p in enumerate(Phi)}
+
+    # Bobina de saída 0 sob as bloqueadoras 3 e 4, apoiadas em 1 e 2
+    A = list(range(5))
+    A_in = []
+    A_out = [0]
+    ocupacao_inicial = np.zeros((len(Phi), len(A)), dtype=int)
+    for a, posicao in enumerate([(1, 1, 2), (1, 1, 1), (1, 1, 3), (1, 2, 1), (1, 2, 2)]):
+        ocupacao_inicial[indice[posicao], a] = 1
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        custos = gerar_custos_de_movimentacao(
+            Phi,
+            len(A),
+            "chebyshev",
+            velocidade_portico=60,
+            velocidade_carro=60,
+            velocidade_elevacao=30,
+        )
+    np.random.seed(0)
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    solucao = heuristica_construtiva(
+        Phi,
+        posicoes["I"],
+        posicoes["O"],
+        custos["t_load"],
+        custos["t_empty"],
+        custos["E_load"],
+        custos["E_empty"],
+        A,
+        A_in,
+        A_out,
+        ocupacao_inicial,
+        janelas,
+    )
+
+    aceitas = []
+    for ocupacao in ("acumulada", "fluxo"):
+        model = Model("Armazenagem")
+        model.Params.OutputFlag = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            construir_modelo(
+                model,
+                posicoes["Psi"],
+                posicoes["Psi1"],
+                posicoes["Psi2"],
+                Phi,
+                posicoes["I"],
+                posicoes["O"],
+                custos["t_load"],
+                custos["t_empty"],
+                custos["E_load"],
+                custos["E_empty"],
+                A,
+                A_in,
+                A_out,
+                solucao["num_secoes"],
+                janelas,
+                arcos=gerar_arcos(Phi, A, A_out),
+                ocupacao=ocupacao,
+                ocupacao_inicial=ocupacao_inicial,
+            )
+        carregar_solucao_inicial(model, solucao)
+        model.Params.NodeLimit = 0
+        model.Params.Heuristics = 0
+        model.optimize()
+        aceitas.append(model.SolCount > 0 and model.ObjVal <= solucao["custo"] + 1e-6)
+        print(
+            f"\nR16 {ocupacao}: solução inicial aceita:",
+            aceitas[-1],
+            "custo da heurística:",
+            solucao["custo"],
+            "objetivo após o nó raiz:",
+            model.ObjVal if model.SolCount > 0 else None,
+        )
+        model.dispose()
+    return all(aceitas)
+
+
+if __name__ == "__main__":
+    from teste import gerar_custos_de_movimentacao, gerar_janelas_de_tempo, gerar_posicoes
+
+    posicoes = gerar_posicoes(3, 5, 1)
+    Phi = posicoes["Phi"]
+    A = list(range(4))
+    A_in = [0]
+    A_out = [1, 2]
+    custos = gerar_custos_de_movimentacao(Phi, len(A))
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    # Bobinas 1, 2 e 3 armazenadas; 3 fica sobre a bobina 1
+    indice = {p: i for i, p in enumerate(Phi)}
+    ocupacao_inicial = np.zeros((len(Phi), len(A)), dtype=int)
+    ocupacao_inicial[indice[(1, 1, 1)], 1] = 1
+    ocupacao_inicial[indice[(1, 1, 2)], 2] = 1
+    ocupacao_inicial[indice[(1, 2, 1)], 3] = 1
+
+    inicio = time.perf_counter()
+    solucao = heuristica_construtiva(
+        Phi,
+        posicoes["I"],
+        posicoes["O"],
+        custos["t_load"],
+        custos["t_empty"],
+        custos["E_load"],
+        custos["E_empty"],
+        A,
+        A_in,
+        A_out,
+        ocupacao_inicial,
+        janelas,
+    )
+    tempo = time.perf_counter() - inicio
+
+    print("\nMovimentações")
+    for s, (tipo, k, q, a) in enumerate(solucao["movimentos"]):
+        bobina = "" if a is None else f" bobina {a}"
+        print(f"seção {s}: {tipo} {Phi[k]} -> {Phi[q]}{bobina}")
+    print("custo:", solucao["custo"])
+    print("seções:", solucao["num_secoes"], "completa:", solucao["completa"])
+    print(f"tempo da heurística: {tempo * 1000:.2f} ms")
+
+    if not demonstrar_solucao_inicial():
+        raise SystemExit("A solução inicial foi rejeitada pelo solver.")
@@ -0,0 +1,103 @@
+"""
+Índice de posições de um layout de armazém.
+
+Construído uma vez por layout a partir de Phi = I + Psi + O (gerar_posicoes),
+guarda os mapas tupla <-> inteiro, o nível/fileira/coluna de cada posição e,
+em arrays de inteiros (-1 quando não existe), os apoios esquerdo e direito de
+cada posição superior e as posições superiores que bloqueiam cada posição
+inferior. Todas as consultas são O(1).
+
+Uma posição superior (y, 2, x) fica sobre as inferiores (y, 1, x) e
+(y, 1, x + 1); logo a inferior (y, 1, x) é bloqueada por (y, 2, x - 1) à
+esquerda e por (y, 2, x) à direita.
+"""
+
+from functools import lru_cache
+import numpy as np
+
+SEM_POSICAO = -1
+# Layouts mantidos em memória por indice_de_posicoes
+MAX_LAYOUTS = 32
+
+
+class IndicePosicoes:
+    def __init__(self, Phi, I, O):
+        self.posicoes = [tuple(p) for p in Phi]
+        self.indice = {p: i for i, p in enumerate(self.posicoes)}
+        num_Phi = len(self.posicoes)
+
+        array = np.asarray(self.posicoes, dtype=np.int64).reshape(num_Phi, 3)
+        self.fileira = array[:, 0]
+        self.nivel = array[:, 1]
+        self.coluna = array[:, 2]
+
+        self.entradas = np.arange(len(I))
+        self.saidas = np.arange(num_Phi - len(O), num_Phi)
+        self.armazenagem = np.arange(len(I), num_Phi - len(O))
+        eh_armazenagem = np.zeros(num_Phi, dtype=bool)
+        eh_armazenagem[self.armazenagem] = True
+        self.eh_armazenagem = eh_armazenagem
+        self.inferiores = self.armazenagem[self.nivel[self.armazenagem] == 1]
+        self.superiores = self.armazenagem[self.nivel[self.armazenagem] == 2]
+
+        self.apoio_esquerdo = np.full(num_Phi, SEM_POSICAO, dtype=np.int64)
+        self.apoio_direito = np.full(num_Phi, SEM_POSICAO, dtype=np.int64)
+        self.bloqueador_esquerdo = np.full(num_Phi, SEM_POSICAO, dtype=np.int64)
+        self.bloqueador_direito = np.full(num_Phi, SEM_POSICAO, dtype=np.int64)
+        for q in self.superiores:
+            y, _, x = self.posicoes[q]
+            esquerda = self.indice[(y, 1, x)]
+            direita = self.indice[(y, 1, x + 1)]
+            self.apoio_esquerdo[q] = esquerda
+            self.apoio_direito[q] = direita
+            self.bloqueador_direito[esquerda] = q
+            self.bloqueador_esquerdo[direita] = q
+
+    def __len__(self):
+        return len(self.posicoes)
+
+    def indice_de(self, posicao):
+        return self.indice[tuple(posicao)]
+
+    def posicao(self, k):
+        return self.posicoes[k]
+
+    def apoios(self, k):
+        """
+        Posições inferiores sob k (vazio para posições inferiores).
+        """
+        return [j for j in (self.apoio_esquerdo[k], self.apoio_direito[k]) if j >= 0]
+
+    def bloqueadores(self, k):
+        """
+        Posições superiores apoiadas sobre k.
+        """
+        return [
+            j
+            for j in (self.bloqueador_esquerdo[k], self.bloqueador_direito[k])
+            if j >= 0
+        ]
+
+    def pares_bloqueio(self, lado):
+        """
+        Arrays (inferior, bloqueadora) de todas as posições inferiores com
+        bloqueadora do `lado` ("direito" ou "esquerdo").
+        """
+        bloqueador = (
+            self.bloqueador_direito if lado == "direito" else self.bloqueador_esquerdo
+        )
+        inferiores = self.inferiores[bloqueador[self.inferiores] >= 0]
+        return inferiores, bloqueador[inferiores]
+
+
+@lru_cache(maxsize=MAX_LAYOUTS)
+def _indice(posicoes, num_I, num_O):
+    return IndicePosicoes(posicoes, range(num_I), range(num_O))
+
+
+def indice_de_posicoes(Phi, I, O):
+    """
+    Índice do layout, construído na primeira chamada para cada Phi; os
+    MAX_LAYOUTS usados mais recentemente ficam em cache.
+    """
+    return _indice(tuple(tuple(p) for p in Phi), len(I), len(O))
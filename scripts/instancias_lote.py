@@ -0,0 +1,158 @@
+"""
+Geração em lote de instâncias no formato de instancias_teste.distribuir_bobinas.
+
+gerar_lote_ocupacao devolve uma matriz de ocupação (N, num_posicoes) uint8
+e o número de bobinas colocadas em cada instância. A regra de empilhamento e
+o sorteio são os de distribuir_bobinas (a cada bobina, uma candidata
+uniforme entre as camadas abertas de todas as fileiras), aplicados às N
+instâncias de uma vez com numpy.
+
+Cada instância i usa seu próprio gerador, derivado de (semente, i) por
+SeedSequence: o resultado de uma instância não depende de quantas são
+geradas junto com ela, e blocos [inicio, inicio + N) podem ser gerados em
+processos diferentes e concatenados.
+
+Uso:
+    python scripts/instancias_lote.py
+"""
+
+import time
+import numpy as np
+
+
+def posicoes_do_lote(
+    num_fileiras: int, max_bobinas_base_fileira: int, max_camadas: int = None
+):
+    """
+    Posições (fileira, camada, posicao_na_camada), 1-indexadas, na ordem das
+    colunas da matriz de ocupação (a mesma de distribuir_bobinas).
+    """
+    num_camadas = max_bobinas_base_fileira
+    if max_camadas is not None:
+        num_camadas = min(num_camadas, max_camadas)
+    return [
+        (r, l, p)
+        for r in range(1, num_fileiras + 1)
+        for l in range(1, num_camadas + 1)
+        for p in range(1, max_bobinas_base_fileira - l + 2)
+    ]
+
+
+def geradores_do_lote(semente: int, N: int, inicio: int = 0):
+    """
+    Um numpy Generator independente por instância, derivado de (semente, i).
+    """
+    return [
+        np.random.default_rng(np.random.SeedSequence(semente, spawn_key=(i,)))
+        for i in range(inicio, inicio + N)
+    ]
+
+
+def gerar_lote_ocupacao(
+    N: int,
+    num_fileiras: int,
+    max_bobinas_base_fileira: int,
+    num_bobinas=None,
+    semente: int = None,
+    inicio: int = 0,
+    max_camadas: int = None,
+):
+    """
+    Gera as instâncias inicio, ..., inicio + N - 1 do lote.
+
+    `num_bobinas` é o número de bobinas solicitado (inteiro ou um valor por
+    instância); sem ele, cada instância sorteia um número entre 0 e a
+    capacidade do layout. `max_camadas` limita a altura das fileiras (2 para
+    o layout de instancias_teste2). Sem `semente`, uma nova é sorteada e
+    devolvida para que o lote possa ser reproduzido ou continuado.
+
+    Retorna {"ocupacao": (N, num_posicoes) uint8, "num_bobinas": (N,) com
+    as bobinas colocadas, "posicoes": ordem das colunas, "semente"}.
+    """
+    if semente is None:
+        semente = np.random.SeedSequence().entropy
+    posicoes = posicoes_do_lote(num_fileiras, max_bobinas_base_fileira, max_camadas)
+    num_posicoes = len(posicoes)
+    num_camadas = len({l for _, l, _ in posicoes})
+
+    ocupacao = np.zeros((N, num_posicoes), dtype=np.uint8)
+    colocadas = np.zeros(N, dtype=np.int64)
+    if N == 0 or num_posicoes == 0:
+        return {
+            "ocupacao": ocupacao,
+            "num_bobinas": colocadas,
+            "posicoes": posicoes,
+            "semente": semente,
+        }
+
+    # Sorteios de cada instância vêm do seu próprio gerador
+    geradores = geradores_do_lote(semente, N, inicio)
+    if num_bobinas is None:
+        solicitadas = np.array([g.integers(0, num_posicoes + 1) for g in geradores])
+    else:
+        solicitadas = np.broadcast_to(np.asarray(num_bobinas, dtype=np.int64), (N,))
+    max_solicitadas = int(solicitadas.max(initial=0))
+    sorteios = np.zeros((N, max_solicitadas))
+    for i, g in enumerate(geradores):
+        sorteios[i, : solicitadas[i]] = g.random(solicitadas[i])
+
+    # Coluna da primeira posição de cada (fileira, camada)
+    tamanho_camada = max_bobinas_base_fileira - np.arange(num_camadas)
+    deslocamento_camada = np.concatenate(([0], np.cumsum(tamanho_camada)[:-1]))
+    deslocamento = (
+        np.arange(num_fileiras)[:, None] * tamanho_camada.sum()
+        + deslocamento_camada[None, :]
+    ).ravel()
+
+    contagem = np.zeros((N, num_fileiras, num_camadas), dtype=np.int64)
+    linhas = np.arange(N)
+    for passo in range(max_solicitadas):
+        # Candidatas: camada 1 com a base incompleta e a cadeia de camadas
+        # 2..l em que N_l + 1 <= N_(l-1) - 1
+        candidatas = np.empty_like(contagem, dtype=bool)
+        candidatas[:, :, 0] = contagem[:, :, 0] < max_bobinas_base_fileira
+        abertas = contagem[:, :, 1:] + 2 <= contagem[:, :, :-1]
+        candidatas[:, :, 1:] = np.cumprod(abertas, axis=2, dtype=bool)
+        candidatas = candidatas.reshape(N, -1)
+
+        acumuladas = np.cumsum(candidatas, axis=1)
+        total = acumuladas[:, -1]
+        ativas = (passo < solicitadas) & (total > 0)
+        if not ativas.any():
+            break
+        escolha = np.minimum((sorteios[:, passo] * total).astype(np.int64), total - 1)
+        plana = np.argmax(acumuladas > escolha[:, None], axis=1)
+
+        ativas_idx = linhas[ativas]
+        plana = plana[ativas]
+        fileira, camada = np.divmod(plana, num_camadas)
+        contagem[ativas_idx, fileira, camada] += 1
+        posicao = contagem[ativas_idx, fileira, camada]
+        ocupacao[ativas_idx, deslocamento[plana] + posicao - 1] = 1
+        colocadas[ativas_idx] += 1
+
+    return {
+        "ocupacao": ocupacao,
+        "num_bobinas": colocadas,
+        "posicoes": posicoes,
+        "semente": semente,
+    }
+
+
+if __name__ == "__main__":
+    N = 10_000
+    inicio_tempo = time.perf_counter()
+    lote = gerar_lote_ocupacao(N, 3, 9, semente=42)
+    tempo = time.perf_counter() - inicio_tempo
+
+    print(f"\n{N} instâncias, {len(lote['posicoes'])} posições: {tempo:.3f} s")
+    print("matriz:", lote["ocupacao"].shape, lote["ocupacao"].dtype)
+    print("bobinas por instância (média):", lote["num_bobinas"].mean())
+
+    # Blocos gerados separadamente (como em processos diferentes) são iguais
+    # ao lote inteiro
+    partes = [
+        gerar_lote_ocupacao(N // 2, 3, 9, semente=42, inicio=inicio)["ocupacao"]
+        for inicio in (0, N // 2)
+    ]
+    print("blocos iguais ao lote:", np.array_equal(np.vstack(partes), lote["ocupacao"]))
@@ -72,43 +72,77 @@ def distribuir_bobinas(
         ocupacao_array = [0] * len(todas_posicoes_possiveis_ordenadas)  # Array de zeros para o espaço vazio
         return [], ocupacao_array  # Nenhuma bobina colocada
 
-    # 4. Loop principal para colocar bobinas
-    for _ in range(num_total_bobinas):
-        posicoes_validas_para_adicionar: List[Tuple[int, int, int]] = []
-
-        for r_idx in range(1, num_fileiras + 1):
-            bobinas_na_camada_1_fileira_r = [b for b in bobinas_colocadas if b[0] == r_idx and b[1] == 1]
-            num_bobinas_camada_1_fileira_r = len(bobinas_na_camada_1_fileira_r)
-
-            if num_bobinas_camada_1_fileira_r < max_bobinas_base_fileira:
-                posicao_para_adicionar_c1 = (r_idx, 1, num_bobinas_camada_1_fileira_r + 1)
-                posicoes_validas_para_adicionar.append(posicao_para_adicionar_c1)
-
-            max_camadas_teoricas_na_fileira = max_bobinas_base_fileira
-            for l_idx in range(2, max_camadas_teoricas_na_fileira + 1):
-                bobinas_na_camada_anterior = [b for b in bobinas_colocadas if b[0] == r_idx and b[1] == l_idx - 1]
-                num_bobinas_camada_anterior = len(bobinas_na_camada_anterior)
-
-                if num_bobinas_camada_anterior == 0:
-                    break
+    # 4. Loop principal para colocar bobinas.
+    #    Cada fileira guarda a contagem de bobinas por camada e o topo da cadeia
+    #    de camadas abertas: as candidatas da fileira são a camada 1 (se a base
+    #    não está cheia) e as camadas 2..topo, em que a camada l está aberta
+    #    quando N_l + 1 <= N_(l-1) - 1 e todas as camadas entre 2 e l também
+    #    estão. Uma árvore de Fenwick com o número de candidatas por fileira
+    #    localiza a candidata sorteada, na mesma ordem (fileira, camada) da
+    #    lista de candidatas original, sem reconstruir a lista a cada bobina.
+    num_camadas = max_bobinas_base_fileira
+    contagem = [[0] * (num_camadas + 1) for _ in range(num_fileiras + 1)]
+    topo = [1] * (num_fileiras + 1)  # apenas a camada 1 enquanto a fileira está vazia
+    arvore = [0] * (num_fileiras + 1)
+
+    def candidatas_fileira(r: int) -> int:
+        base_aberta = 1 if contagem[r][1] < max_bobinas_base_fileira else 0
+        return base_aberta + topo[r] - 1
+
+    def atualizar_arvore(r: int, delta: int) -> None:
+        while r <= num_fileiras:
+            arvore[r] += delta
+            r += r & -r
+
+    def localizar_fileira(i: int) -> Tuple[int, int]:
+        # Fileira que contém a i-ésima candidata (0-indexada) e o deslocamento nela
+        r = 0
+        passo = 1 << num_fileiras.bit_length()
+        while passo:
+            proxima = r + passo
+            if proxima <= num_fileiras and arvore[proxima] <= i:
+                r = proxima
+                i -= arvore[proxima]
+            passo >>= 1
+        return r + 1, i
+
+    total_candidatas = 0
+    for r_idx in range(1, num_fileiras + 1):
+        atualizar_arvore(r_idx, candidatas_fileira(r_idx))
+        total_candidatas += candidatas_fileira(r_idx)
 
-                bobinas_na_camada_atual_l = [b for b in bobinas_colocadas if b[0] == r_idx and b[1] == l_idx]
-                num_bobinas_camada_atual_l = len(bobinas_na_camada_atual_l)
-
-                if num_bobinas_camada_atual_l + 1 <= num_bobinas_camada_anterior - 1:
-                    posicao_para_adicionar_cl = (r_idx, l_idx, num_bobinas_camada_atual_l + 1)
-                    posicoes_validas_para_adicionar.append(posicao_para_adicionar_cl)
-                else:
-                    break
-
-        if not posicoes_validas_para_adicionar:
+    for _ in range(num_total_bobinas):
+        if total_candidatas == 0:
             print(f"Aviso: Não foi possível encontrar uma posição válida para a próxima bobina. "
                   f"{len(bobinas_colocadas)} de {num_total_bobinas} bobinas foram colocadas.")
             # Sai do loop de colocação; bobinas_colocadas contém as bobinas colocadas até este ponto.
             break
 
-        posicao_escolhida = random.choice(posicoes_validas_para_adicionar)
-        bobinas_colocadas.append(posicao_escolhida)
+        # Mesmo sorteio de random.choice sobre a lista de candidatas
+        r_idx, deslocamento = localizar_fileira(random.randrange(total_candidatas))
+        if contagem[r_idx][1] < max_bobinas_base_fileira:
+            l_idx = 1 if deslocamento == 0 else deslocamento + 1
+        else:
+            l_idx = deslocamento + 2
+
+        antes = candidatas_fileira(r_idx)
+        contagem_fileira = contagem[r_idx]
+        contagem_fileira[l_idx] += 1
+        bobinas_colocadas.append((r_idx, l_idx, contagem_fileira[l_idx]))
+
+        # Só as camadas a partir de l_idx mudam de estado
+        l_loop = max(l_idx, 2)
+        topo[r_idx] = l_loop - 1
+        while (
+            l_loop <= num_camadas
+            and contagem_fileira[l_loop] + 1 <= contagem_fileira[l_loop - 1] - 1
+        ):
+            topo[r_idx] = l_loop
+            l_loop += 1
+        delta = candidatas_fileira(r_idx) - antes
+        if delta:
+            atualizar_arvore(r_idx, delta)
+            total_candidatas += delta
 
     # 5. Gerar o array de ocupação final com base nas bobinas efetivamente colocadas.
     ocupacao_array_final: List[int] = []
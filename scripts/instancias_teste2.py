@@ -76,6 +76,10 @@ def distribuir_bobinas(
     posicoes_para_tentar_preencher = list(todas_posicoes_possiveis_ordenadas)
     random.shuffle(posicoes_para_tentar_preencher)
 
+    # Contagem de bobinas por fileira e camada, atualizada a cada bobina colocada
+    # (evita varrer bobinas_colocadas para cada posição testada)
+    contagem = [[0, 0, 0] for _ in range(num_fileiras + 1)]
+
     # Iterar sobre as posições embaralhadas e tentar colocar as bobinas
     for r_idx, l_idx, p_idx in posicoes_para_tentar_preencher:
         if len(bobinas_colocadas) >= num_total_bobinas:
@@ -86,18 +90,15 @@ def distribuir_bobinas(
 
         is_position_currently_valid = False
         if l_idx == 1:  # Posição na camada base
-            bobinas_na_camada_1_fileira_r = [b for b in bobinas_colocadas if b[0] == r_idx and b[1] == 1]
-            num_bobinas_camada_1_fileira_r = len(bobinas_na_camada_1_fileira_r)
+            num_bobinas_camada_1_fileira_r = contagem[r_idx][1]
             # A posição p_idx deve ser a próxima na sequência E dentro do limite da base
             if p_idx == num_bobinas_camada_1_fileira_r + 1 and p_idx <= max_bobinas_base_fileira:
                 is_position_currently_valid = True
         elif l_idx == 2:  # Posição na segunda camada
-            bobinas_na_camada_anterior = [b for b in bobinas_colocadas if b[0] == r_idx and b[1] == 1]  # Camada 1
-            num_bobinas_camada_anterior = len(bobinas_na_camada_anterior)
+            num_bobinas_camada_anterior = contagem[r_idx][1]  # Camada 1
 
             if num_bobinas_camada_anterior > 0:  # Deve haver bobinas na camada 1 para suportar a 2
-                bobinas_na_camada_atual_l = [b for b in bobinas_colocadas if b[0] == r_idx and b[1] == 2]  # Camada 2
-                num_bobinas_camada_atual_l = len(bobinas_na_camada_atual_l)
+                num_bobinas_camada_atual_l = contagem[r_idx][2]  # Camada 2
 
                 # Verifica se a posição 'p_idx' é a próxima na sequência para a camada 2
                 # E se a regra N_camada_2 <= N_camada_1 - 1 é respeitada
@@ -109,6 +110,7 @@ def distribuir_bobinas(
         if is_position_currently_valid:
             bobinas_colocadas.append((r_idx, l_idx, p_idx))
             bobinas_colocadas_set.add((r_idx, l_idx, p_idx))
+            contagem[r_idx][l_idx] += 1
 
     # Gerar o array de ocupação final com base nas bobinas efetivamente colocadas.
     ocupacao_array_final: List[int] = []
@@ -288,4 +290,4 @@ if __name__ == '__main__':
     print(f"Array de ocupação: {ocupacao_ex7}")
     if arranjo_ex7 or num_bobinas_ex7 == 0:
         plotar_organizacao(arranjo_ex7, num_bobinas_ex7, num_fileiras_ex7, max_base_ex7)
-    print("-" * 30)
\ No newline at end of file
+    print("-" * 30)
\ No newline at end of file
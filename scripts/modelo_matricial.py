@@ -0,0 +1,302 @@
+import numpy as np
+from gurobipy import Model, GRB
+
+from indice_posicoes import indice_de_posicoes
+
+
+def permutar_eixos(mvar, eixos):
+    """
+    Equivalente a np.transpose(mvar, eixos) para MVar, que só aceita a
+    transposta completa.
+    """
+    indices = np.arange(mvar.size).reshape(mvar.shape).transpose(eixos)
+    return mvar.reshape(-1)[indices]
+
+
+def construir_modelo_matricial(
+    model,
+    Psi,
+    Psi1,
+    Psi2,
+    Phi,
+    I,
+    O,
+    t_load,
+    t_empty,
+    E_load,
+    E_empty,
+    A,
+    A_in,
+    A_out,
+    S,
+    janelas,
+    ocupacao: str = "acumulada",
+    ocupacao_inicial=None,
+    big_m: str = "fixo",
+    multiplicidade=None,
+    ocupacao_fixa=None,
+) -> Model:
+    """
+    Mesmo modelo de construir_modelo (teste.py), mas com W, V, x e tau como
+    MVar e cada família de restrições (R1–R19) escrita como uma única
+    expressão matricial (R16 "acumulada", uma por seção).
+
+    As linhas de cada família são geradas na mesma ordem dos laços de
+    construir_modelo, de modo que a matriz de restrições resultante é igual.
+    `ocupacao` escolhe a formulação de R16 e `ocupacao_inicial` fixa x na
+    seção 0, como em construir_modelo. `big_m` escolhe o M de R5–R7 ("fixo"
+    ou "apertado", ver calcular_big_m em teste.py) e `multiplicidade` o
+    número de bobinas representadas por cada índice de A (ver agregacao.py).
+    `ocupacao_fixa` marca posições ocupadas por bobinas estáticas retiradas
+    de A (ver presolve.py).
+    """
+    from teste import calcular_big_m
+
+    if ocupacao not in ("acumulada", "fluxo"):
+        raise ValueError(f"Formulação de ocupação desconhecida: {ocupacao}")
+    if big_m not in ("fixo", "apertado"):
+        raise ValueError(f"Opção de big-M desconhecida: {big_m}")
+
+    M = 999  # constante grande
+
+    # Mesmas dimensões usadas em construir_modelo
+    num_S = S
+    num_Phi = len(Phi)
+    num_A = len(A)
+    # Índices das bobinas de entrada e de saída em A
+    A_in = np.asarray(A_in, dtype=int)
+    A_out = np.asarray(A_out, dtype=int)
+    num_A_in = len(A_in)
+    num_A_out = len(A_out)
+    indice = indice_de_posicoes(Phi, I, O)
+    entrada = 0
+    saida = num_Phi - 1
+    # `q not in I` / `k not in O` em construir_modelo excluem o índice 0
+    inicio_q = 1 if len(I) > 0 else 0
+    inicio_k = 1 if len(O) > 0 else 0
+
+    if ocupacao_fixa is None:
+        ocupacao_fixa = np.zeros(num_Phi)
+    ocupacao_fixa = np.asarray(ocupacao_fixa, dtype=float)
+
+    sigma_plus = np.asarray(janelas["sigma_plus"])
+    omega_minus = np.asarray(janelas["omega_minus"])
+
+    t_load = np.asarray(t_load)[:num_Phi, :num_Phi]
+    t_empty = np.asarray(t_empty)[:num_Phi, :num_Phi]
+    E_load = np.asarray(E_load)[:num_Phi, :num_Phi, :num_A]
+    E_empty = np.asarray(E_empty)[:num_Phi, :num_Phi]
+
+    # W[s][k][q][a] = 1 se bobina a se move de k -> q na seção s
+    W = model.addMVar((num_S, num_Phi, num_Phi, num_A), vtype=GRB.BINARY, name="W")
+
+    # V[s][k][q] = 1 se movimentação vazia de k -> q ocorre na seção s
+    V = model.addMVar((num_S, num_Phi, num_Phi), vtype=GRB.BINARY, name="V")
+
+    # x[s][q][a] = 1 se bobina a está na posição q na seção s
+    x = model.addMVar((num_S, num_Phi, num_A), vtype=GRB.BINARY, name="x")
+
+    # τ[s] = instante de tempo do início da seção s
+    tau = model.addMVar(num_S, vtype=GRB.CONTINUOUS, name="tau")
+
+    # Ocupação inicial (seção 0) fixada pelos limites de x
+    if ocupacao_inicial is not None:
+        x[0].LB = np.asarray(ocupacao_inicial)[:num_Phi, :num_A]
+        x[0].UB = np.asarray(ocupacao_inicial)[:num_Phi, :num_A]
+
+    # M de cada restrição de R5–R7
+    if big_m == "apertado":
+        limites_M = calcular_big_m(janelas, t_load, t_empty, num_S)
+        tau.UB = limites_M["tau_max"]
+        M5 = limites_M["R5"]
+        M6 = np.broadcast_to(limites_M["R6"][:, None], M5.shape)
+        M7 = np.broadcast_to(limites_M["R7"][:, None], M5.shape)
+    else:
+        limites_M = None
+        M5 = M6 = M7 = np.full((num_A, num_S), M)
+
+    model._W = W
+    model._V = V
+    model._x = x
+    model._tau = tau
+    model._M = M
+    model._big_m = limites_M
+
+    # Visões auxiliares
+    x_as = permutar_eixos(x, (2, 0, 1))  # x[a, s, k]
+    x_ks = permutar_eixos(x, (1, 0, 2))  # x[k, s, a]
+
+    # R (1) - tempo_inicial_zero
+    model.addConstr(tau[0] == 0, name="R1_tempo_inicial_zero")
+
+    # R (2) - entrada_unica_bobina
+    if num_A_in > 0:
+        W_entrada = permutar_eixos(W[:, entrada, inicio_q:, :][..., A_in], (2, 0, 1))
+        model.addConstr(
+            W_entrada.sum(axis=(1, 2)) == 1, name="R2_entrada_unica_bobina"
+        )
+
+    # R (3) - saida_unica_bobina
+    if num_A_out > 0:
+        W_saida = permutar_eixos(W[:, inicio_k:, saida, :][..., A_out], (2, 0, 1))
+        model.addConstr(
+            W_saida.sum(axis=(1, 2)) == 1, name="R3_saida_unica_bobina"
+        )
+
+    # R (4) - nao_entrega_bobina_armazenada
+    nao_saem = np.setdiff1d(np.arange(num_A), A_out)
+    if len(nao_saem) > 0:
+        W_nao_saida = permutar_eixos(W[:, :, saida, :][..., nao_saem], (2, 0, 1))
+        model.addConstr(
+            W_nao_saida.sum(axis=(1, 2)) == 0, name="R4_nao_entrega_bobina"
+        )
+
+    if num_A_in > 0:
+        x_entrada = x_as[A_in, :, entrada]  # (a, s)
+
+        # R (5) - janela_max_entrada
+        model.addConstr(
+            tau + sigma_plus[A_in, None] <= (1 - x_entrada) * M5[A_in],
+            name="R5_janela_max_entrada",
+        )
+
+        # R (6) - janela_min_entrada
+        model.addConstr(
+            omega_minus[A_in, None] - tau <= x_entrada * M6[A_in],
+            name="R6_janela_min_entrada",
+        )
+
+    # R (7) - tempo_min_saida
+    if num_A_out > 0:
+        W_saida_t = W[:, :, saida, :][..., A_out]  # (s, k, a)
+        tempo_saida = permutar_eixos(W_saida_t, (2, 0, 1)).reshape(
+            num_A_out * num_S, num_Phi
+        ) @ t_load[:, saida]
+        tau_rep = tau[np.tile(np.arange(num_S), num_A_out)]
+        x_saida = x_as[A_out, :, saida].reshape(-1)
+        omega_rep = np.repeat(omega_minus[A_out], num_S)
+        model.addConstr(
+            omega_rep - (tau_rep + tempo_saida)
+            <= (1 - x_saida) * M7[A_out].reshape(-1),
+            name="R7_tempo_min_saida",
+        )
+
+    # R (8) - tempo_progressao
+    if num_S > 1:
+        model.addConstr(
+            V[:-1].reshape(num_S - 1, -1) @ t_empty.reshape(-1)
+            + W[:-1].reshape(num_S - 1, -1) @ np.repeat(t_load.reshape(-1), num_A)
+            <= 1,
+            name="R8_tempo_progressao",
+        )
+
+    # R (9) - bobina_ocupa_uma_posicao
+    if multiplicidade is None:
+        multiplicidade = np.ones(num_A)
+    model.addConstr(
+        x_as.sum(axis=2) == np.asarray(multiplicidade)[:, None],
+        name="R9_bobina_ocupa_uma_posicao",
+    )
+
+    # R (10) - espaco_ocupa_uma_bobina (sem o ponto de entrada, que é uma fila)
+    model.addConstr(
+        x_ks[inicio_q:].sum(axis=2) <= 1 - ocupacao_fixa[inicio_q:, None],
+        name="R10_espaco_ocupa_uma_bobina",
+    )
+
+    # R (11) - bloqueia_movimento_para_entrada
+    model.addConstr(
+        W[:, :, entrada, :].sum(axis=(1, 2)) == 0,
+        name="R11_bloqueia_movimento_para_entrada",
+    )
+
+    # R (12) - bloqueia_movimento_para_saida
+    model.addConstr(
+        W[:, saida, :, :].sum(axis=(1, 2)) == 0,
+        name="R12_bloqueia_movimento_para_saida",
+    )
+
+    # R (13) - max_1_movimento_por_secao
+    model.addConstr(
+        V.sum(axis=(1, 2)) + W.sum(axis=(1, 2, 3)) <= 1,
+        name="R13_max_1_movimento_por_secao",
+    )
+
+    if num_S > 1:
+        # R (14) - precedencia_carregado_apos_vazio
+        model.addConstr(
+            permutar_eixos(W[1:], (1, 0, 2, 3)).sum(axis=(2, 3))
+            == permutar_eixos(V[:-1], (2, 0, 1)).sum(axis=2),
+            name="R14_precedencia_carregado_apos_vazio",
+        )
+
+        # R (15) - precedencia_vazio_apos_carregado
+        model.addConstr(
+            permutar_eixos(V[1:], (1, 0, 2)).sum(axis=2)
+            - permutar_eixos(W[:-1], (2, 0, 1, 3)).sum(axis=(2, 3))
+            <= 0,
+            name="R15_precedencia_vazio_apos_carregado",
+        )
+
+        # R (16) - ocupacao_depende_movimentos_anteriores
+        if ocupacao == "fluxo":
+            # x[k, s, a] = x[k, s-1, a] - saídas de k + chegadas em k (seção s-1)
+            W_sai_de_k = permutar_eixos(W[:-1], (1, 0, 2, 3)).sum(axis=2)
+            W_chega_em_k = permutar_eixos(W[:-1], (2, 0, 1, 3)).sum(axis=2)
+            model.addConstr(
+                x_ks[:, 1:, :] == x_ks[:, :-1, :] - W_sai_de_k + W_chega_em_k,
+                name="R16_conservacao_fluxo",
+            )
+        else:
+            # x[k, s, a] = x[k, 0, a] - saídas + chegadas das seções < s,
+            # uma seção por vez (mesma ordem de linhas de construir_modelo)
+            W_sai_de_k = permutar_eixos(W, (1, 0, 2, 3)).sum(axis=2)
+            W_chega_em_k = permutar_eixos(W, (2, 0, 1, 3)).sum(axis=2)
+            for s in range(1, num_S):
+                model.addConstr(
+                    x[s]
+                    == x[0]
+                    - W_sai_de_k[:, :s, :].sum(axis=1)
+                    + W_chega_em_k[:, :s, :].sum(axis=1),
+                    name=f"R16_ocupacao_depende_movimentos_anteriores_s{s}",
+                )
+
+    # R17 - vizinho_superior / R18 - vizinho_inferior (bloqueadoras à
+    # direita/esquerda de cada inferior) e R19 - inferiores_ocupados (apoios
+    # de cada superior), pelo índice do layout
+    W_sai_de = W.sum(axis=(2, 3))  # (s, k)
+    W_chega_em = W.sum(axis=(1, 3))  # (s, q)
+    ocupadas = x.sum(axis=2)  # (s, k)
+    for nome, lado in (
+        ("R17_vizinho_superior", "direito"),
+        ("R18_vizinho_inferior", "esquerdo"),
+    ):
+        inferiores, bloqueadoras = indice.pares_bloqueio(lado)
+        if len(inferiores) > 0:
+            model.addConstr(
+                W_sai_de[:, inferiores]
+                <= 1 - ocupadas[:, bloqueadoras] - ocupacao_fixa[bloqueadoras],
+                name=nome,
+            )
+
+    superiores = indice.superiores
+    if len(superiores) > 0:
+        esquerda = indice.apoio_esquerdo[superiores]
+        direita = indice.apoio_direito[superiores]
+        model.addConstr(
+            2 * W_chega_em[:, superiores]
+            <= ocupadas[:, esquerda]
+            + ocupadas[:, direita]
+            + ocupacao_fixa[esquerda]
+            + ocupacao_fixa[direita],
+            name="R19_inferiores_ocupados",
+        )
+
+    model.setObjective(
+        W.reshape(-1) @ np.broadcast_to(E_load, W.shape).reshape(-1)
+        + V.reshape(-1) @ np.broadcast_to(E_empty, V.shape).reshape(-1),
+        GRB.MINIMIZE,
+    )
+    model.update()
+
+    return model
@@ -0,0 +1,294 @@
+"""
+Templates de modelo reaproveitados entre instâncias com a mesma geometria de
+armazém.
+
+O modelo é construído uma única vez por chave (num_fileiras,
+num_posicoes_nivel_inferior, num_entrada_saida, |A|, |S|); nas instâncias
+seguintes apenas os lados direitos (janelas de tempo), os coeficientes
+(custos de movimentação) e os limites (ocupação inicial) são alterados.
+
+Uso:
+    python scripts/modelo_template.py
+"""
+
+import time
+import numpy as np
+from gurobipy import Model
+
+from backends import ambiente_gurobi
+from teste import (
+    construir_modelo,
+    gerar_arcos,
+    gerar_custos_de_movimentacao,
+    gerar_janelas_de_tempo,
+    gerar_posicoes,
+)
+
+
+class ModeloTemplate:
+    """
+    Modelo de armazenagem construído para uma geometria fixa e atualizado
+    in-place a cada nova instância.
+    """
+
+    def __init__(
+        self,
+        num_fileiras: int,
+        num_posicoes_nivel_inferior: int,
+        num_entrada_saida: int,
+        num_bobinas: int,
+        num_bobinas_entrada: int,
+        num_bobinas_saida: int,
+        S: int,
+        arcos_esparsos: bool = False,
+        ocupacao: str = "acumulada",
+    ):
+        self.chave = chave_template(
+            num_fileiras,
+            num_posicoes_nivel_inferior,
+            num_entrada_saida,
+            num_bobinas,
+            num_bobinas_entrada,
+            num_bobinas_saida,
+            S,
+            arcos_esparsos,
+            ocupacao,
+        )
+        self.posicoes = gerar_posicoes(
+            num_fileiras, num_posicoes_nivel_inferior, num_entrada_saida
+        )
+        self.custos = gerar_custos_de_movimentacao(
+            self.posicoes["Phi"], num_bobinas
+        )
+        self.A = list(range(num_bobinas))
+        self.A_in = list(range(num_bobinas_entrada))
+        self.A_out = list(range(num_bobinas_saida))
+        self.S = S
+
+        arcos = None
+        if arcos_esparsos:
+            arcos = gerar_arcos(self.posicoes["Phi"], self.A, self.A_out)
+
+        # Janelas provisórias; são substituídas em atualizar(). O modelo fica
+        # no ambiente compartilhado do processo, como em gerar_modelo
+        self.model = Model("Armazenagem", env=ambiente_gurobi())
+        construir_modelo(
+            self.model,
+            self.posicoes["Psi"],
+            self.posicoes["Psi1"],
+            self.posicoes["Psi2"],
+            self.posicoes["Phi"],
+            self.posicoes["I"],
+            self.posicoes["O"],
+            self.custos["t_load"],
+            self.custos["t_empty"],
+            self.custos["E_load"],
+            self.custos["E_empty"],
+            self.A,
+            self.A_in,
+            self.A_out,
+            S,
+            gerar_janelas_de_tempo(num_bobinas),
+            arcos=arcos,
+            ocupacao=ocupacao,
+        )
+
+        # x na seção 0, na ordem (k, a), para atualizar os limites em lote
+        model = self.model
+        self._x0 = [
+            model._x[0, k, a]
+            for k in range(len(self.posicoes["Phi"]))
+            for a in range(num_bobinas)
+        ]
+
+    def atualizar(self, janelas, ocupacao_inicial=None, custos=None):
+        """
+        Troca os parâmetros da instância sem reconstruir o modelo.
+
+        - janelas: lados direitos de R5, R6 e R7;
+        - ocupacao_inicial: limites de x na seção 0 (None libera x[0]);
+        - custos: coeficientes de R7, R8 e do objetivo.
+        """
+        model = self.model
+        M = model._M
+        restricoes = model._restricoes
+        sigma_plus = janelas["sigma_plus"]
+        omega_minus = janelas["omega_minus"]
+
+        # Lados direitos (forma normalizada pelo Gurobi de R5, R6 e R7)
+        R5 = list(restricoes["R5"].items())
+        R6 = list(restricoes["R6"].items())
+        R7 = list(restricoes["R7"].items())
+        model.setAttr(
+            "RHS", [c for _, c in R5], [M - sigma_plus[a] for (a, s), _ in R5]
+        )
+        model.setAttr(
+            "RHS", [c for _, c in R6], [-omega_minus[a] for (a, s), _ in R6]
+        )
+        model.setAttr(
+            "RHS", [c for _, c in R7], [M - omega_minus[a] for (a, s), _ in R7]
+        )
+
+        # Limites
+        if ocupacao_inicial is None:
+            model.setAttr("LB", self._x0, [0.0] * len(self._x0))
+            model.setAttr("UB", self._x0, [1.0] * len(self._x0))
+        else:
+            valores = np.asarray(ocupacao_inicial, dtype=float).reshape(-1)
+            model.setAttr("LB", self._x0, valores.tolist())
+            model.setAttr("UB", self._x0, valores.tolist())
+
+        # Coeficientes
+        if custos is not None:
+            self._atualizar_custos(custos)
+
+        model.update()
+        return model
+
+    def _atualizar_custos(self, custos):
+        model = self.model
+        W = model._W
+        V = model._V
+        arcos = model._arcos
+        saida = len(self.posicoes["Phi"]) - 1
+        t_load = custos["t_load"]
+        t_empty = custos["t_empty"]
+
+        for (a, s), c in model._restricoes["R7"].items():
+            for k in arcos["W"][arcos["classe"][a]]["predecessores"][saida]:
+                model.chgCoeff(c, W[s, k, saida, a], -t_load[k, saida])
+
+        for s, c in model._restricoes["R8"].items():
+            for k, q in arcos["V"]["arcos"]:
+                model.chgCoeff(c, V[s - 1, k, q], t_empty[k, q])
+            for k, q, a in arcos["indices_W"]:
+                model.chgCoeff(c, W[s - 1, k, q, a], t_load[k, q])
+
+        model.setAttr(
+            "Obj",
+            list(W.values()),
+            [custos["E_load"][k][q][a] for (s, k, q, a) in W.keys()],
+        )
+        model.setAttr(
+            "Obj",
+            list(V.values()),
+            [custos["E_empty"][k][q] for (s, k, q) in V.keys()],
+        )
+        self.custos = custos
+
+    def resolver(self, janelas, ocupacao_inicial=None, custos=None):
+        self.atualizar(janelas, ocupacao_inicial, custos)
+        self.model.optimize()
+        return self.model
+
+    def dispose(self):
+        self.model.dispose()
+
+
+def chave_template(
+    num_fileiras,
+    num_posicoes_nivel_inferior,
+    num_entrada_saida,
+    num_bobinas,
+    num_bobinas_entrada,
+    num_bobinas_saida,
+    S,
+    arcos_esparsos=False,
+    ocupacao="acumulada",
+):
+    """
+    Chave da geometria. Além de (fileiras, base, entrada/saída, |A|, |S|)
+    inclui |A_in|, |A_out| e as opções de construção, que também mudam quais
+    restrições existem.
+    """
+    return (
+        num_fileiras,
+        num_posicoes_nivel_inferior,
+        num_entrada_saida,
+        num_bobinas,
+        S,
+        num_bobinas_entrada,
+        num_bobinas_saida,
+        arcos_esparsos,
+        ocupacao,
+    )
+
+
+_templates = {}
+
+
+def obter_template(
+    num_fileiras: int,
+    num_posicoes_nivel_inferior: int,
+    num_entrada_saida: int,
+    num_bobinas: int,
+    num_bobinas_entrada: int,
+    num_bobinas_saida: int,
+    S: int,
+    arcos_esparsos: bool = False,
+    ocupacao: str = "acumulada",
+) -> ModeloTemplate:
+    """
+    Retorna o template da geometria, construindo-o na primeira chamada.
+    """
+    chave = chave_template(
+        num_fileiras,
+        num_posicoes_nivel_inferior,
+        num_entrada_saida,
+        num_bobinas,
+        num_bobinas_entrada,
+        num_bobinas_saida,
+        S,
+        arcos_esparsos,
+        ocupacao,
+    )
+    if chave not in _templates:
+        _templates[chave] = ModeloTemplate(
+            num_fileiras,
+            num_posicoes_nivel_inferior,
+            num_entrada_saida,
+            num_bobinas,
+            num_bobinas_entrada,
+            num_bobinas_saida,
+            S,
+            arcos_esparsos,
+            ocupacao,
+        )
+    return _templates[chave]
+
+
+def limpar_templates():
+    for template in _templates.values():
+        template.dispose()
+    _templates.clear()
+
+
+if __name__ == "__main__":
+    geometria = {
+        "num_fileiras": 2,
+        "num_posicoes_nivel_inferior": 3,
+        "num_entrada_saida": 1,
+        "num_bobinas": 2,
+        "num_bobinas_entrada": 1,
+        "num_bobinas_saida": 1,
+        "S": 3,
+    }
+    num_instancias = 20
+
+    inicio = time.perf_counter()
+    for _ in range(num_instancias):
+        janelas = gerar_janelas_de_tempo(geometria["num_bobinas"])
+        template = obter_template(**geometria)
+        template.atualizar(janelas)
+    tempo_template = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for _ in range(num_instancias):
+        ModeloTemplate(**geometria).dispose()
+    tempo_reconstrucao = time.perf_counter() - inicio
+
+    limpar_templates()
+
+    print(f"\n{num_instancias} instâncias com a mesma geometria")
+    print(f"template + atualização: {tempo_template:.4f} s")
+    print(f"reconstrução completa:  {tempo_reconstrucao:.4f} s")
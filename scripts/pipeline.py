@@ -0,0 +1,260 @@
+"""
+Pipeline em fluxo: geração de instâncias -> conjuntos de posições e classes
+de bobinas -> custos -> modelo -> resolução -> registro.
+
+Cada etapa é um gerador que consome os itens da etapa anterior um a um:
+nada é produzido antes de a etapa seguinte pedir (contrapressão), cada
+etapa mantém no máximo um item em mãos e o registro grava uma linha por
+instância e descarta o modelo. Uma varredura de 10 mil instâncias roda em
+memória constante.
+
+Os itens são dicionários que cada etapa completa: "id", "parametros" e
+"instancia" (geração), "posicoes", "A", "A_in", "A_out", "ocupacao_inicial"
+e "janelas" (conversão), "custos", "backend" e "resultado".
+
+Uso:
+    python scripts/pipeline.py
+"""
+
+import json
+import time
+from functools import lru_cache
+import numpy as np
+
+from backends import criar_backend
+from cache_custos import obter_custos_de_movimentacao
+from indice_posicoes import MAX_LAYOUTS
+from teste import construir_modelo, gerar_janelas_de_tempo, gerar_posicoes
+
+
+@lru_cache(maxsize=MAX_LAYOUTS)
+def _posicoes_do_layout(num_fileiras, num_posicoes_nivel_inferior, num_entrada_saida):
+    # gerar_posicoes uma vez por layout
+    return gerar_posicoes(num_fileiras, num_posicoes_nivel_inferior, num_entrada_saida)
+
+
+def gerar_instancias(num_instancias: int, parametros: dict, semente: int = 0):
+    """
+    Etapa de geração: instâncias de gerar_instancia_armazenagem com
+    random_seed = semente + id.
+    """
+    from gerar_instancia_armazenagem import gerar_instancia_armazenagem
+
+    for i in range(num_instancias):
+        yield {
+            "id": i,
+            "semente": semente + i,
+            "parametros": parametros,
+            "instancia": gerar_instancia_armazenagem(
+                **parametros, random_seed=semente + i
+            ),
+        }
+
+
+def ler_suite(diretorio: str, parametros: dict, semente: int = 0):
+    """
+    Etapa de geração a partir de uma suíte gravada (formato_instancias).
+    """
+    from formato_instancias import carregar_instancias
+
+    suite = carregar_instancias(diretorio)
+    for i in range(len(suite)):
+        yield {
+            "id": i,
+            "semente": semente + i,
+            "parametros": parametros,
+            "instancia": suite.instancia(i),
+        }
+
+
+def converter(itens):
+    """
+    Etapa de conversão: posições no formato de gerar_posicoes, bobinas em A
+    na ordem da instância, com A_in e A_out como listas de índices de A,
+    ocupação inicial (bobinas armazenadas na sua posição, bobinas de entrada
+    na fila do ponto de entrada) e janelas de tempo, sorteadas por um
+    gerador próprio de cada item (semente do item).
+    """
+    for item in itens:
+        parametros = item["parametros"]
+        posicoes = _posicoes_do_layout(
+            parametros["num_fileiras"],
+            parametros["num_posicoes_nivel_inferior"],
+            max(len(parametros["pontos_entrada"]), 1),
+        )
+        Phi = posicoes["Phi"]
+        indice = {p: k for k, p in enumerate(Phi)}
+
+        bobinas = [b for b in item["instancia"] if b["id"] is not None]
+        A_in = [a for a, b in enumerate(bobinas) if b["tipo"] == "entrada"]
+        A_out = [a for a, b in enumerate(bobinas) if b["tipo"] == "saida"]
+        ocupacao_inicial = np.zeros((len(Phi), len(bobinas)), dtype=int)
+        for a, bobina in enumerate(bobinas):
+            if bobina["tipo"] == "entrada":
+                ocupacao_inicial[0, a] = 1
+            else:
+                posicao = (bobina["y"] + 1, bobina["z"] + 1, int(bobina["x"]) + 1)
+                ocupacao_inicial[indice[posicao], a] = 1
+
+        rng = np.random.default_rng(item["semente"])
+        item.update(
+            posicoes=posicoes,
+            A=list(range(len(bobinas))),
+            A_in=A_in,
+            A_out=A_out,
+            ocupacao_inicial=ocupacao_inicial,
+            janelas=gerar_janelas_de_tempo(len(bobinas), rng),
+        )
+        del item["instancia"]
+        yield item
+
+
+def calcular_custos(itens, cinematica=None):
+    """
+    Etapa de custos: matrizes do cache em disco (compartilhadas entre as
+    instâncias do mesmo layout).
+    """
+    for item in itens:
+        item["custos"] = obter_custos_de_movimentacao(
+            item["posicoes"]["Phi"], len(item["A"]), cinematica=cinematica
+        )
+        yield item
+
+
+def construir(itens, S: int = 3, solver: str = "gurobi", **opcoes):
+    """
+    Etapa de construção: um backend novo por instância. `opcoes` vão para
+    construir_modelo (ocupacao, big_m, empilhamento, ...).
+    """
+    for item in itens:
+        posicoes, custos = item["posicoes"], item["custos"]
+        backend = criar_backend(solver)
+        inicio = time.perf_counter()
+        construir_modelo(
+            backend,
+            posicoes["Psi"],
+            posicoes["Psi1"],
+            posicoes["Psi2"],
+            posicoes["Phi"],
+            posicoes["I"],
+            posicoes["O"],
+            custos["t_load"],
+            custos["t_empty"],
+            custos["E_load"],
+            custos["E_empty"],
+            item["A"],
+            item["A_in"],
+            item["A_out"],
+            S,
+            item["janelas"],
+            ocupacao_inicial=item["ocupacao_inicial"],
+            **opcoes,
+        )
+        item["backend"] = backend
+        item["tempo_construcao"] = time.perf_counter() - inicio
+        yield item
+
+
+def resolver(itens, limite_tempo=None, threads=None):
+    """
+    Etapa de resolução.
+    """
+    for item in itens:
+        backend = item["backend"]
+        backend.resolver(limite_tempo=limite_tempo, threads=threads, silencioso=True)
+        item["resultado"] = {
+            "id": item["id"],
+            "bobinas": len(item["A"]),
+            "variaveis": backend.num_variaveis(),
+            "restricoes": backend.num_restricoes(),
+            "status": backend.status(),
+            "objetivo": backend.valor_objetivo(),
+            "tempo_construcao": item["tempo_construcao"],
+            "tempo_resolucao": backend.tempo_execucao(),
+        }
+        yield item
+
+
+def registrar(itens, arquivo=None):
+    """
+    Etapa de registro: descarta o modelo, grava o resultado como uma linha
+    JSON em `arquivo` (se houver) e devolve apenas o resultado.
+    """
+    saida = open(arquivo, "a") if arquivo else None
+    try:
+        for item in itens:
+            item["backend"].descartar()
+            resultado = item["resultado"]
+            if saida:
+                saida.write(json.dumps(resultado) + "\n")
+                saida.flush()
+            yield resultado
+    finally:
+        if saida:
+            saida.close()
+
+
+def pipeline(
+    num_instancias: int,
+    parametros: dict,
+    semente: int = 0,
+    S: int = 3,
+    solver: str = "gurobi",
+    arquivo=None,
+    limite_tempo=None,
+    cinematica=None,
+    **opcoes,
+):
+    """
+    Encadeia as etapas; retorna o gerador de resultados.
+    """
+    itens = gerar_instancias(num_instancias, parametros, semente)
+    itens = converter(itens)
+    itens = calcular_custos(itens, cinematica)
+    itens = construir(itens, S, solver, **opcoes)
+    itens = resolver(itens, limite_tempo)
+    return registrar(itens, arquivo)
+
+
+if __name__ == "__main__":
+    import collections
+    import tracemalloc
+
+    parametros = {
+        "num_fileiras": 1,
+        "num_posicoes_nivel_inferior": 3,
+        "num_bobinas_entrada": 0,
+        "num_bobinas_saida": 0,
+        "num_bobinas_bloqueadoras": 1,
+        "pontos_entrada": [(0, -1)],
+        "pontos_saida": [(0, 4)],
+        "incluir_irrelevantes": False,
+    }
+
+    tracemalloc.start()
+    status = collections.Counter()
+    picos = []
+    for resultado in pipeline(200, parametros):
+        status[resultado["status"]] += 1
+        if resultado["id"] % 50 == 49:
+            picos.append(tracemalloc.get_traced_memory()[0] / 2**20)
+    tracemalloc.stop()
+
+    # Bobinas de entrada e de saída na mesma instância: índices de A pelo
+    # tipo, e as de entrada juntas na fila do ponto de entrada
+    for num_entrada, num_saida in ((1, 0), (0, 1), (1, 1), (2, 1)):
+        mistos = dict(
+            parametros,
+            num_bobinas_entrada=num_entrada,
+            num_bobinas_saida=num_saida,
+        )
+        item = next(converter(gerar_instancias(1, mistos)))
+        print(f"entrada={num_entrada} saída={num_saida}:"
+              f" A_in={item['A_in']} A_out={item['A_out']}")
+        assert len(item["A_in"]) == num_entrada
+        assert len(item["A_out"]) == num_saida
+        assert item["ocupacao_inicial"][0].sum() == num_entrada
+
+    print("\nstatus:", dict(status))
+    print("memória após 50, 100, 150, 200 instâncias (MiB):",
+          ", ".join(f"{pico:.2f}" for pico in picos))
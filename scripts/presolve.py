@@ -0,0 +1,225 @@
+"""
+Presolve de bobinas estáticas.
+
+Bobinas que nunca precisam se mover (as "irrelevantes" de
+gerar_instancia_armazenagem: fora de A_in e A_out e sem bloquear nenhuma
+bobina de saída) saem de A e viram parâmetros: a posição que ocupam entra
+como ocupação fixa em R10 e nas restrições de empilhamento, e os arcos de W
+que chegam ou partem dela são removidos. Com isso desaparecem os blocos
+W[., ., ., a] e x[., ., a] dessas bobinas e as restrições correspondentes.
+
+Uso:
+    python scripts/presolve.py
+"""
+
+import numpy as np
+
+from heuristica import posicoes_iniciais, vizinhanca_empilhamento
+from teste import gerar_arcos
+
+
+def bobinas_estaticas(Phi, I, O, A, A_in, A_out, ocupacao_inicial):
+    """
+    Bobinas armazenadas que não entram, não saem e não estão sobre uma
+    bobina de saída (A_in e A_out são índices de A, como em
+    construir_modelo).
+    """
+    armazenagem, _, bloqueadores = vizinhanca_empilhamento(Phi, I, O)
+    posicao = posicoes_iniciais(ocupacao_inicial, A, A_in)
+    individuais = set(A_in) | set(A_out)
+
+    bloqueando = set()
+    for a in A_out:
+        bloqueando.update(bloqueadores[posicao[a]])
+
+    return [
+        a
+        for a in range(len(A))
+        if a not in individuais
+        and posicao[a] in armazenagem
+        and posicao[a] not in bloqueando
+    ]
+
+
+def restricoes_por_bobina(arcos, num_A, A_out, num_Phi, num_secoes):
+    """
+    Número de linhas de construir_modelo que dependem das bobinas de A e do
+    índice de arcos: R4, R9, R11, R12 e R16 (nas duas formulações).
+    """
+    entrada, saida = 0, num_Phi - 1
+    classe = arcos["classe"]
+    predecessores = {c: arcos["W"][c]["predecessores"] for c in arcos["W"]}
+    sucessores = {c: arcos["W"][c]["sucessores"] for c in arcos["W"]}
+
+    R4 = sum(
+        1
+        for a in range(num_A)
+        if a not in A_out and predecessores[classe[a]][saida]
+    )
+    R9 = num_A * num_secoes
+    R11 = num_secoes if any(predecessores[classe[a]][entrada] for a in range(num_A)) else 0
+    R12 = num_secoes if any(sucessores[classe[a]][saida] for a in range(num_A)) else 0
+    R16 = num_Phi * (num_secoes - 1) * num_A
+    return R4 + R9 + R11 + R12 + R16
+
+
+def presolve(
+    Phi,
+    I,
+    O,
+    A,
+    A_in,
+    A_out,
+    E_load,
+    janelas,
+    ocupacao_inicial,
+    num_secoes: int,
+    arcos_esparsos: bool = False,
+):
+    """
+    Retira as bobinas estáticas de A.
+
+    Retorna os dados reduzidos (A, A_in, A_out, E_load, janelas,
+    ocupacao_inicial, arcos, ocupacao_fixa) para construir_modelo, a lista `bobinas` com o índice
+    original de cada bobina restante e o resumo do que foi eliminado
+    (bobinas, variáveis de W e de x e restrições no índice de arcos de
+    construir_modelo; a construção matricial mantém os arcos densos).
+    """
+    ocupacao_inicial = np.asarray(ocupacao_inicial)
+    estaticas = bobinas_estaticas(Phi, I, O, A, A_in, A_out, ocupacao_inicial)
+    restantes = [a for a in range(len(A)) if a not in set(estaticas)]
+    novo_indice = {a: i for i, a in enumerate(restantes)}
+    A_in_reduzido = [novo_indice[a] for a in A_in]
+    A_out_reduzido = [novo_indice[a] for a in A_out]
+
+    ocupacao_fixa = ocupacao_inicial[:, estaticas].sum(axis=1)
+    posicoes_fixas = np.nonzero(ocupacao_fixa)[0].tolist()
+
+    completo = not arcos_esparsos
+    arcos_originais = gerar_arcos(Phi, A, A_out, completo=completo)
+    arcos = gerar_arcos(
+        Phi,
+        restantes,
+        A_out_reduzido,
+        completo=completo,
+        posicoes_fixas=posicoes_fixas,
+    )
+
+    num_W = len(arcos_originais["indices_W"]) - len(arcos["indices_W"])
+    num_restricoes = restricoes_por_bobina(
+        arcos_originais, len(A), A_out, len(Phi), num_secoes
+    ) - restricoes_por_bobina(
+        arcos, len(restantes), A_out_reduzido, len(Phi), num_secoes
+    )
+    return {
+        "A": list(range(len(restantes))),
+        "A_in": A_in_reduzido,
+        "A_out": A_out_reduzido,
+        "E_load": np.asarray(E_load)[:, :, restantes],
+        "janelas": {
+            chave: np.asarray(valores)[restantes]
+            for chave, valores in janelas.items()
+        },
+        "ocupacao_inicial": ocupacao_inicial[:, restantes],
+        "arcos": arcos,
+        "ocupacao_fixa": ocupacao_fixa,
+        "bobinas": restantes,
+        "eliminadas": {
+            "bobinas": len(estaticas),
+            "W": num_W * num_secoes,
+            "x": len(estaticas) * len(Phi) * num_secoes,
+            "restricoes": num_restricoes,
+        },
+    }
+
+
+if __name__ == "__main__":
+    from backends import criar_backend
+    from teste import (
+        construir_modelo,
+        gerar_custos_de_movimentacao,
+        gerar_janelas_de_tempo,
+        gerar_posicoes,
+    )
+
+    posicoes = gerar_posicoes(1, 3, 1)
+    Phi = posicoes["Phi"]
+    A = list(range(4))
+    A_in, A_out = [], [0]
+    S = 3
+    custos = gerar_custos_de_movimentacao(Phi, len(A))
+    janelas = gerar_janelas_de_tempo(len(A))
+
+    # Bobina de saída 0 sob a bloqueadora 1; 2 e 3 não precisam se mover
+    indice = {p: i for i, p in enumerate(Phi)}
+    ocupacao_inicial = np.zeros((len(Phi), len(A)), dtype=int)
+    ocupacao_inicial[indice[(1, 1, 1)], 0] = 1
+    ocupacao_inicial[indice[(1, 2, 1)], 1] = 1
+    ocupacao_inicial[indice[(1, 1, 2)], 2] = 1
+    ocupacao_inicial[indice[(1, 1, 3)], 3] = 1
+
+    reduzido = presolve(
+        Phi,
+        posicoes["I"],
+        posicoes["O"],
+        A,
+        A_in,
+        A_out,
+        custos["E_load"],
+        janelas,
+        ocupacao_inicial,
+        S,
+    )
+
+    tamanhos = {}
+    for nome, dados in (
+        (
+            "original",
+            {
+                "A": A,
+                "E_load": custos["E_load"],
+                "janelas": janelas,
+                "ocupacao_inicial": ocupacao_inicial,
+                "arcos": None,
+                "ocupacao_fixa": None,
+            },
+        ),
+        ("presolve", reduzido),
+    ):
+        backend = criar_backend("gurobi")
+        construir_modelo(
+            backend,
+            posicoes["Psi"],
+            posicoes["Psi1"],
+            posicoes["Psi2"],
+            Phi,
+            posicoes["I"],
+            posicoes["O"],
+            custos["t_load"],
+            custos["t_empty"],
+            dados["E_load"],
+            custos["E_empty"],
+            dados["A"],
+            A_in,
+            A_out,
+            S,
+            dados["janelas"],
+            arcos=dados["arcos"],
+            ocupacao_inicial=dados["ocupacao_inicial"],
+            ocupacao_fixa=dados["ocupacao_fixa"],
+        )
+        tamanhos[nome] = (backend.num_variaveis(), backend.num_restricoes())
+        backend.descartar()
+
+    print("\nbobinas estáticas eliminadas:", reduzido["eliminadas"]["bobinas"])
+    print(f"{'modelo':>9} {'variáveis':>10} {'restrições':>11}")
+    for nome, (variaveis, restricoes) in tamanhos.items():
+        print(f"{nome:>9} {variaveis:>10} {restricoes:>11}")
+    print(
+        "removidas:",
+        tamanhos["original"][0] - tamanhos["presolve"][0],
+        "variáveis,",
+        tamanhos["original"][1] - tamanhos["presolve"][1],
+        "restrições",
+        f"(presolve: {reduzido['eliminadas']['restricoes']})",
+    )
@@ -1,11 +1,11 @@
-from gurobipy import Model, GRB, quicksum
-
-model = Model("Armazenagem")
+from backends import BINARIA, CONTINUA, criar_backend
 
 import numpy as np
 
 
-def gerar_modelo(num_posicoes, num_secoes, num_bobinas, ):
+def gerar_modelo(num_posicoes, num_secoes, num_bobinas, solver="gurobi"):
+    backend = criar_backend(solver)
+    soma = backend.soma
 
     # Conjuntos
     Psi = list(range(num_posicoes))         # posições disponíveis
@@ -51,162 +51,161 @@ def gerar_modelo(num_posicoes, num_secoes, num_bobinas, ):
 
 
     # W[s][k][q][a] = 1 se bobina a se move de k -> q na seção s
-    W = model.addVars(len(S), len(Psi), len(Psi), len(A), vtype=GRB.BINARY, name="W")
+    W = backend.adicionar_variaveis((len(S), len(Psi), len(Psi), len(A)), BINARIA, "W")
 
     # V[s][k][q] = 1 se movimentação vazia de k -> q ocorre na seção s
-    V = model.addVars(len(S), len(Psi), len(Psi), vtype=GRB.BINARY, name="V")
+    V = backend.adicionar_variaveis((len(S), len(Psi), len(Psi)), BINARIA, "V")
 
     # x[s][q][a] = 1 se bobina a está na posição q na seção s
-    x = model.addVars(len(S), len(Psi), len(A), vtype=GRB.BINARY, name="x")
+    x = backend.adicionar_variaveis((len(S), len(Psi), len(A)), BINARIA, "x")
 
     # τ[s] = instante de tempo do início da seção s
-    tau = model.addVars(len(S), vtype=GRB.CONTINUOUS, name="tau")
+    tau = backend.adicionar_variaveis(len(S), CONTINUA, "tau")
 
 
     # Definindo restrições do modelo
 
 
-    model.addConstr(tau[0] == 0)  # restrição τ¹ = 0
+    backend.adicionar_restricao(tau[0] == 0)  # restrição τ¹ = 0
 
     for a in A_in:
-        model.addConstr(quicksum(W[s, Phi[0], q, a] for s in S for q in Psi) == 1, name=f"entrada_bobina_{a}")
+        backend.adicionar_restricao(soma(W[s, Phi[0], q, a] for s in S for q in Psi) == 1, nome=f"entrada_bobina_{a}")
 
     for a in A_out:
-        model.addConstr(quicksum(W[s, q, Phi[1], a] for s in S for q in Psi) == 1, name=f"saida_bobina_{a}")
+        backend.adicionar_restricao(soma(W[s, q, Phi[1], a] for s in S for q in Psi) == 1, nome=f"saida_bobina_{a}")
 
     for a in A:
         if a not in A_out:
-            model.addConstr(quicksum(W[s, k, Phi[1], a] for s in S for k in Psi) == 0, name=f"nao_movimenta_bobina_{a}")
+            backend.adicionar_restricao(soma(W[s, k, Phi[1], a] for s in S for k in Psi) == 0, nome=f"nao_movimenta_bobina_{a}")
 
 
     ## TODO: rename constraints after here
     for a in A_in: 
         for s in S:
-            model.addConstr(
+            backend.adicionar_restricao(
                 tau[s] + sigma_plus[a] <= (1 - x[s, Phi[0], a]) * M,
-                name=f"entrada_bobina_{a}_seção_{s}"
+                nome=f"entrada_bobina_{a}_seção_{s}"
             )
 
     for a in A_in: 
         for s in S:
-            model.addConstr(
+            backend.adicionar_restricao(
                 omega_minus[a] - tau[s] <= x[s, Phi[1], a] * M,
-                name=f"saida_bobina_{a}_seção_{s}"
+                nome=f"saida_bobina_{a}_seção_{s}"
             )
 
     for a in A_out:
         for s in S:
-            model.addConstr(
-                omega_minus[a] - (tau[s] + quicksum(W[s, k, Phi[1], a] * t_load[k, Phi[1]] for k in Psi)) <= (1 - x[s, Phi[1], a]) * M,
-                name=f"saida_bobina_{a}_seção_{s}"
+            backend.adicionar_restricao(
+                omega_minus[a] - (tau[s] + soma(W[s, k, Phi[1], a] * t_load[k, Phi[1]] for k in Psi)) <= (1 - x[s, Phi[1], a]) * M,
+                nome=f"saida_bobina_{a}_seção_{s}"
             )
 
     for ids, s in enumerate(S): 
         if ids != 1:
-            model.addConstr(
+            backend.adicionar_restricao(
                 s >= 
                     s[ids - 1] 
-                    + quicksum(t_empty[k,q] * V[S[ids - 1], k, q] for k in Psi for q in Psi)
-                    + quicksum(t_load[k,q] * W[S[ids - 1], k, q] for k in Psi for q in Psi)
+                    + soma(t_empty[k,q] * V[S[ids - 1], k, q] for k in Psi for q in Psi)
+                    + soma(t_load[k,q] * W[S[ids - 1], k, q] for k in Psi for q in Psi)
             )
 
     for a in A:
         for s in S:
-            model.addConstr(
-                quicksum(x[s, k, a] for k in Psi) == 1,
-                name=f"bobina_{a}_seção_{s}"
+            backend.adicionar_restricao(
+                soma(x[s, k, a] for k in Psi) == 1,
+                nome=f"bobina_{a}_seção_{s}"
             )
 
     for a in A:
         for s in S:
-            model.addConstr(
-            quicksum(x[s, k, a] for k in Psi) <= 1,
-            name=f"max_1_bobina_{a}_seção_{s}_espaco_{k}"
+            backend.adicionar_restricao(
+            soma(x[s, k, a] for k in Psi) <= 1,
+            nome=f"max_1_bobina_{a}_seção_{s}_espaco_{k}"
             )
 
     for s in S:
-        model.addConstr(
-            quicksum(W[s, k, q, a] for k in Psi for q in I for a in A) == 0,
-            name=f"block_mover_{a}_para_I"
+        backend.adicionar_restricao(
+            soma(W[s, k, q, a] for k in Psi for q in I for a in A) == 0,
+            nome=f"block_mover_{a}_para_I"
         )
 
     for s in S:
-        model.addConstr(
-            quicksum(w[s, k, q, a] for k in O for q in Psi for a in A) == 0,
-            name=f"block_mover_{a}_para_O"
+        backend.adicionar_restricao(
+            soma(w[s, k, q, a] for k in O for q in Psi for a in A) == 0,
+            nome=f"block_mover_{a}_para_O"
         )
 
     for s in S:
-        model.addConstr(
-            quicksum(V[s, k, q] for k in Psi for q in Psi) 
-            + quicksum(W[s, k, q, a] for k in Psi for q in Psi for a in A)  <= 1,
-            name=f"max_1_movimento_por_secao_{s}"
+        backend.adicionar_restricao(
+            soma(V[s, k, q] for k in Psi for q in Psi) 
+            + soma(W[s, k, q, a] for k in Psi for q in Psi for a in A)  <= 1,
+            nome=f"max_1_movimento_por_secao_{s}"
         )
 
     for k in Psi:
         for ids, s in enumerate(S): 
             if ids != 1:
-                model.addConstr(
-                    quicksum(W[s, k, q, a] for q in Psi) == quicksum(V[S[ids -1], q, k]),
-                    name=f"precedencia_{k}_secao_{s}_carregado"
+                backend.adicionar_restricao(
+                    soma(W[s, k, q, a] for q in Psi) == soma(V[S[ids -1], q, k]),
+                    nome=f"precedencia_{k}_secao_{s}_carregado"
                 )
 
     for k in Psi:
         for ids, s in enumerate(S): 
             if ids != 1:
-                model.addConstr(
-                    quicksum(V[s, k, q] for q in Psi) - quicksum(W[S[ids - 1], q, k, a] for q in Psi for a in A),
-                    name=f"precedencia_{k}_secao_{s}_descarregado"
+                backend.adicionar_restricao(
+                    soma(V[s, k, q] for q in Psi) - soma(W[S[ids - 1], q, k, a] for q in Psi for a in A),
+                    nome=f"precedencia_{k}_secao_{s}_descarregado"
                 )
 
     for k in Psi:
         for ids, s in enumerate(S):
             if ids != 1:
-                model.addConstr(
-                    x[s, k, a] == x[1, k, a] - quicksum(W[s_hat, k, q, a] for q in Psi for a in A for s_hat in S)
-                    + quicksum(W[s_hat, q, k, a] for q in Psi for a in A for s_hat in S),
-                    name=f"ocupacao_de_{k}_na_secao_{s}_depende_de_movimentos_carregados"
+                backend.adicionar_restricao(
+                    x[s, k, a] == x[1, k, a] - soma(W[s_hat, k, q, a] for q in Psi for a in A for s_hat in S)
+                    + soma(W[s_hat, q, k, a] for q in Psi for a in A for s_hat in S),
+                    nome=f"ocupacao_de_{k}_na_secao_{s}_depende_de_movimentos_carregados"
                 )
 
     for s in S:
         for idk, k in enumerate(Psi1):
             if idk != len(Psi1) - 1:
-                model.addConstr(
-                    quicksum(W[s, k, q, a] for q in Psi for a in A) 
-                    <= 1  - quicksum(x[s, Psi1[k + 1], a] for a in A),
-                    name=f"movimento_carregado_{k}_na_secao_{s}_vizinho_superior"
+                backend.adicionar_restricao(
+                    soma(W[s, k, q, a] for q in Psi for a in A) 
+                    <= 1  - soma(x[s, Psi1[k + 1], a] for a in A),
+                    nome=f"movimento_carregado_{k}_na_secao_{s}_vizinho_superior"
                 )
 
     for s in S:
         for idk, k in enumerate(Psi1):
             if idk != 1:
-                model.addConstr(
-                    quicksum(W[s, k, q, a] for q in Psi for a in A) 
-                    <= 1  - quicksum(x[s, Psi1[k - 1], a] for a in A),
-                    name=f"movimento_carregado_{k}_na_secao_{s}_vizinho_inferior"
+                backend.adicionar_restricao(
+                    soma(W[s, k, q, a] for q in Psi for a in A) 
+                    <= 1  - soma(x[s, Psi1[k - 1], a] for a in A),
+                    nome=f"movimento_carregado_{k}_na_secao_{s}_vizinho_inferior"
                 )
 
     for s in S:
         for idk, q in enumerate(Psi2):
             if idk != len(Psi2) - 1:
-                model.addConstr(
-                    2 * quicksum(W[s, k, q, a] for k in Psi for a in A)
-                    <= quicksum(x[s, Psi2[q - 1], a] + x[s, Psi2[q + 1], a] for a in A),
-                    name=f"movimento_carregado_{k}_na_secao_{s}_inferiores_ocupados"
+                backend.adicionar_restricao(
+                    2 * soma(W[s, k, q, a] for k in Psi for a in A)
+                    <= soma(x[s, Psi2[q - 1], a] + x[s, Psi2[q + 1], a] for a in A),
+                    nome=f"movimento_carregado_{k}_na_secao_{s}_inferiores_ocupados"
                 )
 
-    model.setObjective(
-        quicksum(
+    backend.definir_objetivo(
+        soma(
             W[s, k, q, a] * E_load[k][q][a] + V[s, k, q] * E_empty[k][q] for s in S for k in Psi for q in Psi for a in A
-        ),
-        GRB.MINIMIZE
+        )
     );
 
-    model.update()
+    backend.atualizar()
 
-    model.optimize()
+    backend.resolver()
 
-    return model
+    return backend.model
 
 
 
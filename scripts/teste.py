@@ -1,9 +1,13 @@
 import json
 import math
+import time
 from traceback import print_stack
 import numpy as np
 from gurobipy import Model, GRB, quicksum
 
+from cinematica import como_cinematica
+from indice_posicoes import indice_de_posicoes
+
 
 def print_custos(custos):
     r = "custos\n"
@@ -75,13 +79,16 @@ def gerar_posicoes(
     print("O", len(O))
     print("Phi", len(posicoes))
     print("Psi", len(posicoes))
-    print("Psi1", len(posicoes[0::2]))
-    print("Psi2", len(posicoes[1::2]))
+    # Camadas pelo nível (o fatiamento [0::2] / [1::2] só vale para uma fileira)
+    Psi1 = [p for p in posicoes if p[1] == 1]
+    Psi2 = [p for p in posicoes if p[1] == 2]
+    print("Psi1", len(Psi1))
+    print("Psi2", len(Psi2))
 
     return {
         "Psi": posicoes,
-        "Psi1": posicoes[0::2],
-        "Psi2": posicoes[1::2],
+        "Psi1": Psi1,
+        "Psi2": Psi2,
         "Phi": I + posicoes + O,
         "I": I,
         "O": O,
@@ -96,36 +103,119 @@ def places_are_equal(place1, place2) -> bool:
     )
 
 
-def gerar_custos_de_movimentacao(Phy, A_size):
+def listas_de_adjacencia(arcos, num_posicoes):
+    """
+    Retorna as listas de sucessores e predecessores de cada posição.
+    """
+    sucessores = [[] for _ in range(num_posicoes)]
+    predecessores = [[] for _ in range(num_posicoes)]
+    for k, q in arcos:
+        sucessores[k].append(q)
+        predecessores[q].append(k)
+    return sucessores, predecessores
+
+
+def gerar_arcos(Phi, A, A_out, completo: bool = False, posicoes_fixas=()):
+    """
+    Gera o índice de arcos (k, q) das movimentações carregadas W (por classe
+    de bobina) e vazias V, com as listas de adjacência de cada posição.
+
+    Usa a mesma indexação de construir_modelo (índices de Phi = I + Psi + O):
+    a posição 0 é a entrada e a última é a saída. Ficam de fora os arcos que R4, R11 e R12 forçariam a
+    zero (chegada na entrada, partida da saída, bobina que não sai indo para
+    a saída) e as auto-movimentações k -> k. Com `completo=True` todos os
+    pares são mantidos, o que reproduz o modelo denso.
+
+    Posições de `posicoes_fixas` (ocupadas por bobinas que não se movem, ver
+    presolve.py) não têm arcos de W, nem de chegada nem de partida.
+    """
+    num_Phi = len(Phi)
+    entrada = 0
+    saida = num_Phi - 1
+    posicoes = range(num_Phi)
+    posicoes_fixas = set(posicoes_fixas)
+
+    # Classe da bobina -> pode ser levada para a saída
+    classes = {"saida": True, "armazenada": False}
+    saem = set(A_out)
+    classe = ["saida" if a in saem else "armazenada" for a in range(len(A))]
+
+    arcos_W = {}
+    for c, pode_sair in classes.items():
+        arcos = [
+            (k, q)
+            for k in posicoes
+            for q in posicoes
+            if k not in posicoes_fixas
+            and q not in posicoes_fixas
+            and (
+                completo
+                or (
+                    k != q
+                    and q != entrada
+                    and k != saida
+                    and (pode_sair or q != saida)
+                )
+            )
+        ]
+        sucessores, predecessores = listas_de_adjacencia(arcos, num_Phi)
+        arcos_W[c] = {
+            "arcos": arcos,
+            "sucessores": sucessores,
+            "predecessores": predecessores,
+        }
+
+    arcos = [(k, q) for k in posicoes for q in posicoes if completo or k != q]
+    sucessores, predecessores = listas_de_adjacencia(arcos, num_Phi)
+    arcos_V = {
+        "arcos": arcos,
+        "sucessores": sucessores,
+        "predecessores": predecessores,
+    }
+
+    # Índices (k, q, a) de W em ordem lexicográfica
+    conjuntos = {c: set(arcos_W[c]["arcos"]) for c in classes}
+    pares = sorted(set().union(*conjuntos.values()))
+    indices_W = [
+        (k, q, a)
+        for k, q in pares
+        for a in range(len(A))
+        if (k, q) in conjuntos[classe[a]]
+    ]
+
+    print("arcos W", {c: len(arcos_W[c]["arcos"]) for c in classes})
+    print("arcos V", len(arcos_V["arcos"]))
+
+    return {
+        "classe": classe,
+        "W": arcos_W,
+        "V": arcos_V,
+        "indices_W": indices_W,
+    }
+
+
+def gerar_custos_de_movimentacao(Phy, A_size, cinematica=None, pesos=None, **parametros):
     """
     Gera os custos de movimentação para o problema de armazenamento.
 
-    Cada movimentação vertical no diametro de uma bobina custa 1 unidade de tempo.
-    Cada movimentação horizontal no diametro de uma bobina custa 0.5 unidades de tempo.
+    Os tempos vêm do modelo de cinemática (cinematica.py), em uma chamada
+    vetorizada sobre todas as posições; o padrão reproduz a fórmula
+    original (cada movimentação vertical no diametro de uma bobina custa 1
+    unidade de tempo e cada horizontal 0.5). `cinematica` pode ser um modelo
+    ou um nome, com `parametros` repassados ao modelo, e `pesos` (um por
+    bobina) ativa a energia dependente do peso.
 
+    Quando a energia carregada não depende da bobina, E_load é uma visão
+    somente leitura (np.broadcast_to) de E_load_base[k][q], sem cópia por
+    bobina.
     """
-    t_load = np.zeros((len(Phy), len(Phy)), dtype=float)
-    t_empty = np.zeros((len(Phy), len(Phy)), dtype=float)
-    E_load = np.zeros((len(Phy), len(Phy), A_size), dtype=float)
-    E_empty = np.zeros((len(Phy), len(Phy)), dtype=float)
-
-    for idk, k in enumerate(Phy):
-        for idq, q in enumerate(Phy):
-            if idk == idq:
-                continue
-            t_vertical = 3 - k[1] + 3 - q[1]
-            t_horizontal = ((q[0] - k[0]) + (q[2] - k[2])) * 0.5 / math.sqrt(2)
-            ## TODO: Avaliar pesos abaixo
-            t_load[idk][idq] = t_vertical * 20 + t_horizontal * 10
-            t_empty[idk][idq] = t_load[idk][idq] * 0.9
-
-    for idk, k in enumerate(Phy):
-        for idq, q in enumerate(Phy):
-            E_empty[idk][idq] = t_empty[idk][idq] * 20
-            for a in range(A_size):
-                # Por simplicidade, todos os custos de movimentação são iguais
-                # Isso pode ser ajustado para refletir a realidade de bobinas difrentes
-                E_load[idk][idq][a] = t_load[idk][idq] * 100
+    cinematica = como_cinematica(cinematica, **parametros)
+    posicoes = np.asarray(Phy, dtype=float).reshape(len(Phy), 3)
+
+    t_load, t_empty = cinematica.tempos(posicoes)
+    E_load_base, E_load, E_empty = cinematica.energias(
+        t_load, t_empty, A_size, pesos
+    )
 
     print("custos")
     print("t_load", t_load.shape)
@@ -137,21 +227,11 @@ def gerar_custos_de_movimentacao(Phy, A_size):
         "t_load": t_load,
         "t_empty": t_empty,
         "E_load": E_load,
+        "E_load_base": E_load_base,
         "E_empty": E_empty,
     }
 
 
-posicoes = gerar_posicoes(
-    num_fileiras=1,
-    num_posicoes_nivel_inferior=2,
-    num_entrada_saida=1,
-)
-
-print(json.dumps(posicoes))
-
-custos = gerar_custos_de_movimentacao(posicoes["Phi"], 1)
-
-
 # "Psi":  posicoes,
 # "Psi1": posicoes[0::2],
 # "Psi2": posicoes[1::2],
@@ -169,13 +249,73 @@ custos = gerar_custos_de_movimentacao(posicoes["Phi"], 1)
 # Junto com os limites de tempo
 
 from gurobipy import Model, GRB, quicksum
-
-model = Model("Armazenagem")
+from modelo_matricial import construir_modelo_matricial
+from backends import BINARIA, CONTINUA, INVIAVEL, OTIMO, como_backend, criar_backend
+from heuristica import carregar_solucao_inicial, heuristica_construtiva
 
 import numpy as np
 
 
-def gerar_modelo(
+def gerar_janelas_de_tempo(num_bobinas: int, rng=None):
+    """
+    Gera as janelas de tempo de entrada (sigma) e saída (omega) de cada bobina.
+
+    `rng` (um np.random.Generator) sorteia as janelas sem tocar no estado
+    global de np.random; sem ele, usa np.random.
+    """
+    sortear = np.random.randint if rng is None else rng.integers
+    # TODO: Adicionar lógica para definir janelas de tempo de entrada e saída
+    sigma_minus = (
+        sortear(0, 3, size=num_bobinas) * 1
+    )  # em segundos (30 minutos)
+    sigma_plus = sigma_minus + sortear(1, 4, size=num_bobinas) * 1
+    omega_minus = sortear(2, 6, size=num_bobinas) * 1
+    omega_plus = omega_minus + sortear(1, 4, size=num_bobinas) * 1
+
+    return {
+        "sigma_minus": sigma_minus,
+        "sigma_plus": sigma_plus,
+        "omega_minus": omega_minus,
+        "omega_plus": omega_plus,
+    }
+
+
+def calcular_big_m(janelas, t_load, t_empty, num_secoes: int):
+    """
+    Menor M válido para cada restrição de R5, R6 e R7.
+
+    Sem esperas desnecessárias, cada seção começa logo após a movimentação
+    anterior ou na liberação de uma janela, então
+    tau[s] <= max(sigma⁻, ω⁻) + s · (maior duração de movimentação).
+    Com tau >= 0 e esse limite:
+    - R5 (x = 0): tau[s] + sigma⁺[a] <= M  ->  M5[a, s] = tau_max[s] + sigma⁺[a];
+    - R6 (x = 0): ω⁻[a] - tau[s] <= M      ->  M6[a] = ω⁻[a];
+    - R7 (x = 0): ω⁻[a] - tau[s] - W · t_load[k, saída] <= M
+      ->  M7[a] = ω⁻[a] - min(0, min_k t_load[k, saída]).
+    O termo de t_load entra pelo seu menor valor: a fórmula "padrao" dá
+    tempos negativos em layouts largos. Todos os M são >= 0.
+    """
+    sigma_minus = np.asarray(janelas["sigma_minus"], dtype=float)
+    sigma_plus = np.asarray(janelas["sigma_plus"], dtype=float)
+    omega_minus = np.asarray(janelas["omega_minus"], dtype=float)
+
+    liberacao = max(0.0, sigma_minus.max(initial=0), omega_minus.max(initial=0))
+    duracao_max = max(np.max(t_load), np.max(t_empty), 0.0)
+    tau_max = liberacao + np.arange(num_secoes) * duracao_max
+    tau_max[0] = 0.0  # R1
+    # Menor valor de W · t_load[k, saída] em R7 (0 com W = 0)
+    menor_entrega = min(0.0, float(np.min(np.asarray(t_load)[:, -1])))
+
+    return {
+        "tau_max": tau_max,
+        "R5": np.maximum(tau_max[None, :] + sigma_plus[:, None], 0.0),
+        "R6": np.maximum(omega_minus, 0.0),
+        "R7": np.maximum(omega_minus - menor_entrega, 0.0),
+    }
+
+
+def construir_modelo(
+    model,
     Psi,
     Psi1,
     Psi2,
@@ -190,36 +330,105 @@ def gerar_modelo(
     A_in,
     A_out,
     S,
+    janelas,
+    arcos=None,
+    ocupacao: str = "acumulada",
+    ocupacao_inicial=None,
+    big_m: str = "fixo",
+    multiplicidade=None,
+    ocupacao_fixa=None,
+    empilhamento: str = "explicito",
 ) -> Model:
+    """
+    Adiciona variáveis, restrições e objetivo ao modelo, uma restrição por
+    vez. W e V são criadas apenas sobre os arcos de `arcos` (ver gerar_arcos)
+    e as somas percorrem as listas de adjacência; sem `arcos`, usa o índice
+    completo (S × Phi × Phi × A).
+
+    `A_in` e `A_out` são listas de índices de A (as bobinas que entram e as
+    que saem), não precisam ser prefixos de A nem disjuntas. O ponto de
+    entrada é uma fila e fica fora de R10: todas as bobinas de A_in podem
+    começar nele.
+
+    `ocupacao` escolhe a formulação de R16: "acumulada" liga x[s] a x[0]
+    pela soma de W de todas as seções anteriores a s; "fluxo" liga x[s] a
+    x[s-1] apenas pelas movimentações da seção s-1 (conservação de fluxo).
+    As duas formulações têm as mesmas soluções inteiras.
+
+    `model` pode ser um gurobipy.Model ou um backend de backends.py
+    (por exemplo BackendHighs).
+
+    `ocupacao_inicial`, matriz (len(Phi), len(A)) de 0/1, fixa x na seção 0
+    pelos limites das variáveis.
+
+    `big_m` escolhe o M de R5–R7: "fixo" usa a constante M = 999 e
+    "apertado" usa o menor M válido de cada restrição (ver calcular_big_m),
+    limitando tau pelo tempo acumulado máximo.
+
+    `multiplicidade[a]` é o número de bobinas representadas pela bobina a
+    (1 por padrão); uma classe agregada de bobinas intercambiáveis ocupa
+    multiplicidade[a] posições em cada seção (ver agregacao.py).
+    `ocupacao_fixa[k]` = 1 marca uma posição ocupada por uma bobina que não
+    se move e foi retirada de A (ver presolve.py); ela entra como constante
+    em R10 e nas restrições de empilhamento R17–R19.
+
+    `empilhamento` = "lazy" (apenas Gurobi) não adiciona R17–R19: os índices
+    ficam em model._empilhamento para callback_empilhamento
+    (cortes_empilhamento.py), que adiciona só as violadas.
+
+    As variáveis e as restrições que dependem das janelas de tempo e dos
+    custos ficam guardadas em model._W, model._V, model._x, model._tau e
+    model._restricoes, para que o modelo possa ser atualizado sem ser
+    reconstruído (ver modelo_template.py).
+    """
+    if ocupacao not in ("acumulada", "fluxo"):
+        raise ValueError(f"Formulação de ocupação desconhecida: {ocupacao}")
+    if big_m not in ("fixo", "apertado"):
+        raise ValueError(f"Opção de big-M desconhecida: {big_m}")
+    if empilhamento not in ("explicito", "lazy"):
+        raise ValueError(f"Opção de empilhamento desconhecida: {empilhamento}")
+
+    if arcos is None:
+        arcos = gerar_arcos(Phi, A, A_out, completo=True)
+    # Inteiros Python: o highspy não aceita escalares do numpy nas restrições
+    if multiplicidade is None:
+        multiplicidade = np.ones(len(A), dtype=int)
+    multiplicidade = [int(m) for m in multiplicidade]
+    if ocupacao_fixa is None:
+        ocupacao_fixa = np.zeros(len(Phi))
+    ocupacao_fixa = [float(o) for o in ocupacao_fixa]
+
+    backend = como_backend(model)
+    soma = backend.soma
+    if empilhamento == "lazy" and backend.nome != "gurobi":
+        raise ValueError("Restrições lazy requerem o backend gurobi.")
+
     # Conjuntos
     S = range(S)
     M = 999  # constante grande
 
-    Phi = np.zeros(len(Psi), dtype=int)
+    indice = indice_de_posicoes(Phi, I, O)
+
+    Phi = np.zeros(len(Phi), dtype=int)
     Psi = np.zeros(len(Psi), dtype=int)
     Psi1 = np.zeros(len(Psi1), dtype=int)
     Psi2 = np.zeros(len(Psi2), dtype=int)
     I = np.zeros(len(I), dtype=int)
     O = np.zeros(len(O), dtype=int)
-    A_in = np.zeros(len(A_in), dtype=int)
-    A_out = np.zeros(len(A_out), dtype=int)
     A = np.zeros(len(A), dtype=int)
     # Set ranges for all sets
 
     range_Phi = list(range(len(Phi)))
     range_Psi = list(range(len(Psi)))
     range_A = list(range(len(A)))
-    range_A_in = list(range(len(A_in)))
-    range_A_out = list(range(len(A_out)))
+    range_A_in = [int(a) for a in A_in]
+    range_A_out = [int(a) for a in A_out]
 
     # Vetores de janelas de tempo de entrada e saída
-    # TODO: Adicionar lógica para definir janelas de tempo de entrada e saída
-    sigma_minus = (
-        np.random.randint(0, 3, size=len(A)) * 1
-    )  # em segundos (30 minutos)
-    sigma_plus = sigma_minus + np.random.randint(1, 4, size=len(A)) * 1
-    omega_minus = np.random.randint(2, 6, size=len(A)) * 1
-    omega_plus = omega_minus + np.random.randint(1, 4, size=len(A)) * 1
+    sigma_minus = janelas["sigma_minus"]
+    sigma_plus = janelas["sigma_plus"]
+    omega_minus = janelas["omega_minus"]
+    omega_plus = janelas["omega_plus"]
 
     print(A)
     print("sigma_minus", sigma_minus)
@@ -247,266 +456,707 @@ def gerar_modelo(
     print("ω⁺[a] =", omega_plus)
     # Definindo variáveis de decisão no modelo
 
+    classe = arcos["classe"]
+    sucessores_W = {c: arcos["W"][c]["sucessores"] for c in arcos["W"]}
+    predecessores_W = {c: arcos["W"][c]["predecessores"] for c in arcos["W"]}
+    sucessores_V = arcos["V"]["sucessores"]
+    predecessores_V = arcos["V"]["predecessores"]
+    entrada = 0
+    saida = len(Phi) - 1
+
     # W[s][k][q][a] = 1 se bobina a se move de k -> q na seção s
-    W = model.addVars(
-        len(S), len(Phi), len(Phi), len(A), vtype=GRB.BINARY, name="W"
+    W = backend.adicionar_variaveis(
+        [(s, k, q, a) for s in S for k, q, a in arcos["indices_W"]],
+        BINARIA,
+        "W",
     )
 
     # V[s][k][q] = 1 se movimentação vazia de k -> q ocorre na seção s
-    V = model.addVars(len(S), len(Phi), len(Phi), vtype=GRB.BINARY, name="V")
+    V = backend.adicionar_variaveis(
+        [(s, k, q) for s in S for k, q in arcos["V"]["arcos"]],
+        BINARIA,
+        "V",
+    )
 
     # x[s][q][a] = 1 se bobina a está na posição q na seção s
-    x = model.addVars(len(S), len(Phi), len(A), vtype=GRB.BINARY, name="x")
+    x = backend.adicionar_variaveis((len(S), len(Phi), len(A)), BINARIA, "x")
 
     # τ[s] = instante de tempo do início da seção s
-    tau = model.addVars(len(S), vtype=GRB.CONTINUOUS, name="tau")
+    tau = backend.adicionar_variaveis(len(S), CONTINUA, "tau")
+
+    print("variáveis W", len(W), "V", len(V))
+
+    # M de cada restrição de R5–R7, em listas de números Python (o highspy
+    # não aceita escalares do numpy como coeficientes)
+    if big_m == "apertado":
+        limites_M = calcular_big_m(janelas, t_load, t_empty, len(S))
+        for s in S:
+            backend.definir_limites(tau[s], 0.0, float(limites_M["tau_max"][s]))
+        M5 = limites_M["R5"]
+        M6 = np.broadcast_to(limites_M["R6"][:, None], M5.shape).tolist()
+        M7 = np.broadcast_to(limites_M["R7"][:, None], M5.shape).tolist()
+        M5 = M5.tolist()
+    else:
+        limites_M = None
+        M5 = M6 = M7 = [[M] * len(S) for _ in range_A]
+
+    # Ocupação inicial (seção 0) fixada pelos limites de x
+    if ocupacao_inicial is not None:
+        for k in range_Phi:
+            for a in range_A:
+                backend.fixar(x[0, k, a], ocupacao_inicial[k][a])
+
+    model._W = W
+    model._V = V
+    model._x = x
+    model._tau = tau
+    model._M = M
+    model._big_m = limites_M
+    model._arcos = arcos
+    model._restricoes = {"R5": {}, "R6": {}, "R7": {}, "R8": {}}
 
     # Definindo restrições do modelo
 
     # R (1) - tempo_inicial_zero (τ¹ = 0)
-    model.addConstr(
-        tau[0] == 0, name="R1_tempo_inicial_zero"
+    backend.adicionar_restricao(
+        tau[0] == 0, nome="R1_tempo_inicial_zero"
     )  # restrição τ¹ = 0
 
     # R (2) - entrada_unica_bobina
     for a in range_A_in:
-        model.addConstr(
-            quicksum(W[s, 0, q, a] for s in S for q in range_Phi if q not in I)
+        backend.adicionar_restricao(
+            soma(
+                W[s, entrada, q, a]
+                for s in S
+                for q in sucessores_W[classe[a]][entrada]
+                if q not in I
+            )
             == 1,
-            name=f"R2_entrada_unica_bobina_{a}",
+            nome=f"R2_entrada_unica_bobina_{a}",
         )
 
     # R (3) - saida_unica_bobina
     for a in range_A_out:
-        model.addConstr(
-            quicksum(
-                W[s, k, len(Phi) - 1, a]
+        backend.adicionar_restricao(
+            soma(
+                W[s, k, saida, a]
                 for s in S
-                for k in range_Phi
+                for k in predecessores_W[classe[a]][saida]
                 if k not in O
             )
             == 1,
-            name=f"R3_saida_unica_bobina_{a}",
+            nome=f"R3_saida_unica_bobina_{a}",
         )
 
     # R (4) - nao_entrega_bobina_armazenada
+    # (vazia quando os arcos para a saída já foram removidos do índice)
     for a in range_A:
-        if a not in range_A_out:
-            model.addConstr(
-                quicksum(W[s, k, len(Phi) - 1, a] for s in S for k in range_Phi)
+        if a not in range_A_out and predecessores_W[classe[a]][saida]:
+            backend.adicionar_restricao(
+                soma(
+                    W[s, k, saida, a]
+                    for s in S
+                    for k in predecessores_W[classe[a]][saida]
+                )
                 == 0,
-                name=f"R4_nao_entrega_bobina_{a}",
+                nome=f"R4_nao_entrega_bobina_{a}",
             )
 
     # # R (5) - janela_max_entrada
     for a in range_A_in:
         for s in S:
-            model.addConstr(
-                tau[s] + sigma_plus[a] <= (1 - x[s, 0, a]) * M,
-                name=f"R5_janela_max_entrada_a{a}_s{s}",
+            model._restricoes["R5"][a, s] = backend.adicionar_restricao(
+                tau[s] + float(sigma_plus[a]) <= (1 - x[s, 0, a]) * M5[a][s],
+                nome=f"R5_janela_max_entrada_a{a}_s{s}",
             )
 
     # R (6) - janela_min_entrada
     for a in range_A_in:
         for s in S:
-            model.addConstr(
-                omega_minus[a] - tau[s] <= x[s, 0, a] * M,
-                name=f"R6_janela_min_entrada_a{a}_s{s}",
+            model._restricoes["R6"][a, s] = backend.adicionar_restricao(
+                float(omega_minus[a]) - tau[s] <= x[s, 0, a] * M6[a][s],
+                nome=f"R6_janela_min_entrada_a{a}_s{s}",
             )
 
     # R (7) - tempo_min_saida
     for a in range_A_out:
         for s in S:
-            model.addConstr(
-                omega_minus[a]
+            model._restricoes["R7"][a, s] = backend.adicionar_restricao(
+                float(omega_minus[a])
                 - (
                     tau[s]
-                    + quicksum(
-                        W[s, k, len(Phi) - 1, a] * t_load[k, len(Phi) - 1]
-                        for k in range_Phi
+                    + soma(
+                        W[s, k, saida, a] * t_load[k, saida]
+                        for k in predecessores_W[classe[a]][saida]
                     )
                 )
-                <= (1 - x[s, len(Phi) - 1, a]) * M,
-                name=f"R7_tempo_min_saida_a{a}_s{s}",
+                <= (1 - x[s, saida, a]) * M7[a][s],
+                nome=f"R7_tempo_min_saida_a{a}_s{s}",
             )
 
     # R (8) - tempo_progressao
     for ids, s in enumerate(S):
         if ids != 0:
-            model.addConstr(
+            model._restricoes["R8"][s] = backend.adicionar_restricao(
                 s
                 >= S[ids - 1]
-                + quicksum(
+                + soma(
                     t_empty[k, q] * V[ids - 1, k, q]
-                    for k in range_Phi
-                    for q in range_Phi
+                    for k, q in arcos["V"]["arcos"]
                 )
-                + quicksum(
+                + soma(
                     t_load[k, q] * W[ids - 1, k, q, a]
-                    for k in range_Phi
-                    for q in range_Phi
-                    for a in range_A
+                    for k, q, a in arcos["indices_W"]
                 ),
-                name=f"R8_tempo_progressao_s{s}",
+                nome=f"R8_tempo_progressao_s{s}",
             )
 
     for a in range_A:
         for s in S:
-            model.addConstr(
-                quicksum(x[s, k, a] for k in range_Phi) == 1,
-                name=f"R9_bobina_ocupa_uma_posicao_a{a}_s{s}",
+            backend.adicionar_restricao(
+                soma(x[s, k, a] for k in range_Phi) == multiplicidade[a],
+                nome=f"R9_bobina_ocupa_uma_posicao_a{a}_s{s}",
             )
 
     # R (10) - espaco_ocupa_uma_bobina
+    # (o ponto de entrada é uma fila: as bobinas de A_in esperam nele)
     for k in range_Phi:
+        if k == entrada and len(I) > 0:
+            continue
         for s in S:
-            model.addConstr(
-                quicksum(x[s, k, a] for a in range_A) <= 1,
-                name=f"R10_espaco_ocupa_uma_bobina_a{a}_s{s}",
+            backend.adicionar_restricao(
+                soma(x[s, k, a] for a in range_A) <= 1 - ocupacao_fixa[k],
+                nome=f"R10_espaco_ocupa_uma_bobina_a{a}_s{s}",
             )
     # R (11) - bloqueia_movimento_para_entrada
+    # (vazia quando os arcos para a entrada já foram removidos do índice)
     for s in S:
-        model.addConstr(
-            quicksum(W[s, k, 0, a] for k in range_Phi for a in range_A) == 0,
-            name=f"R11_bloqueia_movimento_para_entrada_s{s}",
-        )
+        termos = [
+            W[s, k, entrada, a]
+            for a in range_A
+            for k in predecessores_W[classe[a]][entrada]
+        ]
+        if termos:
+            backend.adicionar_restricao(
+                soma(termos) == 0,
+                nome=f"R11_bloqueia_movimento_para_entrada_s{s}",
+            )
     # R (12) - bloqueia_movimento_para_saida
+    # (vazia quando os arcos a partir da saída já foram removidos do índice)
     for s in S:
-        model.addConstr(
-            quicksum(
-                W[s, len(Phi) - 1, q, a] for q in range_Phi for a in range_A
+        termos = [
+            W[s, saida, q, a]
+            for a in range_A
+            for q in sucessores_W[classe[a]][saida]
+        ]
+        if termos:
+            backend.adicionar_restricao(
+                soma(termos) == 0,
+                nome=f"R12_bloqueia_movimento_para_saida_s{s}",
             )
-            == 0,
-            name=f"R12_bloqueia_movimento_para_saida_s{s}",
-        )
 
     # R (13) - max_1_movimento_por_secao
     for s in S:
-        model.addConstr(
-            quicksum(V[s, k, q] for k in range_Phi for q in range_Phi)
-            + quicksum(
-                W[s, k, q, a]
-                for k in range_Phi
-                for q in range_Phi
-                for a in range_A
-            )
+        backend.adicionar_restricao(
+            soma(V[s, k, q] for k, q in arcos["V"]["arcos"])
+            + soma(W[s, k, q, a] for k, q, a in arcos["indices_W"])
             <= 1,
-            name=f"R13_max_1_movimento_por_secao_s{s}",
+            nome=f"R13_max_1_movimento_por_secao_s{s}",
         )
 
     # R (14) - precedencia_carregado_apos_vazio
     for k in range_Phi:
         for ids, s in enumerate(S):
             if ids != 0:
-                model.addConstr(
-                    quicksum(W[s, k, q, a] for q in range_Phi)
-                    == quicksum(V[ids - 1, q, k] for q in range_Phi),
-                    name=f"R14_precedencia_carregado_apos_vazio_k{k}_s{s}",
+                backend.adicionar_restricao(
+                    soma(
+                        W[s, k, q, a]
+                        for a in range_A
+                        for q in sucessores_W[classe[a]][k]
+                    )
+                    == soma(V[ids - 1, q, k] for q in predecessores_V[k]),
+                    nome=f"R14_precedencia_carregado_apos_vazio_k{k}_s{s}",
                 )
 
     # R (15) - precedencia_vazio_apos_carregado
     for k in range_Phi:
         for ids, s in enumerate(S):
             if ids != 0:
-                model.addConstr(
-                    quicksum(V[s, k, q] for q in range_Phi)
-                    - quicksum(
-                        W[ids - 1, q, k, a] for q in range_Phi for a in range_A
+                backend.adicionar_restricao(
+                    soma(V[s, k, q] for q in sucessores_V[k])
+                    - soma(
+                        W[ids - 1, q, k, a]
+                        for a in range_A
+                        for q in predecessores_W[classe[a]][k]
                     )
                     <= 0,
-                    name=f"R15_precedencia_vazio_apos_carregado_k{k}_s{s}",
+                    nome=f"R15_precedencia_vazio_apos_carregado_k{k}_s{s}",
                 )
 
     # R (16) - ocupacao_depende_movimentos_anteriores
-    for k in range_Phi:
+    if ocupacao == "fluxo":
+        # Conservação de fluxo: x[s] depende só de x[s-1] e das
+        # movimentações carregadas da seção s-1
+        for k in range_Phi:
+            for ids, s in enumerate(S):
+                if ids != 0:
+                    for a in range_A:
+                        backend.adicionar_restricao(
+                            x[s, k, a]
+                            == x[ids - 1, k, a]
+                            - soma(
+                                W[ids - 1, k, q, a]
+                                for q in sucessores_W[classe[a]][k]
+                            )
+                            + soma(
+                                W[ids - 1, q, k, a]
+                                for q in predecessores_W[classe[a]][k]
+                            ),
+                            nome=f"R16_conservacao_fluxo_k{k}_s{s}_a{a}",
+                        )
+    else:
+        # x[s] = x[0] - saídas + chegadas de todas as seções anteriores a s
         for ids, s in enumerate(S):
             if ids != 0:
-                model.addConstr(
-                    x[s, k, a]
-                    == x[1, k, a]
-                    - quicksum(
-                        W[s_hat, k, q, a]
-                        for q in range_Phi
-                        for a in range_A
-                        for s_hat in S
-                    )
-                    + quicksum(
-                        W[s_hat, q, k, a]
-                        for q in range_Phi
-                        for a in range_A
-                        for s_hat in S
-                    ),
-                    name=f"R16_ocupacao_depende_movimentos_anteriores_k{k}_s{s}",
-                )
+                for k in range_Phi:
+                    for a in range_A:
+                        backend.adicionar_restricao(
+                            x[s, k, a]
+                            == x[0, k, a]
+                            - soma(
+                                W[s_hat, k, q, a]
+                                for s_hat in S[:ids]
+                                for q in sucessores_W[classe[a]][k]
+                            )
+                            + soma(
+                                W[s_hat, q, k, a]
+                                for s_hat in S[:ids]
+                                for q in predecessores_W[classe[a]][k]
+                            ),
+                            nome=f"R16_ocupacao_depende_movimentos_anteriores_k{k}_s{s}_a{a}",
+                        )
+
+    # Pares de posições das restrições de empilhamento (índice do layout):
+    # R17/R18 - inferior k e sua bloqueadora à direita/esquerda
+    # R19 - superior q e seus apoios esquerdo e direito
+    R17_pares = list(zip(*indice.pares_bloqueio("direito")))
+    R18_pares = list(zip(*indice.pares_bloqueio("esquerdo")))
+    R19_pares = [
+        (q, indice.apoio_esquerdo[q], indice.apoio_direito[q])
+        for q in indice.superiores
+    ]
+
+    if empilhamento == "lazy":
+        # Mesmos índices dos laços abaixo; as restrições são adicionadas
+        # pelo callback apenas quando violadas
+        backend.model.Params.LazyConstraints = 1
+        backend.model._empilhamento = {
+            "W": W,
+            "x": x,
+            "range_A": range_A,
+            "classe": classe,
+            "sucessores_W": sucessores_W,
+            "predecessores_W": predecessores_W,
+            "ocupacao_fixa": ocupacao_fixa,
+            "R17": [(s, k, j) for s in S for k, j in R17_pares],
+            "R18": [(s, k, j) for s in S for k, j in R18_pares],
+            "R19": [(s, q, e, d) for s in S for q, e, d in R19_pares],
+            "cortes_adicionados": 0,
+        }
+        S_empilhamento = []
+    else:
+        S_empilhamento = S
 
     # R17 - Restrição (eq:upper_layer_blocking) do artigo
-    # Garante que uma bobina na camada 1 só pode ser movimentada se não houver bobina acima (camada 2, próxima posição)
-    for s in S:
-        for idk, k in enumerate(Psi1):
-            # Psi1 não inclui entrada/saída, garantir isso
-            if idk < len(Psi1) - 1:  # idk+1 existe
-                model.addConstr(
-                    quicksum(W[s, k, q, a] for q in range_Phi for a in range_A)
-                    <= 1 - quicksum(x[s, idk + 1, a] for a in range_A),
-                    name=f"movimento_carregado_{k}_na_secao_{s}_vizinho_superior",
+    # Garante que uma bobina na camada 1 só pode ser movimentada se não houver
+    # bobina acima à direita (camada 2, mesma coluna)
+    for s in S_empilhamento:
+        for k, j in R17_pares:
+            backend.adicionar_restricao(
+                soma(
+                    W[s, k, q, a]
+                    for a in range_A
+                    for q in sucessores_W[classe[a]][k]
                 )
+                <= 1 - soma(x[s, j, a] for a in range_A) - ocupacao_fixa[j],
+                nome=f"R17_vizinho_superior_k{k}_s{s}",
+            )
 
     # R18 - Restrição (eq:upper_layer_blocking_1) do artigo
-    # Garante que uma bobina na camada 2 só pode ser movimentada se não houver bobina abaixo (camada 1, posição anterior)
-    for s in S:
-        for idk, k in enumerate(Psi1):
-            if idk > 0:  # idk-1 existe
-                model.addConstr(
-                    quicksum(W[s, k, q, a] for q in range_Phi for a in range_A)
-                    <= 1 - quicksum(x[s, idk - 1, a] for a in range_A),
-                    name=f"movimento_carregado_{k}_na_secao_{s}_vizinho_inferior",
+    # Garante que uma bobina na camada 1 só pode ser movimentada se não houver
+    # bobina acima à esquerda (camada 2, coluna anterior)
+    for s in S_empilhamento:
+        for k, j in R18_pares:
+            backend.adicionar_restricao(
+                soma(
+                    W[s, k, q, a]
+                    for a in range_A
+                    for q in sucessores_W[classe[a]][k]
                 )
+                <= 1 - soma(x[s, j, a] for a in range_A) - ocupacao_fixa[j],
+                nome=f"R18_vizinho_inferior_k{k}_s{s}",
+            )
 
     # R19 - Restrição (eq:lower_layer_blocking) do artigo
     # Garante que uma bobina só pode ser posicionada na camada 2 se houver bobina imediatamente abaixo (camada 1) nos dois vizinhos
-    for s in S:
-        for idk, q in enumerate(Psi2):
-            if idk != 0:
-                model.addConstr(
-                    2
-                    * quicksum(
-                        W[s, k, q, a] for k in range_Phi for a in range_A
-                    )
-                    <= quicksum(
-                        x[s, idk - 1, a] + x[s, idk + 1, a] for a in range_A
-                    ),
-                    name=f"movimento_carregado_{k}_na_secao_{s}_inferiores_ocupados",
+    for s in S_empilhamento:
+        for q, esquerda, direita in R19_pares:
+            backend.adicionar_restricao(
+                2
+                * soma(
+                    W[s, k, q, a]
+                    for a in range_A
+                    for k in predecessores_W[classe[a]][q]
                 )
+                <= soma(x[s, esquerda, a] + x[s, direita, a] for a in range_A)
+                + ocupacao_fixa[esquerda]
+                + ocupacao_fixa[direita],
+                nome=f"R19_inferiores_ocupados_q{q}_s{s}",
+            )
 
-    model.setObjective(
-        quicksum(
+    backend.definir_objetivo(
+        soma(
             W[s, k, q, a] * E_load[k][q][a]
             for s in S
-            for k in range_Phi
-            for q in range_Phi
-            for a in range_A
+            for k, q, a in arcos["indices_W"]
         )
-        + quicksum(
+        + soma(
             V[s, k, q] * E_empty[k][q]
             for s in S
-            for k in range_Phi
-            for q in range_Phi
+            for k, q in arcos["V"]["arcos"]
         ),
-        GRB.MINIMIZE,
     )
-    model.update()
+    backend.atualizar()
+
+    return model
 
-    model.optimize()
+
+def gerar_modelo(
+    Psi,
+    Psi1,
+    Psi2,
+    Phi,
+    I,
+    O,
+    t_load,
+    t_empty,
+    E_load,
+    E_empty,
+    A,
+    A_in,
+    A_out,
+    S,
+    matricial: bool = False,
+    arcos_esparsos: bool = False,
+    ocupacao: str = "acumulada",
+    ocupacao_inicial=None,
+    solver: str = "gurobi",
+    solucao_inicial: bool = False,
+    big_m: str = "fixo",
+    eliminar_estaticas: bool = False,
+    empilhamento: str = "explicito",
+    cache=None,
+    verificar_viabilidade: bool = False,
+    agregar: bool = False,
+    janelas=None,
+):
+    """
+    Constrói e resolve o modelo de armazenagem e retorna o modelo do solver
+    (gurobipy.Model ou highspy.Highs). Cada chamada cria um modelo novo (os
+    modelos Gurobi no ambiente compartilhado, ver backends.ambiente_gurobi);
+    quem chama o descarta com model.dispose() (ou model.clear() no HiGHS).
+
+    Com `matricial=True` as restrições são escritas em lote com MVar/MLinExpr
+    (ver modelo_matricial.py), gerando o mesmo modelo da construção por laços.
+    Com `arcos_esparsos=True` W e V são criadas apenas sobre os arcos viáveis
+    (ver gerar_arcos). `ocupacao` escolhe a formulação de R16 ("acumulada"
+    ou "fluxo") e `ocupacao_inicial` fixa x na seção 0. `solver` escolhe o
+    backend ("gurobi" ou "highs", ver backends.py). Com `solucao_inicial=True`
+    a heurística construtiva (heuristica.py) é usada como solução inicial;
+    nesse caso `ocupacao_inicial` é obrigatória. `big_m` escolhe o M de
+    R5–R7 ("fixo" ou "apertado", ver calcular_big_m). Com
+    `eliminar_estaticas=True` as bobinas que não precisam se mover são
+    retiradas de A antes da construção (ver presolve.py), o que também exige
+    `ocupacao_inicial`. Com `empilhamento="lazy"` R17–R19 entram como
+    restrições lazy por callback (apenas gurobi, ver cortes_empilhamento.py).
+    Com `agregar=True` as bobinas intercambiáveis viram uma classe agregada
+    (ver agregacao.py) antes da construção e a solução é desagregada depois
+    da resolução, em model._solucao_desagregada.
+
+    `janelas` são as janelas de tempo das bobinas (gerar_janelas_de_tempo);
+    sem elas, novas janelas são sorteadas a cada chamada.
+
+    Com `cache` (um CacheResultados, ver cache_resultados.py) o retorno passa
+    a ser o resultado {status, objetivo, tempo_execucao, movimentos,
+    em_cache}: uma entrada já resolvida volta do cache sem construir o
+    modelo e, nos demais casos, o modelo é descartado após gravar o
+    resultado. A chave inclui as janelas, então o cache exige `janelas`.
+
+    Com `verificar_viabilidade=True` as condições necessárias de
+    verificacao_viabilidade.py são testadas antes de criar o backend: se
+    alguma falhar o modelo não é construído e ModeloInviavel é levantada com
+    o diagnóstico (com `cache`, o retorno é o resultado {status: "inviavel",
+    ..., viabilidade}, como nos demais casos). Após a resolução, o IIS só é
+    calculado quando a inviabilidade não é explicada pelos alertas.
+    """
+    if matricial and arcos_esparsos:
+        raise ValueError(
+            "A construção matricial usa apenas o índice denso de arcos."
+        )
+    if matricial and solver != "gurobi":
+        raise ValueError("A construção matricial requer o backend gurobi.")
+    if empilhamento == "lazy" and (matricial or solver != "gurobi"):
+        raise ValueError(
+            "Restrições lazy requerem a construção por laços e o backend gurobi."
+        )
+    if solucao_inicial and ocupacao_inicial is None:
+        raise ValueError("A solução inicial requer a ocupação inicial.")
+    if eliminar_estaticas and ocupacao_inicial is None:
+        raise ValueError("O presolve de bobinas estáticas requer a ocupação inicial.")
+    if agregar and (eliminar_estaticas or solucao_inicial):
+        raise ValueError(
+            "A agregação de bobinas não pode ser combinada com o presolve nem"
+            " com a solução inicial."
+        )
+
+    if cache is not None and janelas is None:
+        raise ValueError("O cache de resultados requer as janelas de tempo.")
+    if janelas is None:
+        janelas = gerar_janelas_de_tempo(len(A))
+
+    if cache is not None:
+        from cache_resultados import chave_resolucao, decodificar_movimentos
+
+        chave = chave_resolucao(
+            Phi=Phi,
+            I=I,
+            O=O,
+            t_load=t_load,
+            t_empty=t_empty,
+            E_load=E_load,
+            E_empty=E_empty,
+            janelas=janelas,
+            A=A,
+            A_in=A_in,
+            A_out=A_out,
+            S=S,
+            ocupacao_inicial=ocupacao_inicial,
+            opcoes={
+                "matricial": matricial,
+                "arcos_esparsos": arcos_esparsos,
+                "ocupacao": ocupacao,
+                "solver": solver,
+                "solucao_inicial": solucao_inicial,
+                "big_m": big_m,
+                "eliminar_estaticas": eliminar_estaticas,
+                "empilhamento": empilhamento,
+                "agregar": agregar,
+                "verificar_viabilidade": verificar_viabilidade,
+            },
+        )
+        resultado = cache.obter(chave)
+        if resultado is not None:
+            print("Resultado em cache:", chave)
+            return {**resultado, "em_cache": True}
+
+    alertas = []
+    if verificar_viabilidade:
+        from verificacao_viabilidade import ModeloInviavel
+        from verificacao_viabilidade import verificar_viabilidade as verificar
+
+        diagnostico = verificar(
+            Phi, I, O, t_load, A, A_in, A_out, S, janelas, ocupacao_inicial
+        )
+        if not diagnostico["viavel"]:
+            print("Inviável (verificação prévia):", diagnostico["mensagem"])
+            if cache is None:
+                raise ModeloInviavel(diagnostico)
+            resultado = {
+                "status": INVIAVEL,
+                "objetivo": None,
+                "tempo_execucao": 0.0,
+                "movimentos": [],
+            }
+            cache.gravar(chave, resultado)
+            return {**resultado, "em_cache": False, "viabilidade": diagnostico}
+        alertas = diagnostico["alertas"]
+
+    backend = criar_backend(solver)
+    bobinas = None
+    agregacao = None
+    if agregar:
+        from agregacao import agregar_bobinas, desagregar_modelo
+
+        agregacao = agregar_bobinas(A, A_in, A_out, E_load, janelas, ocupacao_inicial)
+        A = agregacao["A"]
+        A_in = agregacao["A_in"]
+        A_out = agregacao["A_out"]
+        E_load = agregacao["E_load"]
+        janelas = agregacao["janelas"]
+        ocupacao_inicial = agregacao["ocupacao_inicial"]
+        print("Agregação (bobinas intercambiáveis):", agregacao["agregadas"])
+
+    construtor = construir_modelo_matricial if matricial else construir_modelo
+    argumentos_extras = {
+        "ocupacao": ocupacao,
+        "ocupacao_inicial": ocupacao_inicial,
+        "big_m": big_m,
+    }
+    if empilhamento == "lazy":
+        argumentos_extras["empilhamento"] = empilhamento
+    if agregacao is not None:
+        argumentos_extras["multiplicidade"] = agregacao["multiplicidade"]
+    if arcos_esparsos:
+        argumentos_extras["arcos"] = gerar_arcos(Phi, A, A_out)
+
+    if eliminar_estaticas:
+        from presolve import presolve
+
+        reduzido = presolve(
+            Phi,
+            I,
+            O,
+            A,
+            A_in,
+            A_out,
+            E_load,
+            janelas,
+            ocupacao_inicial,
+            S,
+            arcos_esparsos,
+        )
+        A = reduzido["A"]
+        A_in = reduzido["A_in"]
+        A_out = reduzido["A_out"]
+        E_load = reduzido["E_load"]
+        janelas = reduzido["janelas"]
+        ocupacao_inicial = reduzido["ocupacao_inicial"]
+        argumentos_extras["ocupacao_inicial"] = ocupacao_inicial
+        argumentos_extras["ocupacao_fixa"] = reduzido["ocupacao_fixa"]
+        bobinas = reduzido["bobinas"]
+        if not matricial:
+            argumentos_extras["arcos"] = reduzido["arcos"]
+        eliminadas = reduzido["eliminadas"]
+        print(
+            f"Presolve (bobinas estáticas): {eliminadas['bobinas']} bobinas,"
+            f" {eliminadas['W'] + eliminadas['x']} variáveis e"
+            f" {eliminadas['restricoes']} restrições removidas"
+        )
+
+    inicio = time.perf_counter()
+    construtor(
+        backend.model if matricial else backend,
+        Psi,
+        Psi1,
+        Psi2,
+        Phi,
+        I,
+        O,
+        t_load,
+        t_empty,
+        E_load,
+        E_empty,
+        A,
+        A_in,
+        A_out,
+        S,
+        janelas,
+        **argumentos_extras,
+    )
+    print(
+        "Tempo de construção"
+        f" ({'matricial' if matricial else 'laços'}):",
+        time.perf_counter() - inicio,
+    )
+    print(
+        "Variáveis:",
+        backend.num_variaveis(),
+        "restrições:",
+        backend.num_restricoes(),
+    )
+
+    if solucao_inicial:
+        inicio = time.perf_counter()
+        solucao = heuristica_construtiva(
+            Phi,
+            I,
+            O,
+            t_load,
+            t_empty,
+            E_load,
+            E_empty,
+            A,
+            A_in,
+            A_out,
+            ocupacao_inicial,
+            janelas,
+            argumentos_extras.get("ocupacao_fixa"),
+        )
+        carregar_solucao_inicial(backend.model if matricial else backend, solucao)
+        print(
+            "Heurística:",
+            time.perf_counter() - inicio,
+            "custo:",
+            solucao["custo"],
+            "seções:",
+            solucao["num_secoes"],
+        )
+
+    if empilhamento == "lazy":
+        from cortes_empilhamento import callback_empilhamento
+
+        backend.resolver(callback=callback_empilhamento)
+        print(
+            "Cortes lazy adicionados:",
+            backend.model._empilhamento["cortes_adicionados"],
+        )
+    else:
+        backend.resolver()
 
     # model.so
     # model.write("model.ilp")
-    print("Status:", model.printStats())
-    print("Tempo de execução:", model.runtime)
-    if model.status != GRB.OPTIMAL:
-        model.computeIIS()
-        model.write("model_iis.ilp")
+    print("Status:", backend.status())
+    print("Tempo de execução:", backend.tempo_execucao())
+    if backend.status() == INVIAVEL and alertas:
+        for alerta in alertas:
+            print("Alerta de viabilidade:", alerta["mensagem"])
+    elif backend.status() == INVIAVEL and backend.nome == "gurobi":
+        backend.model.computeIIS()
+        backend.model.write("model_iis.ilp")
+
+    solucao_desagregada = None
+    if agregacao is not None and backend.tem_solucao():
+        solucao_desagregada = desagregar_modelo(
+            agregacao, backend, backend.model if matricial else backend, S
+        )
+        print("Movimentações desagregadas:", solucao_desagregada["movimentos"])
+    backend.model._solucao_desagregada = solucao_desagregada
 
-    return model
+    if cache is not None:
+        movimentos = decodificar_movimentos(
+            backend, backend.model if matricial else backend, bobinas
+        )
+        if solucao_desagregada is not None:
+            # Movimentações carregadas com as bobinas originais
+            movimentos = sorted(
+                [m for m in movimentos if m[1] == "vazio"]
+                + [
+                    (s, "carregado", k, q, a)
+                    for s, k, q, a in solucao_desagregada["movimentos"]
+                ],
+                key=lambda m: (m[0], m[1]),
+            )
+        resultado = {
+            "status": backend.status(),
+            "objetivo": backend.valor_objetivo(),
+            "tempo_execucao": backend.tempo_execucao(),
+            "movimentos": movimentos,
+        }
+        cache.gravar(chave, resultado)
+        backend.descartar()
+        return {**resultado, "em_cache": False}
+
+    return backend.model
 
 
 testes = [
@@ -545,7 +1195,7 @@ def test():
 
         A = [0]
 
-        gerar_modelo(
+        model = gerar_modelo(
             posicoes["Psi"],
             posicoes["Psi1"],
             posicoes["Psi2"],
@@ -561,6 +1211,18 @@ def test():
             [0],
             3,
         )
+        model.dispose()
+
+
+if __name__ == "__main__":
+    posicoes = gerar_posicoes(
+        num_fileiras=1,
+        num_posicoes_nivel_inferior=2,
+        num_entrada_saida=1,
+    )
+
+    print(json.dumps(posicoes))
 
+    custos = gerar_custos_de_movimentacao(posicoes["Phi"], 1)
 
-test()
+    test()
@@ -0,0 +1,306 @@
+"""
+Verificação rápida de viabilidade, antes de criar qualquer variável.
+
+Testes baratos (milissegundos) sobre a entrada do modelo, em duas classes.
+
+Condições necessárias (uma falha torna o modelo inviável):
+- capacidade: as bobinas e as posições fixas cabem em Phi (R9/R10);
+- ocupação inicial: cada bobina fora de A_in em uma posição e no máximo
+  uma bobina por posição, exceto no ponto de entrada, que é uma fila
+  (R9/R10 na seção 0);
+- janela de entrada: uma bobina de entrada ainda no ponto de entrada na
+  seção 0 exige τ¹ + σ⁺ <= 0 (R5 com τ¹ = 0).
+
+Alertas (regras físicas que o modelo não impõe por inteiro, mas que
+costumam explicar uma inviabilidade confirmada pelo solver):
+- armazenagem: as bobinas que ficam no pátio cabem nas posições de
+  armazenagem;
+- apoio: há uma posição de armazenagem livre e apoiada (R19) para
+  realocar as bloqueadoras das bobinas de saída (R17/R18);
+- tempo das seções: R8 limita a duração das movimentações de cada seção,
+  exceto a última, a S[s] - S[s-1] = 1; cada movimentação carregada
+  obrigatória (saída pelo menor t_load até o ponto de saída, entrada pelo
+  menor t_load a partir do ponto de entrada, realocação de bloqueadoras)
+  mais longa que isso só cabe na última seção;
+- seções: S não é menor que limite_inferior_secoes.
+
+verificar_viabilidade devolve {"viavel", "motivo", "mensagem", "detalhes",
+"alertas", "tempo"}, com a primeira condição necessária violada em
+"motivo"; o IIS do solver fica apenas para as inviabilidades que nada aqui
+explica. gerar_modelo levanta ModeloInviavel com esse diagnóstico quando a
+verificação falha.
+
+Uso:
+    python scripts/verificacao_viabilidade.py
+"""
+
+import time
+import numpy as np
+
+from indice_posicoes import indice_de_posicoes
+
+CAPACIDADE = "capacidade"
+OCUPACAO_INICIAL = "ocupacao_inicial"
+JANELA_ENTRADA = "janela_entrada"
+ARMAZENAGEM = "armazenagem"
+APOIO = "apoio"
+TEMPO_SECAO = "tempo_secao"
+SECOES = "secoes"
+
+# S[s] - S[s-1] em R8
+DURACAO_SECAO = 1.0
+
+
+class ModeloInviavel(ValueError):
+    """
+    Condição necessária violada; `diagnostico` é o retorno de
+    verificar_viabilidade.
+    """
+
+    def __init__(self, diagnostico):
+        super().__init__(diagnostico["mensagem"])
+        self.diagnostico = diagnostico
+
+
+def _motivo(motivo, mensagem, **detalhes):
+    return {"motivo": motivo, "mensagem": mensagem, "detalhes": detalhes}
+
+
+def _condicoes_necessarias(Phi, A, A_in, janelas, ocupacao_inicial, num_fixas, ocupacao):
+    if len(A) + num_fixas > len(Phi):
+        return _motivo(
+            CAPACIDADE,
+            f"{len(A)} bobinas e {num_fixas} posições fixas para {len(Phi)} posições",
+            bobinas=len(A),
+            posicoes=len(Phi),
+        )
+    if ocupacao_inicial is None:
+        return None
+
+    por_bobina = ocupacao_inicial.sum(axis=0)
+    sem_posicao = [a for a in range(len(A)) if por_bobina[a] != 1 and a not in A_in]
+    if sem_posicao:
+        return _motivo(
+            OCUPACAO_INICIAL,
+            f"bobinas sem exatamente uma posição inicial: {sem_posicao}",
+            bobinas=sem_posicao,
+        )
+    # O ponto de entrada é uma fila (fora de R10)
+    entrada = 0
+    repetidas = [k for k in np.nonzero(ocupacao > 1)[0].tolist() if k != entrada]
+    if repetidas:
+        return _motivo(
+            OCUPACAO_INICIAL,
+            f"posições com mais de uma bobina: {repetidas}",
+            posicoes=repetidas,
+        )
+
+    sigma_plus = np.asarray(janelas["sigma_plus"])
+    for a in A_in:
+        na_entrada = por_bobina[a] == 0 or ocupacao_inicial[entrada, a]
+        if na_entrada and sigma_plus[a] > 0:
+            return _motivo(
+                JANELA_ENTRADA,
+                f"bobina {a} está no ponto de entrada na seção 0: R5 exige τ¹ + σ⁺ = {sigma_plus[a]} <= 0",
+                bobina=a,
+                sigma_plus=float(sigma_plus[a]),
+            )
+    return None
+
+
+def _alertas(Phi, I, O, t_load, A, A_in, A_out, S, ocupacao_inicial, num_fixas, ocupacao):
+    indice = indice_de_posicoes(Phi, I, O)
+    num_armazenagem = len(indice.armazenagem)
+    alertas = []
+
+    permanecem = len(A) - len(A_out) + num_fixas
+    if permanecem > num_armazenagem:
+        alertas.append(_motivo(
+            ARMAZENAGEM,
+            f"{permanecem} bobinas ficam no pátio, que tem {num_armazenagem} posições",
+            bobinas=permanecem,
+            posicoes=num_armazenagem,
+        ))
+    if ocupacao_inicial is None:
+        return alertas
+
+    ocupada = ocupacao > 0
+    posicao = {int(a): int(k) for k, a in zip(*np.nonzero(ocupacao_inicial))}
+    bloqueadoras = {
+        j
+        for a in A_out
+        if a in posicao
+        for j in indice.bloqueadores(posicao[a])
+        if ocupada[j]
+    }
+    if bloqueadoras:
+        livres_apoiadas = [
+            k
+            for k in indice.armazenagem
+            if not ocupada[k]
+            and all(ocupada[j] for j in indice.apoios(k))
+            and k not in bloqueadoras
+        ]
+        if not livres_apoiadas:
+            alertas.append(_motivo(
+                APOIO,
+                f"nenhuma posição livre e apoiada para realocar as bloqueadoras {sorted(bloqueadoras)}",
+                bloqueadoras=sorted(bloqueadoras),
+            ))
+
+    # Menor duração de cada movimentação carregada obrigatória
+    entrada, saida = 0, len(Phi) - 1
+    t_load = np.asarray(t_load, dtype=float)
+    duracoes = []
+    if len(A_out) > 0:
+        duracoes += [np.delete(t_load[:, saida], saida).min()] * len(A_out)
+    if len(A_in) > 0:
+        duracoes += [np.delete(t_load[entrada], entrada).min()] * len(A_in)
+    for j in bloqueadoras:
+        destinos = [k for k in indice.armazenagem if k != j]
+        if destinos:
+            duracoes.append(t_load[j, destinos].min())
+    longas = [d for d in duracoes if d > DURACAO_SECAO]
+    if len(longas) > 1:
+        alertas.append(_motivo(
+            TEMPO_SECAO,
+            f"{len(longas)} movimentações obrigatórias com duração mínima de"
+            f" {min(longas):.1f} ou mais; R8 só admite uma acima de {DURACAO_SECAO}"
+            " (na última seção)",
+            movimentacoes=len(longas),
+            duracao_minima=float(min(longas)),
+        ))
+
+    from aprofundamento import limite_inferior_secoes
+
+    minimo = limite_inferior_secoes(Phi, I, O, A, A_in, A_out, ocupacao_inicial)
+    if S < minimo:
+        alertas.append(_motivo(
+            SECOES,
+            f"S = {S} seções, mas são necessárias no mínimo {minimo}",
+            secoes=S,
+            minimo=minimo,
+        ))
+    return alertas
+
+
+def verificar_viabilidade(
+    Phi,
+    I,
+    O,
+    t_load,
+    A,
+    A_in,
+    A_out,
+    S: int,
+    janelas,
+    ocupacao_inicial=None,
+    ocupacao_fixa=None,
+):
+    """
+    Verifica as condições necessárias na ordem do módulo e, se passarem,
+    coleta os alertas. Sem `ocupacao_inicial` apenas a capacidade é
+    verificada.
+    """
+    inicio = time.perf_counter()
+    num_fixas = int(np.asarray(ocupacao_fixa).sum()) if ocupacao_fixa is not None else 0
+    ocupacao = None
+    if ocupacao_inicial is not None:
+        ocupacao_inicial = np.asarray(ocupacao_inicial)
+        ocupacao = ocupacao_inicial.sum(axis=1)
+        if ocupacao_fixa is not None:
+            ocupacao = ocupacao + np.asarray(ocupacao_fixa)
+
+    motivo = _condicoes_necessarias(
+        Phi, A, A_in, janelas, ocupacao_inicial, num_fixas, ocupacao
+    )
+    if motivo is not None:
+        resultado = {"viavel": False, **motivo, "alertas": []}
+    else:
+        resultado = {
+            "viavel": True,
+            "motivo": None,
+            "mensagem": "",
+            "detalhes": {},
+            "alertas": _alertas(
+                Phi, I, O, t_load, A, A_in, A_out, S, ocupacao_inicial, num_fixas, ocupacao
+            ),
+        }
+    resultado["tempo"] = time.perf_counter() - inicio
+    return resultado
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    from teste import (
+        gerar_custos_de_movimentacao,
+        gerar_janelas_de_tempo,
+        gerar_modelo,
+        gerar_posicoes,
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        posicoes = gerar_posicoes(2, 3, 1)
+    Phi, I, O = posicoes["Phi"], posicoes["I"], posicoes["O"]
+    indice = {p: k for k, p in enumerate(Phi)}
+    t_load = gerar_custos_de_movimentacao(Phi, 3)["t_load"]
+    np.random.seed(0)
+    janelas = gerar_janelas_de_tempo(3)
+
+    def ocupacao(*posicoes_bobinas):
+        matriz = np.zeros((len(Phi), len(posicoes_bobinas)), dtype=int)
+        for a, posicao in enumerate(posicoes_bobinas):
+            matriz[indice[posicao], a] = 1
+        return matriz
+
+    casos = {
+        "viável": ([0, 1], [], [], 3, ocupacao((1, 1, 1), (1, 1, 2))),
+        "capacidade": (list(range(20)), [], [], 3, None),
+        "ocupação inicial": ([0, 1], [], [], 3, ocupacao((1, 1, 1), (1, 1, 1))),
+        "janela de entrada": ([0], [0], [], 3, ocupacao(I[0])),
+        "seções": ([0, 1, 2], [], [0, 1], 1, ocupacao((1, 1, 1), (1, 1, 2), (1, 2, 1))),
+    }
+    print()
+    for nome, (A, A_in, A_out, S, ocupacao_inicial) in casos.items():
+        resultado = verificar_viabilidade(
+            Phi, I, O, t_load, A, A_in, A_out, S, janelas, ocupacao_inicial
+        )
+        alertas = ", ".join(alerta["motivo"] for alerta in resultado["alertas"])
+        print(
+            f"{nome:>18}: {resultado['motivo'] or 'ok':>16}"
+            f" ({resultado['tempo'] * 1000:.2f} ms) {resultado['mensagem']}"
+            + (f" [alertas: {alertas}]" if alertas else "")
+        )
+
+    # gerar_modelo não constrói o modelo e levanta o diagnóstico (a classe
+    # vem do módulo importado por teste, não de __main__)
+    from verificacao_viabilidade import ModeloInviavel
+
+    A, A_in, A_out, S, ocupacao_inicial = casos["janela de entrada"]
+    custos = gerar_custos_de_movimentacao(Phi, len(A))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            gerar_modelo(
+                posicoes["Psi"],
+                posicoes["Psi1"],
+                posicoes["Psi2"],
+                Phi,
+                I,
+                O,
+                custos["t_load"],
+                custos["t_empty"],
+                custos["E_load"],
+                custos["E_empty"],
+                A,
+                A_in,
+                A_out,
+                S,
+                ocupacao_inicial=ocupacao_inicial,
+                verificar_viabilidade=True,
+                janelas=janelas,
+            )
+        raise SystemExit("gerar_modelo construiu um modelo inviável")
+    except ModeloInviavel as erro:
+        print(f"\ngerar_modelo: ModeloInviavel ({erro.diagnostico['motivo']})")